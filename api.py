@@ -0,0 +1,239 @@
+"""
+Versioned JSON API (``/api/v1``) for users, movies and reviews.
+
+Collections are paginated with a keyset cursor: every page carries
+``next_cursor``, which is passed back as ``?cursor=`` to fetch the following
+page. ``?fields=id,name`` selects the returned fields. With ``?format=ndjson``
+(or ``Accept: application/x-ndjson``) a collection is streamed as
+newline-delimited JSON from the cursor to its end; streams select only the
+requested columns and fetch them in batches, so exporting the whole catalog
+runs in constant memory.
+"""
+import json
+
+from flask import Blueprint, Response, jsonify, request, url_for
+
+API_PREFIX = '/api/v1'
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_CHUNK_SIZE = 64 * 1024
+
+USER_FIELDS = ('id', 'name')
+MOVIE_FIELDS = ('id', 'name', 'director', 'year', 'rating', 'user_id', 'catalog_id', 'imdb_id', 'omdb_poster',
+                'omdb_rating', 'omdb_director', 'omdb_year', 'enrichment_status')
+REVIEW_FIELDS = ('id', 'user_id', 'movie_id', 'review_text', 'rating')
+
+
+class APIError(Exception):
+    """
+    Error answered with a JSON body and an HTTP status.
+    """
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_fields(allowed):
+    """
+    Read the ``fields`` query parameter.
+    Args:
+        allowed (tuple): Fields of the resource.
+    Returns:
+        list: The requested fields ('id' is always included), or all fields.
+    Raises:
+        APIError: If an unknown field is requested.
+    """
+    requested = [name.strip() for name in request.args.get('fields', '').split(',') if name.strip()]
+    if not requested:
+        return list(allowed)
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise APIError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return ['id'] + [name for name in dict.fromkeys(requested) if name != 'id']
+
+
+def parse_cursor():
+    """
+    Read the ``cursor`` and ``limit`` query parameters.
+    Returns:
+        tuple: (cursor or None, limit).
+    Raises:
+        APIError: If a parameter is not a valid number.
+    """
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', DEFAULT_LIMIT)
+    try:
+        cursor = int(cursor) if cursor not in (None, '') else None
+        limit = int(limit)
+    except ValueError:
+        raise APIError('cursor and limit must be integers')
+    if limit < 1:
+        raise APIError('limit must be positive')
+    return cursor, min(limit, MAX_LIMIT)
+
+
+def wants_ndjson() -> bool:
+    """
+    Check whether the client asked for an NDJSON stream.
+    """
+    return request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def serialize(obj, fields):
+    """
+    Turn a model object into a dict with the selected fields.
+    """
+    return {name: getattr(obj, name) for name in fields}
+
+
+def page_response(page, fields):
+    """
+    Build the JSON answer for one page of a collection.
+    Args:
+        page (Page): The page returned by the data manager.
+        fields (list): Fields to include.
+    Returns:
+        Response: JSON with 'data', 'total', 'next_cursor' and 'next' (URL).
+    """
+    next_url = None
+    if page.next_cursor is not None:
+        args = dict(request.view_args, **request.args.to_dict())
+        args['cursor'] = page.next_cursor
+        next_url = url_for(request.endpoint, **args)
+    return jsonify({
+        'data': [serialize(item, fields) for item in page.items],
+        'total': page.total,
+        'next_cursor': page.next_cursor,
+        'next': next_url,
+    })
+
+
+def ndjson_response(rows):
+    """
+    Stream rows as newline-delimited JSON. A failure in the middle of the stream
+    is reported as a final ``{"error": ...}`` line.
+    Args:
+        rows (iterator): Dicts to send.
+    Returns:
+        Response: The streaming response.
+    """
+    encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+    def generate():
+        # Zeilen zu Blöcken zusammenfassen statt jede Zeile einzeln durch WSGI zu schicken
+        buffer = []
+        size = 0
+        try:
+            for row in rows:
+                line = encode(row) + '\n'
+                buffer.append(line)
+                size += len(line)
+                if size >= STREAM_CHUNK_SIZE:
+                    yield ''.join(buffer)
+                    buffer = []
+                    size = 0
+        except Exception as e:
+            print(f"Fehler beim Streamen der API-Antwort: {e}")
+            buffer.append(json.dumps({'error': 'Stream aborted'}) + '\n')
+        if buffer:
+            yield ''.join(buffer)
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
+
+
+def create_api(data_manager):
+    """
+    Build the API blueprint on top of a data manager.
+    Args:
+        data_manager (DataManagerInterface): The data source.
+    Returns:
+        Blueprint: Blueprint to register under ``API_PREFIX``.
+    """
+    api = Blueprint('api', __name__)
+
+    @api.errorhandler(APIError)
+    def api_error(e):
+        return jsonify({'error': e.message}), e.status
+
+    def require(obj, kind):
+        if obj is None:
+            raise APIError(f'{kind} not found', 404)
+        return obj
+
+    def collection(fields_allowed, get_page, stream):
+        fields = parse_fields(fields_allowed)
+        cursor, limit = parse_cursor()
+        if wants_ndjson():
+            return ndjson_response(stream(fields, cursor))
+        return page_response(get_page(limit, cursor), fields)
+
+    @api.route('/users')
+    def users():
+        """List users."""
+        return collection(
+            USER_FIELDS,
+            lambda limit, cursor: data_manager.get_users_page(1, limit, cursor),
+            lambda fields, cursor: data_manager.iter_users(fields, cursor))
+
+    @api.route('/users/<int:user_id>')
+    def user(user_id):
+        """Get one user."""
+        return jsonify(serialize(require(data_manager.get_user(user_id), 'User'), parse_fields(USER_FIELDS)))
+
+    @api.route('/users/<int:user_id>/movies')
+    def user_movies(user_id):
+        """List the movies of a user."""
+        require(data_manager.get_user(user_id), 'User')
+        return collection(
+            MOVIE_FIELDS,
+            lambda limit, cursor: data_manager.get_user_movies_page(user_id, 1, limit, cursor),
+            lambda fields, cursor: data_manager.iter_movies(fields, cursor, user_id=user_id))
+
+    @api.route('/users/<int:user_id>/reviews')
+    def user_reviews(user_id):
+        """List the reviews written by a user."""
+        require(data_manager.get_user(user_id), 'User')
+        return collection(
+            REVIEW_FIELDS,
+            lambda limit, cursor: data_manager.get_reviews_for_user_page(user_id, 1, limit, cursor),
+            lambda fields, cursor: data_manager.iter_reviews(fields, cursor, user_id=user_id))
+
+    @api.route('/movies')
+    def movies():
+        """List all movies."""
+        return collection(
+            MOVIE_FIELDS,
+            lambda limit, cursor: data_manager.get_movies_page(1, limit, cursor),
+            lambda fields, cursor: data_manager.iter_movies(fields, cursor))
+
+    @api.route('/movies/<int:movie_id>')
+    def movie(movie_id):
+        """Get one movie."""
+        return jsonify(serialize(require(data_manager.get_movie(movie_id), 'Movie'), parse_fields(MOVIE_FIELDS)))
+
+    @api.route('/movies/<int:movie_id>/reviews')
+    def movie_reviews(movie_id):
+        """List the reviews of a movie."""
+        require(data_manager.get_movie(movie_id), 'Movie')
+        return collection(
+            REVIEW_FIELDS,
+            lambda limit, cursor: data_manager.get_reviews_for_movie_page(movie_id, 1, limit, cursor),
+            lambda fields, cursor: data_manager.iter_reviews(fields, cursor, movie_id=movie_id))
+
+    @api.route('/reviews')
+    def reviews():
+        """List all reviews."""
+        return collection(
+            REVIEW_FIELDS,
+            lambda limit, cursor: data_manager.get_reviews_page(1, limit, cursor),
+            lambda fields, cursor: data_manager.iter_reviews(fields, cursor))
+
+    @api.route('/reviews/<int:review_id>')
+    def review(review_id):
+        """Get one review."""
+        return jsonify(serialize(require(data_manager.get_review(review_id), 'Review'),
+                                 parse_fields(REVIEW_FIELDS)))
+
+    return api
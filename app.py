@@ -1,121 +1,258 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import (Flask, Response, render_template, request, redirect, url_for, session, jsonify,
+                   send_file, abort, current_app)
 from datamanager.sqlite_data_manager import SQLiteDataManager
-import requests
+from datamanager.sharded_sqlite_data_manager import ShardedSQLiteDataManager
+from datamanager.caching_data_manager import CachingDataManager, DEFAULT_MAX_ENTRIES as DEFAULT_DATA_CACHE_SIZE
+from datamanager.lazy_data_manager import LazyDataManager
+from datamanager.migrations import get_schema_version
+from datamanager.catalog import BACKFILL_BATCH_SIZE as CATALOG_BATCH_SIZE, REFRESH_MAX_AGE
 import os
-import math
-import json
+import time
 from dotenv import load_dotenv
-from utils import fetch_omdb_data, validate_movie_data, get_back_url, load_trending_titles
+from utils import (fetch_omdb_data, validate_movie_data, get_back_url, get_page_args,
+                   search_omdb_titles, get_cached_omdb_raw, parse_omdb_movie)
+from autocomplete import PrefixIndex, build_index, build_index_in_background, handle_write_event, OMDB_PAGE_SIZE
+from seeding import seed_trending_titles, DEFAULT_WORKERS
+from importer import iter_rows, detect_format, DEFAULT_BATCH_SIZE
+from importer import import_movies as import_movies_from_rows
+from enrichment import EnrichmentWorkerPool, DEFAULT_WORKERS as DEFAULT_ENRICHMENT_WORKERS
+from refresher import CatalogRefresher, DEFAULT_BATCH_SIZE as DEFAULT_REFRESH_BATCH_SIZE, DEFAULT_RATE as DEFAULT_REFRESH_RATE
+from page_cache import PageCache, cached, DEFAULT_MAX_ENTRIES as DEFAULT_PAGE_CACHE_SIZE
+from assets import AssetManifest, build_assets
+from api import create_api, API_PREFIX
+from metrics import MetricsRegistry, instrument_app, observe_omdb_request, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from omdb import get_omdb_client, get_omdb_cache, NOT_FOUND
+from posters import (PosterStore, PosterError, SIZES as POSTER_SIZES, DEFAULT_CACHE_DIR, DEFAULT_ALLOWED_HOSTS,
+                     DEFAULT_MAX_BYTES as DEFAULT_POSTER_CACHE_MAX_BYTES)
+import click
 
-app = Flask(__name__)
-app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
-data_manager = SQLiteDataManager('moviwebapp.db')
+# Vor allem anderen: auch Werte, die beim Import gelesen werden, kommen aus .env
 load_dotenv()
 
 
-@app.before_request
+def load_config():
+    """
+    Read the app configuration from the environment (and ``.env``).
+    Returns:
+        dict: Flask config values.
+    """
+    database_file = os.getenv('DATABASE_FILE', 'moviwebapp.db')
+    return {
+        'SECRET_KEY': os.getenv('FLASK_SECRET_KEY', 'dev-secret-key'),
+        'DATABASE_FILE': database_file,
+        # Persistente OMDb-Antworten liegen standardmäßig in der App-Datenbank ('' = nur im Speicher)
+        'OMDB_CACHE_DB': os.getenv('OMDB_CACHE_DB', database_file),
+        # Filme und Reviews auf N Dateien verteilen (0 = eine Datei); beim Anlegen der Datenbank festlegen
+        'DATABASE_SHARDS': int(os.getenv('DATABASE_SHARDS', 0)),
+        # 0 = Schema beim Start nur prüfen; Anlegen/Migrieren einmalig mit "flask db-migrate"
+        'DATABASE_AUTO_MIGRATE': os.getenv('DATABASE_AUTO_MIGRATE', '1') == '1',
+        # Lesezugriffe werden im Speicher gehalten, bis ein Schreibzugriff sie invalidiert (0 = deaktiviert)
+        'DATA_CACHE_SIZE': int(os.getenv('DATA_CACHE_SIZE', DEFAULT_DATA_CACHE_SIZE)),
+        # Caches, Templates und Datenbankseiten vor dem ersten Request laden
+        'WARMUP': os.getenv('WARMUP', '') == '1',
+        'SERVER_TIMING': os.getenv('SERVER_TIMING', '') == '1',
+        # OMDb-Daten neuer Filme werden im Hintergrund nachgeladen (0 = deaktiviert)
+        'ENRICHMENT_WORKERS': int(os.getenv('ENRICHMENT_WORKERS', DEFAULT_ENRICHMENT_WORKERS)),
+        # Veraltete OMDb-Daten des Katalogs werden im Hintergrund aufgefrischt (0 = deaktiviert)
+        'CATALOG_REFRESH': os.getenv('CATALOG_REFRESH', '1') == '1',
+        'CATALOG_REFRESH_RATE': float(os.getenv('CATALOG_REFRESH_RATE', DEFAULT_REFRESH_RATE)),
+        'CATALOG_REFRESH_MAX_AGE': float(os.getenv('CATALOG_REFRESH_MAX_AGE', REFRESH_MAX_AGE)),
+        'CATALOG_REFRESH_BATCH_SIZE': int(os.getenv('CATALOG_REFRESH_BATCH_SIZE', DEFAULT_REFRESH_BATCH_SIZE)),
+        'PAGE_CACHE_SIZE': int(os.getenv('PAGE_CACHE_SIZE', DEFAULT_PAGE_CACHE_SIZE)),
+        'POSTER_CACHE_DIR': os.getenv('POSTER_CACHE_DIR', DEFAULT_CACHE_DIR),
+        'POSTER_ALLOWED_HOSTS': os.getenv('POSTER_ALLOWED_HOSTS', ','.join(DEFAULT_ALLOWED_HOSTS)).split(','),
+        'POSTER_CACHE_MAX_BYTES': int(os.getenv('POSTER_CACHE_MAX_BYTES', DEFAULT_POSTER_CACHE_MAX_BYTES)),
+    }
+
+
+def open_data_manager(config, create_schema=None):
+    """
+    Create the (uncached) data manager described by the configuration.
+    Args:
+        config (dict): App config with DATABASE_FILE, DATABASE_SHARDS and DATABASE_AUTO_MIGRATE.
+        create_schema (bool): Create/migrate the schema; defaults to DATABASE_AUTO_MIGRATE.
+    Returns:
+        DataManagerInterface: The SQLite or sharded SQLite data manager.
+    """
+    if create_schema is None:
+        create_schema = config['DATABASE_AUTO_MIGRATE']
+    if config['DATABASE_SHARDS']:
+        return ShardedSQLiteDataManager(config['DATABASE_FILE'], config['DATABASE_SHARDS'],
+                                        create_schema=create_schema)
+    return SQLiteDataManager(config['DATABASE_FILE'], create_schema=create_schema)
+
+
+def create_extensions(app):
+    """
+    Create the per-app objects in ``app.extensions``: the data manager (opened on
+    first use), the autocomplete index, the page and poster caches, the
+    background workers and the metrics registry, wired to the data manager's
+    write events. Views and commands reach them through ``current_app``.
+    Args:
+        app (Flask): The application with its configuration loaded.
+    """
+    config = app.config
+    data_manager = LazyDataManager()
+    data_manager.configure(lambda: CachingDataManager(open_data_manager(config), config['DATA_CACHE_SIZE']))
+    autocomplete_index = PrefixIndex()
+    data_manager.add_listener(
+        lambda event, data: handle_write_event(autocomplete_index, event, data, data_manager))
+    enrichment_workers = EnrichmentWorkerPool(data_manager, workers=config['ENRICHMENT_WORKERS'])
+    catalog_refresher = CatalogRefresher(
+        data_manager,
+        max_age=config['CATALOG_REFRESH_MAX_AGE'],
+        batch_size=config['CATALOG_REFRESH_BATCH_SIZE'],
+        rate=config['CATALOG_REFRESH_RATE'])
+    page_cache = PageCache(config['PAGE_CACHE_SIZE'])
+    data_manager.add_listener(page_cache.handle_write_event)
+    poster_store = PosterStore(
+        config['POSTER_CACHE_DIR'],
+        allowed_hosts=config['POSTER_ALLOWED_HOSTS'],
+        max_bytes=config['POSTER_CACHE_MAX_BYTES'])
+    data_manager.add_listener(poster_store.handle_write_event)
+    metrics = MetricsRegistry()
+    get_omdb_client().add_listener(observe_omdb_request(metrics))
+    metrics.add_collector('omdb_client', 'OMDb client counters.', lambda: get_omdb_client().get_stats())
+    metrics.add_collector('omdb_cache', 'OMDb response cache counters.', lambda: get_omdb_cache().get_stats())
+    metrics.add_collector('page_cache', 'Rendered-page cache counters.', page_cache.get_stats)
+    metrics.add_collector('data_cache', 'Data manager read cache counters.', lambda: data_manager.get_stats())
+    metrics.add_collector('poster_cache', 'Poster cache counters.', poster_store.get_stats)
+    metrics.add_collector('enrichment_queue', 'OMDb enrichment queue depth.',
+                          lambda: data_manager.get_enrichment_queue_stats())
+    metrics.add_collector('catalog_refresh', 'Catalog OMDb refresh progress.', catalog_refresher.get_progress)
+    app.extensions.update({
+        'data_manager': data_manager,
+        'autocomplete_index': autocomplete_index,
+        'enrichment_workers': enrichment_workers,
+        'catalog_refresher': catalog_refresher,
+        'page_cache': page_cache,
+        'poster_store': poster_store,
+        'metrics': metrics,
+    })
+
+
+HOME_PAGE_SIZE = 24
+LIST_PAGE_SIZE = 48
+AUTOCOMPLETE_LIMIT = 10
+POSTER_MAX_AGE = 365 * 24 * 3600
+
+
+def poster_url(url, size='grid'):
+    """
+    URL of a poster thumbnail served from the local poster cache.
+    Args:
+        url (str): Original poster URL.
+        size (str): Thumbnail size ('grid', 'edit' or 'small').
+    Returns:
+        str: The proxy URL, the original URL for hosts that are not proxied, or
+        None if there is no poster.
+    """
+    if not url or url == 'N/A':
+        return None
+    if not current_app.extensions['poster_store'].is_allowed(url):
+        return url
+    return url_for('poster', size=size, src=url)
+
+
+def open_db_scope():
+    """
+    Share one database session across all data manager calls of this request,
+    and drop the caches if another process wrote to the database since the
+    last request.
+    """
+    data_manager = current_app.extensions['data_manager']
+    data_manager.begin_request_scope()
+    data_manager.check_data_version()
+
+
+def close_db_scope(exception=None):
+    """
+    Commit (or roll back) and close the request's database session.
+    """
+    current_app.extensions['data_manager'].end_request_scope(exception)
+
+
+def start_background_workers():
+    """
+    Start the OMDb enrichment workers and the catalog refresher with the first
+    request (the refresher only once an OMDb API key is configured).
+    """
+    enrichment_workers = current_app.extensions['enrichment_workers']
+    catalog_refresher = current_app.extensions['catalog_refresher']
+    if current_app.config['ENRICHMENT_WORKERS'] and not enrichment_workers.running:
+        enrichment_workers.start()
+    if current_app.config['CATALOG_REFRESH'] and not catalog_refresher.running and get_omdb_client().api_key:
+        catalog_refresher.start()
+
+
 def store_referrer():
     """
-    Store the previous page in the session, except for static files and POST
-    requests.
+    Store the previous page in the session, except for static files, posters,
+    metrics, the JSON API, POST requests and cached pages (which must not depend on
+    or set the session cookie). The session is only written if the value changes.
     """
-    if request.method == 'GET' and not request.path.startswith('/static'):
-        session['last_url'] = request.referrer if request.referrer else url_for(
-            'home')
+    if request.method != 'GET' or request.path.startswith(('/static', '/posters', '/metrics', API_PREFIX)):
+        return
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'page_cached', False):
+        return
+    last_url = request.referrer if request.referrer else url_for('home')
+    if session.get('last_url') != last_url:
+        session['last_url'] = last_url
 
 
-@app.route('/')
+@cached(lambda: {'movies', 'users'})
 def home():
     """
-    Show the homepage with OMDb top-rated/trending movies (10 per page,
-    pagination, 10 pages).
+    Show the homepage with the films of the catalog (OMDb top-rated/trending
+    movies and everything users added), each film once, paginated.
     """
-    page = int(request.args.get('page', 1))
-    users = data_manager.get_all_users()
-    # Initialisiere Trending-Titel in der DB, falls noch keine Filme vorhanden sind
-    all_movies = data_manager.get_all_movies()
-    if not all_movies:
-        try:
-            trending_titles = load_trending_titles()
-            for title in trending_titles:
-                # Prüfe, ob der Film schon existiert (global, user_id=0)
-                exists = any(m.name.lower() == title.lower() for m in all_movies)
-                if not exists:
-                    data = fetch_omdb_data(title)
-                    if data:
-                        movie = {
-                            'name': data['name'],
-                            'director': data['director'],
-                            'year': data['year'],
-                            'rating': data['rating'],
-                            'user_id': 0  # globaler User für Trending-Titel
-                        }
-                        data_manager.add_movie(movie)
-            all_movies = data_manager.get_all_movies()
-        except Exception as e:
-            print(f"Error initializing trending titles: {e}")
-    per_page = 24
-    total_pages = math.ceil(len(all_movies) / per_page) if all_movies else 1
-    start = (page - 1) * per_page
-    end = start + per_page
-    page_movies = all_movies[start:end]
-    omdb_movies = []
-    for movie in page_movies:
-        omdb_movies.append({
-            'name': movie.name,
-            'director': movie.omdb_director or movie.director,
-            'year': movie.omdb_year or movie.year,
-            'rating': movie.omdb_rating or movie.rating,
-            'poster': movie.omdb_poster,
-            'omdb_id': None
-        })
+    data_manager = current_app.extensions['data_manager']
+    page, after_id = get_page_args(request)
+    users = data_manager.get_user_rows()
+    # Trending-Titel werden vorab mit "flask seed-trending" geladen, nicht hier
+    movies_page = data_manager.get_catalog_rows_page(page, HOME_PAGE_SIZE, after_id)
     return render_template(
         'home.html',
-        omdb_movies=omdb_movies,
+        omdb_movies=movies_page.items,
         users=users,
-        page=page,
-        total_pages=total_pages)
+        movies_page=movies_page)
 
 
-@app.route('/users')
+@cached(lambda: {'users'})
 def list_users():
     """
     Display a list of all users.
     """
-    users = data_manager.get_all_users()
-    back_url = get_back_url(request, session, url_for('list_users'))
-    return render_template('users.html', users=users, back_url=back_url)
+    data_manager = current_app.extensions['data_manager']
+    page, after_id = get_page_args(request)
+    users_page = data_manager.get_user_rows_page(page, LIST_PAGE_SIZE, after_id)
+    return render_template(
+        'users.html',
+        users=users_page.items,
+        users_page=users_page)
 
 
-@app.route('/users/<int:user_id>')
+@cached(lambda user_id: {f'user_movies:{user_id}'})
 def user_movies(user_id):
     """
     Show the movie list of a user with OMDb info (poster, etc.) as on the homepage.
     """
-    movies = data_manager.get_user_movies(user_id)
-    movies_with_omdb = []
-    for movie in movies:
-        movies_with_omdb.append({
-            'id': movie.id,
-            'name': movie.name,
-            'director': movie.omdb_director or movie.director,
-            'year': movie.omdb_year or movie.year,
-            'rating': movie.omdb_rating or movie.rating,
-            'poster': movie.omdb_poster,
-        })
-    back_url = get_back_url(request, session, url_for('user_movies', user_id=user_id))
+    data_manager = current_app.extensions['data_manager']
+    page, after_id = get_page_args(request)
+    movies_page = data_manager.get_user_movie_rows_page(user_id, page, LIST_PAGE_SIZE, after_id)
     return render_template(
         'movies.html',
-        movies=movies_with_omdb,
-        user_id=user_id,
-        back_url=back_url)
+        movies=movies_page.items,
+        movies_page=movies_page,
+        user_id=user_id)
 
 
-@app.route('/add_user', methods=['GET', 'POST'])
 def add_user():
     """
     Display a form to add a new user and handle form submission.
     """
+    data_manager = current_app.extensions['data_manager']
     if request.method == 'POST':
         name = request.form['name']
         user = data_manager.add_user({'name': name})
@@ -132,13 +269,13 @@ def add_user():
     return render_template('add_user.html', back_url=back_url)
 
 
-@app.route('/users/<int:user_id>/add_movie', methods=['GET', 'POST'])
 def add_movie(user_id):
     """
     Display a form to add a new movie for a user, handle OMDb API lookup and form submission.
     Args:
         user_id (int): The ID of the user.
     """
+    data_manager = current_app.extensions['data_manager']
     omdb_data = None
     error = None
     back_url = get_back_url(request, session, url_for('user_movies', user_id=user_id))
@@ -221,8 +358,48 @@ def add_movie(user_id):
         back_url=back_url)
 
 
-@app.route('/users/<int:user_id>/update_movie/<int:movie_id>',
-           methods=['GET', 'POST'])
+def import_movies(user_id):
+    """
+    Display a form to upload a movie list (CSV or JSON) and import it in batches.
+    Args:
+        user_id (int): The ID of the user.
+    """
+    data_manager = current_app.extensions['data_manager']
+    summary = None
+    error = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            error = 'Please choose a file to import.'
+        else:
+            try:
+                rows = iter_rows(upload.stream, detect_format(upload.filename))
+                summary = import_movies_from_rows(data_manager, rows, user_id)
+            except (ValueError, UnicodeDecodeError) as ex:
+                error = f'Error: {str(ex)}'
+    return render_template(
+        'import_movies.html',
+        user_id=user_id,
+        summary=summary,
+        error=error)
+
+
+def movie_form_data(movie, poster):
+    """
+    Values of a movie for the edit form, including its catalog OMDb data.
+    Args:
+        movie (Movie): The movie.
+        poster (str): Poster URL to show.
+    Returns:
+        dict: The movie's columns plus 'poster' and the OMDb fields.
+    """
+    movie_dict = {column: getattr(movie, column) for column in
+                  ('id', 'name', 'director', 'year', 'rating', 'user_id',
+                   'omdb_rating', 'omdb_director', 'omdb_year')}
+    movie_dict['poster'] = poster
+    return movie_dict
+
+
 def update_movie(user_id, movie_id):
     """
     Display a form to update a movie for a user and handle form submission.
@@ -230,16 +407,17 @@ def update_movie(user_id, movie_id):
         user_id (int): The ID of the user.
         movie_id (int): The ID of the movie.
     """
-    movies = data_manager.get_user_movies(user_id)
-    movie = next((m for m in movies if m.id == movie_id), None)
+    data_manager = current_app.extensions['data_manager']
+    movie = data_manager.get_movie(movie_id)
     back_url = get_back_url(request, session, url_for('user_movies', user_id=user_id))
-    if not movie:
+    if not movie or movie.user_id != user_id:
         return redirect(url_for('user_movies', user_id=user_id))
-    poster_url = None
-    if movie and movie.name:
-        data = fetch_omdb_data(movie.name)
-        if data:
-            poster_url = data.get('poster', None)
+    poster_url = movie.omdb_poster
+    if not poster_url:
+        # Nicht angereichert (z.B. noch in der Queue): nur der OMDb-Cache, kein Netz
+        cached = get_cached_omdb_raw(movie.name)
+        if cached is not None and cached is not NOT_FOUND:
+            poster_url = parse_omdb_movie(cached)['poster'] or None
     if request.method == 'POST':
         try:
             year = int(request.form['year'])
@@ -247,21 +425,16 @@ def update_movie(user_id, movie_id):
             is_valid, validation_error = validate_movie_data(year, rating)
             if not is_valid:
                 error = validation_error
-                movie_dict = movie.__dict__ if hasattr(movie, '__dict__') else dict(movie)
-                movie_dict['poster'] = poster_url
                 return render_template(
                     'edit_movie.html',
-                    movie=movie_dict,
+                    movie=movie_form_data(movie, poster_url),
                     back_url=back_url,
                     error=error)
         except ValueError:
             error = 'Year must be an integer and rating must be a number.'
-            movie_dict = movie.__dict__ if hasattr(
-                movie, '__dict__') else dict(movie)
-            movie_dict['poster'] = poster_url
             return render_template(
                 'edit_movie.html',
-                movie=movie_dict,
+                movie=movie_form_data(movie, poster_url),
                 back_url=back_url,
                 error=error)
         updated_movie = {
@@ -273,15 +446,12 @@ def update_movie(user_id, movie_id):
         }
         data_manager.update_movie(updated_movie)
         return redirect(url_for('user_movies', user_id=user_id))
-    movie_dict = movie.__dict__ if hasattr(movie, '__dict__') else dict(movie)
-    movie_dict['poster'] = poster_url
     return render_template(
         'edit_movie.html',
-        movie=movie_dict,
+        movie=movie_form_data(movie, poster_url),
         back_url=back_url)
 
 
-@app.route('/users/<int:user_id>/delete_movie/<int:movie_id>')
 def delete_movie(user_id, movie_id):
     """
     Delete a movie for a user and redirect to the user's movie list.
@@ -289,32 +459,38 @@ def delete_movie(user_id, movie_id):
         user_id (int): The ID of the user.
         movie_id (int): The ID of the movie.
     """
+    data_manager = current_app.extensions['data_manager']
     data_manager.delete_movie(movie_id)
     return redirect(url_for('user_movies', user_id=user_id))
 
 
-@app.route('/movies/<int:movie_id>/reviews', methods=['GET'])
+@cached(lambda movie_id: {f'movie:{movie_id}'})
 def movie_reviews(movie_id):
     """
     Display all reviews for a specific movie.
     Args:
         movie_id (int): The ID of the movie.
     """
-    reviews = data_manager.get_reviews_for_movie(movie_id)
-    all_movies = data_manager.get_all_movies()
-    movie = next((m for m in all_movies if m.id == movie_id), None)
+    data_manager = current_app.extensions['data_manager']
+    page, after_id = get_page_args(request)
+    reviews_page = data_manager.get_review_rows_for_movie_page(movie_id, page, LIST_PAGE_SIZE, after_id)
+    movie = data_manager.get_movie(movie_id)
     user_id = movie.user_id if movie else 1
-    back_url = get_back_url(request, session, url_for('movie_reviews', movie_id=movie_id))
-    return render_template('reviews.html', reviews=reviews, movie_id=movie_id, user_id=user_id, back_url=back_url)
+    return render_template(
+        'reviews.html',
+        reviews=reviews_page.items,
+        reviews_page=reviews_page,
+        movie_id=movie_id,
+        user_id=user_id)
 
 
-@app.route('/movies/<int:movie_id>/add_review', methods=['GET', 'POST'])
 def add_review(movie_id):
     """
     Display a form to add a new review for a movie and handle form submission.
     Args:
         movie_id (int): The ID of the movie.
     """
+    data_manager = current_app.extensions['data_manager']
     error = None
     back_url = get_back_url(request, session, url_for('movie_reviews', movie_id=movie_id))
     if request.method == 'POST':
@@ -331,7 +507,7 @@ def add_review(movie_id):
             return redirect(url_for('movie_reviews', movie_id=movie_id))
         except Exception as ex:
             error = f'Error: {str(ex)}'
-    users = data_manager.get_all_users()
+    users = data_manager.get_user_rows()
     return render_template(
         'add_review.html',
         movie_id=movie_id,
@@ -340,38 +516,61 @@ def add_review(movie_id):
         back_url=back_url)
 
 
-@app.route('/autocomplete_movie_title')
 def autocomplete_movie_title():
     """
-    Return a list of up to 10 movie titles and posters from OMDb that match the query (for autocomplete).
+    Return a list of up to 10 movie titles and posters that match the query (for autocomplete).
+    Suggestions come from the local prefix index; OMDb is only asked for prefixes the
+    index cannot satisfy, and its results are added to the index. The index is built
+    in the background on first use, so the first lookups only get OMDb results.
     Query param: q (the search string)
     Returns: JSON list of dicts with 'title' and 'poster'
     """
-    import json
-    OMDB_API_KEY = os.getenv('OMDB_API_KEY')
+    data_manager = current_app.extensions['data_manager']
+    autocomplete_index = current_app.extensions['autocomplete_index']
     query = request.args.get('q', '').strip()
-    results = []
-    if query and len(query) > 0:
-        url = f'http://www.omdbapi.com/?s={query}&apikey={OMDB_API_KEY}&type=movie'
-        try:
-            r = requests.get(url)
-            if r.status_code == 200:
-                data = r.json()
-                if data.get('Response') == 'True' and 'Search' in data:
-                    for movie in data['Search'][:10]:
-                        title = movie.get('Title', '')
-                        poster = movie.get('Poster', '')
-                        results.append({'title': title, 'poster': poster})
-        except Exception:
-            pass
-    return json.dumps(results)
-
-
-@app.route('/search')
+    if not query:
+        return jsonify([])
+    if not autocomplete_index.built:
+        build_index_in_background(autocomplete_index, data_manager)
+    results = autocomplete_index.search(query, AUTOCOMPLETE_LIMIT)
+    if autocomplete_index.needs_remote(query, len(results), AUTOCOMPLETE_LIMIT):
+        remote = search_omdb_titles(query)
+        if remote is not None:
+            autocomplete_index.add_remote_results(
+                query, remote['results'], complete=remote['total'] <= OMDB_PAGE_SIZE)
+            results = autocomplete_index.search(query, AUTOCOMPLETE_LIMIT)
+    return jsonify([dict(result, poster=poster_url(result['poster'], 'small')) for result in results])
+
+
+def poster(size):
+    """
+    Serve a poster thumbnail from the local poster cache, downloading the poster
+    on first use. Falls back to the original URL if the download fails.
+    Query param: src (the original poster URL)
+    """
+    poster_store = current_app.extensions['poster_store']
+    src = request.args.get('src', '')
+    if size not in POSTER_SIZES or not poster_store.is_allowed(src):
+        abort(404)
+    try:
+        path, mimetype, etag = poster_store.get(src, size)
+        # Öffnet die Datei sofort; vom Aufräumen gerade gelöscht, greift der Fallback
+        response = send_file(path, mimetype=mimetype, etag=etag, max_age=POSTER_MAX_AGE, conditional=True)
+    except Exception as e:
+        print(f"Error serving poster {src}: {e}")
+        response = redirect(src)
+        response.cache_control.no_store = True
+        return response
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 def search():
     """
     Search for movies in the database (by title, director, year). If no results, optionally query OMDb.
     """
+    data_manager = current_app.extensions['data_manager']
     query = request.args.get('q', '').strip()
     results = []
     omdb_result = None
@@ -388,7 +587,153 @@ def search():
         omdb_result=omdb_result)
 
 
-@app.errorhandler(404)
+def metrics_endpoint():
+    """
+    Expose request, database, OMDb and cache metrics in the Prometheus text format.
+    """
+    return Response(current_app.extensions['metrics'].render(), content_type=METRICS_CONTENT_TYPE)
+
+
+@click.command('seed-trending')
+@click.option('--workers', default=DEFAULT_WORKERS, show_default=True,
+              help='Number of concurrent OMDb lookups.')
+def seed_trending_command(workers):
+    """
+    Load the trending titles into the database (idempotent).
+    """
+    data_manager = current_app.extensions['data_manager']
+    seed_trending_titles(data_manager, workers=workers, progress=click.echo)
+
+
+@click.command('import-movies')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', type=int, required=True, help='Owner of the imported movies.')
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'json']),
+              help='File format (default: from the file extension).')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Rows per bulk insert.')
+def import_movies_command(path, user_id, file_format, batch_size):
+    """
+    Import a CSV or JSON movie list for a user.
+    """
+    data_manager = current_app.extensions['data_manager']
+    with open(path, 'rb') as stream:
+        rows = iter_rows(stream, file_format or detect_format(path))
+        summary = import_movies_from_rows(
+            data_manager, rows, user_id, batch_size=batch_size, progress=click.echo)
+    for message in summary['errors']:
+        click.echo(message)
+    click.echo(f"Imported {summary['inserted']} of {summary['read']} rows "
+               f"({summary['duplicates']} already present, {summary['invalid']} invalid, "
+               f"{summary['failed']} failed) "
+               f"in {summary['seconds']}s")
+
+
+@click.command('build-assets')
+def build_assets_command():
+    """
+    Fingerprint and precompress the static CSS/JS bundles and write the manifest.
+    """
+    for entry in build_assets(current_app.static_folder):
+        click.echo(f"{entry['name']} -> {entry['file']} ({entry['size']} B, "
+                   f"gzip {entry['gzip'] or '-'} B, br {entry['br'] or '-'} B)")
+    current_app.extensions['asset_manifest'].load()
+
+
+@click.command('db-migrate')
+def db_migrate_command():
+    """
+    Create missing tables, apply pending schema migrations and print the schema
+    version. This is the one-time schema step before starting the app with
+    DATABASE_AUTO_MIGRATE=0.
+    """
+    migrated = open_data_manager(current_app.config, create_schema=False)
+    # Bei Sharding: globale Datei und alle Shards
+    for manager in getattr(migrated, 'managers', [migrated]):
+        for version, description in manager.migrate():
+            click.echo(f"{manager.engine.url.database}: applied migration {version}: {description}")
+        with manager.engine.connect() as connection:
+            click.echo(f"{manager.engine.url.database}: schema version {get_schema_version(connection)}")
+        manager.engine.dispose()
+
+
+@click.command('catalog-migrate')
+@click.option('--batch-size', default=CATALOG_BATCH_SIZE, show_default=True,
+              help='Movie rows per transaction.')
+def catalog_migrate_command(batch_size):
+    """
+    Move the OMDb data of all movie rows from before the catalog into it. The
+    app can keep running meanwhile; the enrichment workers do the same when idle.
+    """
+    data_manager = current_app.extensions['data_manager']
+    after_id = 0
+    totals = {'scanned': 0, 'linked': 0, 'queued': 0}
+    while True:
+        stats = data_manager.backfill_catalog(after_id, batch_size)
+        for name in totals:
+            totals[name] += stats[name]
+        after_id = stats['last_id']
+        if stats['scanned']:
+            click.echo(f"... up to movie {after_id}: {totals['linked']} linked, {totals['queued']} queued")
+        if stats['scanned'] < batch_size:
+            break
+    click.echo(f"Migrated {totals['scanned']} movies: {totals['linked']} linked to the catalog, "
+               f"{totals['queued']} queued for an OMDb lookup")
+    for name, value in data_manager.get_catalog_stats().items():
+        click.echo(f"{name}: {value}")
+
+
+@click.command('catalog-refresh')
+@click.option('--limit', type=int, help='Maximum number of films to check (0 only prints the progress).')
+@click.option('--max-age', type=float,
+              help='Refresh OMDb data fetched more than this many seconds ago (default: CATALOG_REFRESH_MAX_AGE).')
+@click.option('--rate', type=float,
+              help='OMDb lookups per second, 0 = only the OMDb client limit (default: CATALOG_REFRESH_RATE).')
+def catalog_refresh_command(limit, max_age, rate):
+    """
+    Refresh the stale OMDb data of the catalog in the foreground, oldest first.
+    Can be interrupted and run again at any time. Stops with a message while a
+    serving process holds the refresh lease.
+    """
+    config = current_app.config
+    refresher = CatalogRefresher(
+        current_app.extensions['data_manager'],
+        max_age=config['CATALOG_REFRESH_MAX_AGE'] if max_age is None else max_age,
+        batch_size=config['CATALOG_REFRESH_BATCH_SIZE'],
+        rate=config['CATALOG_REFRESH_RATE'] if rate is None else rate)
+    try:
+        refresher.run_pending(limit, progress=click.echo)
+    finally:
+        refresher.release_lease()
+    for name, value in refresher.get_progress().items():
+        click.echo(f"{name}: {value}")
+
+
+@click.command('enrichment-status')
+def enrichment_status_command():
+    """
+    Print the depth of the OMDb enrichment queue.
+    """
+    data_manager = current_app.extensions['data_manager']
+    stats = data_manager.get_enrichment_queue_stats()
+    for name, value in stats.items():
+        click.echo(f"{name}: {value}")
+
+
+@click.command('enrichment-run')
+@click.option('--limit', type=int, help='Maximum number of jobs to process.')
+def enrichment_run_command(limit):
+    """
+    Process all due OMDb enrichment jobs in the foreground.
+    """
+    enrichment_workers = current_app.extensions['enrichment_workers']
+    processed = enrichment_workers.run_pending(limit)
+    stats = enrichment_workers.stats
+    click.echo(f"Processed {processed} jobs: {stats['enriched_movies']} movies enriched, "
+               f"{stats['not_found']} titles not found, {stats['retries']} retries scheduled, "
+               f"{stats['failed']} failed")
+
+
 def page_not_found(e):
     """
     Render the 404 error page when a resource is not found.
@@ -396,5 +741,108 @@ def page_not_found(e):
     return render_template('404.html'), 404
 
 
+# (URL-Regel, View, erlaubte Methoden)
+ROUTES = [
+    ('/', home, None),
+    ('/users', list_users, None),
+    ('/users/<int:user_id>', user_movies, None),
+    ('/add_user', add_user, ['GET', 'POST']),
+    ('/users/<int:user_id>/add_movie', add_movie, ['GET', 'POST']),
+    ('/users/<int:user_id>/import', import_movies, ['GET', 'POST']),
+    ('/users/<int:user_id>/update_movie/<int:movie_id>', update_movie, ['GET', 'POST']),
+    ('/users/<int:user_id>/delete_movie/<int:movie_id>', delete_movie, None),
+    ('/movies/<int:movie_id>/reviews', movie_reviews, ['GET']),
+    ('/movies/<int:movie_id>/add_review', add_review, ['GET', 'POST']),
+    ('/autocomplete_movie_title', autocomplete_movie_title, None),
+    ('/posters/<size>', poster, None),
+    ('/search', search, None),
+    ('/metrics', metrics_endpoint, None),
+]
+CLI_COMMANDS = [seed_trending_command, import_movies_command, build_assets_command, db_migrate_command,
+                catalog_migrate_command, catalog_refresh_command, enrichment_status_command,
+                enrichment_run_command]
+# Seiten, die warmup() vorab rendert
+WARMUP_PATHS = ('/', '/users')
+
+
+def create_app(config=None):
+    """
+    Application factory: create a Flask app with its own data manager, caches,
+    background workers and metrics (see ``create_extensions``) and register
+    views, hooks, the JSON API and the CLI commands. No database is opened
+    here; the data manager is created on first use. Can be called once per
+    configuration, e.g. in tests; ``app`` below is the app of this module.
+    The OMDb client and its response cache are shared by all apps of a process.
+    Args:
+        config (dict): Values overriding the configuration from the environment.
+    Returns:
+        Flask: The application.
+    Raises:
+        RuntimeError: If the OMDb cache of the process is already open on
+            another file than this app's ``OMDB_CACHE_DB``.
+    """
+    app = Flask(__name__)
+    app.config.update(load_config())
+    app.config.update(config or {})
+    get_omdb_cache().set_db_file(app.config['OMDB_CACHE_DB'] or None)
+    create_extensions(app)
+    # Fingerprinted, vorkomprimierte Bundles aus "flask build-assets"
+    asset_manifest = AssetManifest(app.static_folder)
+    app.extensions['asset_manifest'] = asset_manifest
+    app.url_defaults(asset_manifest.url_defaults)
+    app.view_functions['static'] = asset_manifest.send
+    app.register_blueprint(create_api(app.extensions['data_manager']), url_prefix=API_PREFIX)
+    instrument_app(app, app.extensions['metrics'], server_timing=app.config['SERVER_TIMING'])
+    app.add_template_global(poster_url)
+    for hook in (open_db_scope, start_background_workers, store_referrer):
+        app.before_request(hook)
+    app.teardown_request(close_db_scope)
+    for rule, view, methods in ROUTES:
+        app.add_url_rule(rule, view_func=view, methods=methods)
+    app.register_error_handler(404, page_not_found)
+    for command in CLI_COMMANDS:
+        app.cli.add_command(command)
+    return app
+
+
+def warmup(app):
+    """
+    Prepare a process for traffic: open the database, render the first pages
+    (filling the data and page caches, SQLite's page cache and the compiled
+    templates), compile the remaining templates and build the autocomplete index.
+    Call it in each serving process before it accepts requests, e.g. after the
+    fork of a pre-forking server.
+    Args:
+        app (Flask): The application.
+    Returns:
+        float: Seconds the warmup took.
+    """
+    started = time.perf_counter()
+    data_manager = app.extensions['data_manager']
+    autocomplete_index = app.extensions['autocomplete_index']
+    try:
+        for path in WARMUP_PATHS:
+            with app.test_request_context(path):
+                data_manager.begin_request_scope()
+                try:
+                    app.view_functions[request.endpoint](**request.view_args)
+                finally:
+                    data_manager.end_request_scope()
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
+        if not autocomplete_index.built:
+            build_index(autocomplete_index, data_manager)
+    except Exception as e:
+        print(f"Error during warmup: {e}")
+    return time.perf_counter() - started
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
+    if os.getenv('SEED_TRENDING_ON_STARTUP'):
+        seed_trending_titles(app.extensions['data_manager'])
+    if app.config['WARMUP']:
+        warmup(app)
     app.run(debug=True, host='0.0.0.0', port=5001)
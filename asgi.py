@@ -0,0 +1,345 @@
+"""
+ASGI serving mode: ``uvicorn asgi:app``.
+
+Views that wait on OMDb (search with its OMDb fallback, autocomplete, the
+"Fetch from OMDb" step of the add-movie form) run as coroutines on the event
+loop, using the async data manager and the async OMDb client. A request waiting
+for OMDb holds no thread, so thousands of slow requests can be in flight with a
+handful of threads. All other requests go to the Flask app through a WSGI
+bridge with a bounded thread pool.
+
+Async views run inside a regular Flask request context: templates, ``url_for``,
+the session, the before/after request hooks (metrics, session cookie) and the
+error handlers behave exactly as in the WSGI app.
+
+Requires the packages in ``requirements-async.txt``.
+"""
+import asyncio
+import contextvars
+import io
+import os
+import sys
+
+from a2wsgi import WSGIMiddleware
+from flask import render_template, request, session, url_for, jsonify
+from werkzeug.exceptions import HTTPException
+
+from app import app as flask_app, poster_url, warmup, AUTOCOMPLETE_LIMIT
+from autocomplete import build_index_in_background, OMDB_PAGE_SIZE
+from datamanager.async_sqlite_data_manager import AsyncSQLiteDataManager
+from omdb import get_omdb_client
+from omdb.async_client import AsyncOMDbClient
+from utils import get_back_url, parse_omdb_movie
+
+# Threads für alle Requests, die über die WSGI-Brücke an Flask gehen
+WSGI_WORKERS = int(os.getenv('ASGI_WSGI_WORKERS', 10))
+# Braucht die lokale Suche länger, wird der OMDb-Fallback schon parallel gestartet (0 = immer parallel)
+OMDB_HEDGE_DELAY = float(os.getenv('OMDB_HEDGE_DELAY', 0.05))
+MAX_BODY_SIZE = 1024 * 1024
+
+data_manager = flask_app.extensions['data_manager']
+autocomplete_index = flask_app.extensions['autocomplete_index']
+
+# Wird beim Lifespan-Start angelegt; ohne ihn (und bei Sharding) sucht der Sync-Manager in einem Thread
+async_data_manager = None
+async_omdb = AsyncOMDbClient(get_omdb_client())
+
+
+async def search_with_fallback(query):
+    """
+    Search the local database and, if it finds nothing, OMDb. If the local
+    search has not answered within ``OMDB_HEDGE_DELAY`` the OMDb lookup is
+    started concurrently, so a slow database does not add to the OMDb latency.
+    Args:
+        query (str): The search string.
+    Returns:
+        tuple: (local results, OMDb movie data or None).
+    """
+    local = asyncio.ensure_future(async_data_manager.search_movies(query) if async_data_manager
+                                  else asyncio.to_thread(data_manager.search_movies, query))
+    remote = None
+    done, _ = await asyncio.wait({local}, timeout=OMDB_HEDGE_DELAY)
+    if not done:
+        remote = asyncio.ensure_future(async_omdb.get_by_title(query))
+    try:
+        results = await local
+    except BaseException:
+        if remote is not None:
+            remote.cancel()
+        raise
+    if results:
+        if remote is not None:
+            remote.cancel()
+        return results, None
+    data = await remote if remote is not None else await async_omdb.get_by_title(query)
+    return results, parse_omdb_movie(data)
+
+
+async def search():
+    """
+    Search for movies in the database (by title, director, year). If no results, query OMDb.
+    """
+    query = request.args.get('q', '').strip()
+    results = []
+    omdb_result = None
+    if query:
+        results, omdb_result = await search_with_fallback(query)
+    return render_template(
+        'search_results.html',
+        query=query,
+        results=results,
+        omdb_result=omdb_result)
+
+
+async def autocomplete_movie_title():
+    """
+    Return up to 10 movie titles and posters matching the query, from the local
+    prefix index and, for prefixes it cannot satisfy, from OMDb.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify([])
+    if not autocomplete_index.built:
+        build_index_in_background(autocomplete_index, data_manager)
+    results = autocomplete_index.search(query, AUTOCOMPLETE_LIMIT)
+    if autocomplete_index.needs_remote(query, len(results), AUTOCOMPLETE_LIMIT):
+        remote = await async_omdb.search(query)
+        if remote is not None:
+            autocomplete_index.add_remote_results(
+                query, remote['results'], complete=remote['total'] <= OMDB_PAGE_SIZE)
+            results = autocomplete_index.search(query, AUTOCOMPLETE_LIMIT)
+    return jsonify([dict(result, poster=poster_url(result['poster'], 'small')) for result in results])
+
+
+async def add_movie(user_id):
+    """
+    "Fetch from OMDb" step of the add-movie form without blocking a thread; all
+    other requests of the form are handled by the synchronous view.
+    Args:
+        user_id (int): The ID of the user.
+    """
+    if request.method != 'POST' or not ('fetch_omdb' in request.form or 'fetch_omdb_flag' in request.form):
+        # to_thread übernimmt den Kontext, der Flask-Request ist also auch im Thread aktiv
+        return await asyncio.to_thread(flask_app.view_functions['add_movie'], user_id=user_id)
+    back_url = get_back_url(request, session, url_for('user_movies', user_id=user_id))
+    omdb_data = None
+    try:
+        omdb_data = parse_omdb_movie(await async_omdb.get_by_title(request.form['name']))
+        error = None if omdb_data else 'Movie not found!'
+    except Exception as ex:
+        error = f'Error: {str(ex)}'
+    return render_template(
+        'add_movie.html',
+        user_id=user_id,
+        omdb_data=omdb_data,
+        error=error,
+        back_url=back_url)
+
+
+ASYNC_VIEWS = {
+    'search': search,
+    'autocomplete_movie_title': autocomplete_movie_title,
+    'add_movie': add_movie,
+}
+
+
+def build_environ(scope, body=b''):
+    """
+    Build a WSGI environ for an ASGI HTTP scope.
+    Args:
+        scope (dict): The ASGI connection scope.
+        body (bytes): The request body.
+    Returns:
+        dict: The WSGI environ.
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _preprocess_request(flask_app):
+    """
+    Run the before request hooks; raise the routing error if there is one.
+    """
+    rv = flask_app.preprocess_request()
+    if rv is None and request.routing_exception is not None:
+        raise request.routing_exception
+    return rv
+
+
+def _handle(handler, error):
+    """
+    Call a Flask error handler (``handle_user_exception``, ``handle_exception``)
+    with the error being handled: they re-raise and log ``sys.exc_info()``,
+    which is empty in the worker thread otherwise.
+    """
+    try:
+        raise error
+    except Exception:
+        return handler(error)
+
+
+class AsyncDispatcher:
+    """
+    ASGI application running the async views natively and everything else
+    through the WSGI bridge.
+    """
+
+    def __init__(self, wsgi_app, views, wsgi_workers: int = WSGI_WORKERS):
+        """
+        Initialize the dispatcher.
+        Args:
+            wsgi_app (Flask): The Flask application.
+            views (dict): Endpoint name -> coroutine function replacing the view.
+            wsgi_workers (int): Threads of the WSGI bridge.
+        """
+        self.flask_app = wsgi_app
+        self.views = views
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=wsgi_workers)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        environ = build_environ(scope)
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            endpoint = None
+        if endpoint not in self.views:
+            await self.wsgi(scope, receive, send)
+            return
+        body = await self._read_body(receive)
+        if body is None:
+            await self._send(send, 413, [(b'content-type', b'text/plain')], [b'Request body too large'])
+            return
+        environ['wsgi.input'] = io.BytesIO(body)
+        await self._dispatch(environ, send)
+
+    async def _dispatch(self, environ, send):
+        """
+        Run an async view the way ``Flask.wsgi_app`` runs a sync one. The sync
+        parts (pushing the request context, the before/after request hooks with
+        the data manager's version check and request scope, error handlers and
+        the teardown commit) do SQLite I/O, so they run in a worker thread and
+        never block the event loop. All of them run in one ``contextvars``
+        context of the request, so the Flask request context and the data
+        manager's request scope set in one step are seen by the next; the view
+        runs on the loop in a task copied from that context (and its
+        ``asyncio.to_thread`` calls share the request's session).
+        """
+        flask_app = self.flask_app
+        ctx = flask_app.request_context(environ)
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+
+        def in_thread(call, *args):
+            return loop.run_in_executor(None, context.run, call, *args)
+
+        error = None
+        try:
+            await in_thread(ctx.push)
+            try:
+                rv = await in_thread(_preprocess_request, flask_app)
+                if rv is None:
+                    rv = await context.run(asyncio.ensure_future, self._run_view())
+            except Exception as e:
+                rv = await in_thread(_handle, flask_app.handle_user_exception, e)
+            response = await in_thread(flask_app.finalize_request, rv)
+        except Exception as e:
+            error = e
+            response = await in_thread(_handle, flask_app.handle_exception, e)
+        try:
+            headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                       for name, value in response.headers.to_wsgi_list()]
+            await self._send(send, response.status_code, headers, response.iter_encoded())
+        finally:
+            response.close()
+            await in_thread(ctx.pop, error)
+
+    async def _run_view(self):
+        return await self.views[request.endpoint](**request.view_args)
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_SIZE:
+                return None
+            chunks.append(chunk)
+            more = message.get('more_body', False)
+        return b''.join(chunks)
+
+    @staticmethod
+    async def _send(send, status, headers, chunks):
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        for chunk in chunks:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def _startup(self):
+        """
+        Open the database before the server accepts requests: create the async
+        data manager (one file only; shards are searched by the sync manager)
+        and run the warmup if enabled.
+        """
+        global async_data_manager
+        # Der async Manager liest eine Datei
+        if not getattr(data_manager, 'shards', None):
+            async_data_manager = AsyncSQLiteDataManager(data_manager)
+        if self.flask_app.config['WARMUP']:
+            warmup(self.flask_app)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await asyncio.to_thread(self._startup)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_omdb.aclose()
+                if async_data_manager is not None:
+                    await async_data_manager.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = AsyncDispatcher(flask_app, ASYNC_VIEWS)
@@ -0,0 +1,143 @@
+"""
+Static asset pipeline: content-hashed filenames and precompressed variants.
+
+``build_assets`` copies the CSS and JavaScript files from ``static/`` to
+``static/dist/`` under a fingerprinted name (e.g. ``style.3f2a9c1e04b7.css``),
+writes gzip and, if the optional ``brotli`` package is installed, brotli
+variants next to them and records the mapping in ``static/dist/manifest.json``.
+
+At runtime ``AssetManifest`` rewrites ``url_for('static', filename=...)`` to the
+fingerprinted files and serves them (precompressed where the client accepts it)
+with immutable caching. Without a manifest the plain files are served.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Dict, List
+
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # brotli ist optional
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+BUNDLED_EXTENSIONS = ('.css', '.js')
+ASSET_MAX_AGE = 365 * 24 * 3600
+# (Accept-Encoding token, file suffix) in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def build_assets(static_folder: str) -> List[Dict[str, int]]:
+    """
+    Fingerprint and precompress the static bundles and write the manifest.
+    Args:
+        static_folder (str): The app's static folder.
+    Returns:
+        list: One dict per asset with 'name', 'file', 'size', 'gzip' and 'br'
+        (compressed sizes, 0 if no variant was written).
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    os.makedirs(dist)
+    manifest = {}
+    summary = []
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist)
+        for name in sorted(files):
+            if not name.endswith(BUNDLED_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            stem, extension = os.path.splitext(logical)
+            fingerprinted = f'{DIST_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{extension}'
+            target = os.path.join(static_folder, fingerprinted)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            entry = {'name': logical, 'file': fingerprinted, 'size': len(data), 'gzip': 0, 'br': 0}
+            variants = {'gzip': gzip.compress(data, 9, mtime=0)}
+            if brotli is not None:
+                variants['br'] = brotli.compress(data, quality=11)
+            for encoding, suffix in ENCODINGS:
+                compressed = variants.get(encoding)
+                # Nur schreiben, wenn die Variante tatsächlich kleiner ist
+                if compressed is not None and len(compressed) < len(data):
+                    with open(target + suffix, 'wb') as f:
+                        f.write(compressed)
+                    entry[encoding] = len(compressed)
+            manifest[logical] = fingerprinted
+            summary.append(entry)
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return summary
+
+
+class AssetManifest:
+    """
+    Maps logical static filenames to their fingerprinted, precompressed builds.
+    """
+
+    def __init__(self, static_folder: str):
+        """
+        Load the manifest of the static folder, if it has been built.
+        Args:
+            static_folder (str): The app's static folder.
+        """
+        self.static_folder = static_folder
+        self.files = {}
+        self._fingerprinted = set()
+        self._variants = {}
+        self.load()
+
+    def load(self):
+        """
+        (Re)load the manifest and the list of precompressed variants.
+        """
+        try:
+            with open(os.path.join(self.static_folder, DIST_DIR, MANIFEST_NAME), encoding='utf-8') as f:
+                self.files = json.load(f)
+        except (OSError, ValueError):
+            self.files = {}
+        self._fingerprinted = set(self.files.values())
+        self._variants = {
+            filename: [(encoding, suffix) for encoding, suffix in ENCODINGS
+                       if os.path.exists(os.path.join(self.static_folder, filename + suffix))]
+            for filename in self._fingerprinted}
+
+    def url_defaults(self, endpoint, values):
+        """
+        ``app.url_defaults`` hook pointing ``url_for('static', ...)`` at the
+        fingerprinted file.
+        """
+        if endpoint == 'static' and values.get('filename') in self.files:
+            values['filename'] = self.files[values['filename']]
+
+    def send(self, filename):
+        """
+        View function for the static endpoint. Fingerprinted files are served
+        precompressed if the client accepts it and cached as immutable; all
+        other files are served as usual.
+        Args:
+            filename (str): Requested file, relative to the static folder.
+        """
+        if filename not in self._fingerprinted:
+            return current_app.send_static_file(filename)
+        encoding, suffix = next(
+            ((e, s) for e, s in self._variants[filename] if request.accept_encodings[e]), (None, ''))
+        response = send_from_directory(
+            self.static_folder, filename + suffix, mimetype=mimetypes.guess_type(filename)[0],
+            max_age=ASSET_MAX_AGE, conditional=True)
+        if encoding:
+            response.content_encoding = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
@@ -0,0 +1,334 @@
+"""
+In-memory prefix index for the movie title autocomplete.
+
+Titles are stored in a sorted array once per word start ("the dark knight",
+"dark knight", "knight"), so a bisect finds every title containing a word that
+starts with the typed prefix. The index is built from the local movie titles
+in a background thread (the keys are sorted once, not inserted one by one),
+kept up to date by data manager write events (rebuilt when another process
+wrote) and extended with the OMDb search results seen so far.
+"""
+import threading
+from bisect import bisect_left, insort
+from heapq import merge
+from typing import Optional, List, Dict
+
+from omdb import normalize_title
+
+_SEPARATOR = '\x00'
+MAX_REMOTE_PREFIXES = 10000
+MIN_REMOTE_PREFIX = 3
+OMDB_PAGE_SIZE = 10
+# Lesedurchgänge eines Builds, bevor die nächste Anfrage es erneut versucht
+MAX_BUILD_PASSES = 3
+# Events, die lokale Titel ändern
+TITLE_EVENTS = ('movie_added', 'movies_added', 'movie_updated', 'movies_enriched', 'movie_deleted')
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over movie titles with poster URLs.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty index.
+        """
+        self._keys = []
+        self._entries = {}
+        self._local_refs = {}
+        self._remote_prefixes = {}
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._builder = None
+        # Zählt die Schreib-Events; ein Build ist nur aktuell, wenn beim Lesen keins kam
+        self._writes = 0
+        self.built = False
+
+    def add(self, title: str, poster: Optional[str] = None, local: bool = True):
+        """
+        Add a title (or update its poster).
+        Args:
+            title (str): Movie title.
+            poster (str): Poster URL, if known.
+            local (bool): True for titles stored in the database, False for
+                titles only seen in OMDb search results.
+        """
+        with self._lock:
+            for key in self._add_entry(title, poster, local):
+                insort(self._keys, key)
+
+    def add_many(self, titles):
+        """
+        Add many local titles at once. Their keys are sorted once and merged
+        into the array, instead of one insertion (and array shift) per key.
+        Args:
+            titles (iterable): (title, poster) pairs.
+        """
+        with self._lock:
+            new_keys = []
+            for title, poster in titles:
+                new_keys.extend(self._add_entry(title, poster, True))
+            if new_keys:
+                new_keys.sort()
+                self._keys = list(merge(self._keys, new_keys))
+
+    def note_write(self):
+        """
+        Count a write event that changes local titles.
+        Returns:
+            int: The new count.
+        """
+        with self._lock:
+            self._writes += 1
+            return self._writes
+
+    def write_count(self) -> int:
+        """
+        Returns:
+            int: The number of write events counted so far.
+        """
+        with self._lock:
+            return self._writes
+
+    def replace_local(self, titles, writes: int) -> bool:
+        """
+        Replace the local titles with a fresh read from the database, keeping
+        the titles only seen in OMDb results. The new array is built outside
+        the lock; lookups see the old titles until the swap.
+        Args:
+            titles (iterable): (title, poster) pairs of all local movies.
+            writes (int): ``write_count()`` from before the titles were read.
+        Returns:
+            bool: True (and ``built`` is set) if no write event came in since,
+            so the index is current.
+        """
+        fresh = PrefixIndex()
+        fresh.add_many(titles)
+        with self._lock:
+            new_keys = []
+            for norm, entry in self._entries.items():
+                if not entry.get('remote'):
+                    continue
+                current = fresh._entries.get(norm)
+                if current is None:
+                    fresh._entries[norm] = entry
+                    new_keys.extend(self._word_keys(norm))
+                else:
+                    current['remote'] = True
+                    current['poster'] = current['poster'] or entry['poster']
+            new_keys.sort()
+            self._keys = list(merge(fresh._keys, new_keys))
+            self._entries = fresh._entries
+            self._local_refs = fresh._local_refs
+            self.built = writes == self._writes
+            return self.built
+
+    def _add_entry(self, title, poster, local):
+        """
+        Add or update the entry of a title (with the lock held).
+        Returns:
+            list: The keys to insert into the array (empty for known titles).
+        """
+        norm = normalize_title(title)
+        if not norm:
+            return []
+        if poster == 'N/A':
+            poster = None
+        new_keys = []
+        entry = self._entries.get(norm)
+        if entry is None:
+            self._entries[norm] = {'title': title, 'poster': poster}
+            new_keys = self._word_keys(norm)
+        elif poster and not entry['poster']:
+            entry['poster'] = poster
+        if local:
+            self._local_refs[norm] = self._local_refs.get(norm, 0) + 1
+        return new_keys
+
+    def remove(self, title: str):
+        """
+        Drop one local reference to a title. The title stays searchable while
+        other movies use it or OMDb returned it.
+        Args:
+            title (str): Movie title.
+        """
+        norm = normalize_title(title)
+        with self._lock:
+            refs = self._local_refs.get(norm, 0) - 1
+            if refs > 0:
+                self._local_refs[norm] = refs
+                return
+            self._local_refs.pop(norm, None)
+            entry = self._entries.get(norm)
+            if entry is None or entry.get('remote'):
+                return
+            del self._entries[norm]
+            for key in self._word_keys(norm):
+                position = bisect_left(self._keys, key)
+                if position < len(self._keys) and self._keys[position] == key:
+                    del self._keys[position]
+
+    def add_remote_results(self, prefix: str, results: List[Dict[str, str]], complete: bool):
+        """
+        Fold OMDb search results for a prefix into the index.
+        Args:
+            prefix (str): The prefix that was sent to OMDb.
+            results (list): Dicts with 'title' and 'poster'.
+            complete (bool): True if OMDb returned all of its matches, so longer
+                prefixes starting with this one never need a remote lookup.
+        """
+        with self._lock:
+            for result in results:
+                self.add(result['title'], result.get('poster'), local=False)
+                self._entries[normalize_title(result['title'])]['remote'] = True
+            if len(self._remote_prefixes) >= MAX_REMOTE_PREFIXES:
+                self._remote_prefixes.clear()
+            self._remote_prefixes[normalize_title(prefix)] = complete
+
+    def needs_remote(self, prefix: str, found: int, limit: int) -> bool:
+        """
+        Decide whether OMDb has to be asked for a prefix.
+        Args:
+            prefix (str): The typed prefix.
+            found (int): Number of local matches.
+            limit (int): Number of suggestions wanted.
+        Returns:
+            bool: True if the index cannot satisfy the prefix on its own.
+        """
+        norm = normalize_title(prefix)
+        if found >= limit or len(norm) < MIN_REMOTE_PREFIX:
+            return False
+        with self._lock:
+            if norm in self._remote_prefixes:
+                return False
+            for end in range(MIN_REMOTE_PREFIX, len(norm)):
+                if self._remote_prefixes.get(norm[:end]):
+                    return False
+        return True
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        Find titles containing a word that starts with the prefix. Titles that
+        start with the prefix come first.
+        Args:
+            prefix (str): The typed prefix.
+            limit (int): Maximum number of results.
+        Returns:
+            list: Dicts with 'title' and 'poster'.
+        """
+        norm = normalize_title(prefix)
+        if not norm:
+            return []
+        leading, inner = [], []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._keys, norm)
+            while (position < len(self._keys) and len(leading) < limit
+                   and len(leading) + len(inner) < limit * 5):
+                key = self._keys[position]
+                if not key.startswith(norm):
+                    break
+                position += 1
+                title_norm = key.split(_SEPARATOR, 1)[1]
+                if title_norm in seen:
+                    continue
+                seen.add(title_norm)
+                entry = self._entries[title_norm]
+                target = leading if title_norm.startswith(norm) else inner
+                target.append({'title': entry['title'], 'poster': entry['poster'] or ''})
+        return (leading + inner)[:limit]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _word_keys(norm: str):
+        words = norm.split(' ')
+        return [' '.join(words[i:]) + _SEPARATOR + norm for i in range(len(words))]
+
+
+def build_index(index: PrefixIndex, data_manager):
+    """
+    Fill the index with all local movie titles. Titles are read again if a
+    write event came in while they were read (up to ``MAX_BUILD_PASSES`` times;
+    after that ``built`` stays False and the next lookup starts a new build).
+    Args:
+        index (PrefixIndex): The index to fill.
+        data_manager: Data manager providing ``get_movie_titles``.
+    """
+    with index._build_lock:
+        for _ in range(MAX_BUILD_PASSES):
+            if index.built:
+                return
+            writes = index.write_count()
+            if index.replace_local(data_manager.get_movie_titles(), writes):
+                return
+
+
+def build_index_in_background(index: PrefixIndex, data_manager):
+    """
+    Start building the index in a daemon thread, unless it is already built or
+    being built. Until it is done, lookups only find OMDb results.
+    Args:
+        index (PrefixIndex): The index to fill.
+        data_manager: Data manager providing ``get_movie_titles``.
+    """
+    with index._lock:
+        if index.built or index._builder is not None:
+            return
+        index._builder = threading.Thread(
+            target=_build, args=(index, data_manager), name='autocomplete-index', daemon=True)
+        index._builder.start()
+
+
+def _build(index, data_manager):
+    try:
+        build_index(index, data_manager)
+    except Exception as e:
+        print(f"Error building the autocomplete index: {e}")
+    finally:
+        # Nach einem Fehler versucht es die nächste Anfrage erneut
+        index._builder = None
+
+
+def handle_write_event(index: PrefixIndex, event: str, data: dict, data_manager=None):
+    """
+    Data manager write listener keeping the index in sync incrementally. After
+    writes of another process ('data_changed') the local titles are read again
+    in the background. Events coming in while the index is not built are not
+    applied; they make the running build read the titles again.
+    Args:
+        index (PrefixIndex): The index to update.
+        event (str): The write event name.
+        data (dict): The event payload.
+        data_manager: Data manager to rebuild the index from.
+    """
+    if event == 'data_changed':
+        index.note_write()
+        index.built = False
+        if data_manager is not None:
+            build_index_in_background(index, data_manager)
+        return
+    if event not in TITLE_EVENTS:
+        return
+    index.note_write()
+    if not index.built:
+        return
+    if event == 'movie_added':
+        index.add(data['name'], data.get('omdb_poster'))
+    elif event == 'movies_added':
+        for movie in data['movies']:
+            index.add(movie['name'], movie.get('omdb_poster'))
+    elif event == 'movie_updated':
+        if data['old_name'] != data['name']:
+            index.remove(data['old_name'])
+            index.add(data['name'], data.get('omdb_poster'))
+        elif data.get('omdb_poster'):
+            index.add(data['name'], data['omdb_poster'], local=False)
+    elif event == 'movies_enriched':
+        for movie in data['movies']:
+            if movie.get('omdb_poster'):
+                index.add(movie['name'], movie['omdb_poster'], local=False)
+    elif event == 'movie_deleted':
+        index.remove(data['name'])
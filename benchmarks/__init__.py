@@ -0,0 +1,6 @@
+"""
+Reproducible benchmark suite: synthetic data generator, local OMDb stand-in and
+per-route / per-data-manager-method benchmarks with saved baselines.
+
+Run ``python -m benchmarks.run --help`` from the project root.
+"""
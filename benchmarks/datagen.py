@@ -0,0 +1,207 @@
+"""
+Synthetic data generator for benchmark databases.
+
+Users, catalog films, movies and reviews are generated deterministically from a seed and
+written with batched INSERTs (bypassing the data manager's duplicate checks and
+write listeners, which are not what is being measured). The schema, indexes and
+FTS triggers are created by ``SQLiteDataManager`` as usual, so the resulting
+database is identical in structure to a production one.
+
+Usage:
+    python -m benchmarks.datagen --scale large --db bench_large.db
+"""
+import os
+import random
+import time
+
+import click
+from sqlalchemy import insert, text
+
+from datamanager.enrichment_queue import enrichment_key
+from datamanager.models import User, CatalogMovie, Movie, Review
+from datamanager.sqlite_data_manager import SQLiteDataManager
+
+# users, movies, reviews
+SCALES = {
+    'tiny': (50, 2_000, 8_000),
+    'small': (500, 25_000, 100_000),
+    'medium': (2_000, 100_000, 400_000),
+    'large': (10_000, 500_000, 2_000_000),
+}
+DEFAULT_SEED = 42
+CHUNK_SIZE = 10_000
+# Anteil der Filme mit OMDb-Daten; der Rest gilt als "not_found" (keine Enrichment-Jobs)
+OMDB_SHARE = 0.7
+# Verschiedene Filme im Katalog je Film der Nutzer (mehrere Nutzer teilen sich einen Katalogeintrag)
+FILMS_PER_MOVIE = 0.2
+POSTER_URL = 'https://m.media-amazon.com/images/M/bench-{}.jpg'
+
+TITLE_WORDS = (
+    'Dark', 'Night', 'Star', 'River', 'Shadow', 'Storm', 'Last', 'Silent', 'Golden', 'Lost',
+    'Iron', 'Winter', 'Summer', 'City', 'Dream', 'Fire', 'Ocean', 'Ghost', 'Red', 'Blue',
+    'Empire', 'Heart', 'Kingdom', 'Road', 'Garden', 'Secret', 'Wild', 'Broken', 'Crystal', 'Hidden',
+    'Moon', 'Sun', 'Machine', 'Hunter', 'Island', 'Memory', 'Mirror', 'Echo', 'Journey', 'Legend',
+    'Matrix', 'Planet', 'Signal', 'Horizon', 'Valley', 'Thunder', 'Paper', 'Glass', 'Stone', 'Rain',
+)
+FIRST_NAMES = (
+    'Anna', 'Ben', 'Clara', 'David', 'Elena', 'Felix', 'Greta', 'Hugo', 'Ines', 'Jonas',
+    'Katja', 'Lukas', 'Mara', 'Niklas', 'Olga', 'Paul', 'Rosa', 'Simon', 'Tara', 'Viktor',
+)
+LAST_NAMES = (
+    'Novak', 'Berger', 'Costa', 'Dubois', 'Eriksen', 'Fischer', 'Garcia', 'Hoffmann', 'Ivanova', 'Jensen',
+    'Keller', 'Lang', 'Moreau', 'Nielsen', 'Ortiz', 'Petrov', 'Quinn', 'Richter', 'Sato', 'Tanaka',
+)
+REVIEW_PHRASES = (
+    'Great pacing and a strong cast.', 'The second half drags a little.', 'Beautifully shot.',
+    'Not my kind of movie.', 'A modern classic.', 'The soundtrack carries it.',
+    'Surprisingly funny.', 'Too long, but worth it.', 'Weak ending.', 'Would watch again.',
+)
+
+
+def random_title(rng: random.Random) -> str:
+    """
+    Generate a movie title from the title vocabulary.
+    Args:
+        rng (random.Random): Random source.
+    Returns:
+        str: A title such as 'The Silent River 2'.
+    """
+    words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+    title = ' '.join(words)
+    if rng.random() < 0.3:
+        title = f'The {title}'
+    if rng.random() < 0.15:
+        title = f'{title} {rng.randint(2, 5)}'
+    return title
+
+
+def _director(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _films(rng, count):
+    films = []
+    for n in range(1, count + 1):
+        title = random_title(rng)
+        year = rng.randint(1950, 2024)
+        films.append({
+            'id': n,
+            'imdb_id': f'tt{n:07d}',
+            'title': title,
+            'title_key': enrichment_key(title),
+            'omdb_poster': POSTER_URL.format(n),
+            'omdb_rating': f'{rng.uniform(1, 10):.1f}',
+            'omdb_director': _director(rng),
+            'omdb_year': str(year),
+            'updated_at': time.time(),
+            'omdb_fetched_at': time.time(),
+        })
+    return films
+
+
+def _movie_rows(rng, count, users, films):
+    for _ in range(count):
+        row = {
+            'name': random_title(rng),
+            'director': _director(rng),
+            'year': rng.randint(1950, 2024),
+            'rating': round(rng.uniform(1, 10), 1),
+            'user_id': rng.randint(1, users),
+            'catalog_id': None,
+            'enrichment_status': 'not_found',
+        }
+        if films and rng.random() < OMDB_SHARE:
+            film = rng.choice(films)
+            row.update(name=film['title'], director=film['omdb_director'], year=int(film['omdb_year']),
+                       catalog_id=film['id'], enrichment_status='done')
+        yield row
+
+
+def _review_rows(rng, count, users, movie_ids):
+    for _ in range(count):
+        yield {
+            'user_id': rng.randint(1, users),
+            'movie_id': rng.choice(movie_ids),
+            'review_text': ' '.join(rng.sample(REVIEW_PHRASES, rng.randint(1, 3))),
+            'rating': round(rng.uniform(1, 10), 1),
+        }
+
+
+def _insert_chunked(connection, statement, rows):
+    inserted = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            inserted += connection.execute(statement, chunk).rowcount
+            chunk = []
+    if chunk:
+        inserted += connection.execute(statement, chunk).rowcount
+    return inserted
+
+
+def generate_database(db_file: str, users: int, movies: int, reviews: int,
+                      seed: int = DEFAULT_SEED, progress=print):
+    """
+    Create a benchmark database with synthetic users, movies and reviews.
+    Args:
+        db_file (str): Path of the SQLite file (must not exist yet).
+        users (int): Number of users.
+        movies (int): Number of movies to generate (duplicates per user are skipped).
+        reviews (int): Number of reviews.
+        seed (int): Random seed; the same seed yields the same database.
+        progress (callable): Receives progress messages.
+    Returns:
+        dict: Row counts per table ('users', 'films', 'movies', 'reviews').
+    Raises:
+        FileExistsError: If the database file already exists.
+    """
+    if os.path.exists(db_file):
+        raise FileExistsError(f'{db_file} already exists')
+    rng = random.Random(seed)
+    # Schema, Indexe und FTS-Trigger wie in Produktion; nur beim Befüllen ohne fsync
+    data_manager = SQLiteDataManager(db_file, engine_profile={'synchronous': 'OFF'})
+    started = time.perf_counter()
+    counts = {}
+    with data_manager.engine.begin() as connection:
+        counts['users'] = _insert_chunked(connection, insert(User.__table__), (
+            {'name': f'user{n:06d}'} for n in range(1, users + 1)))
+        progress(f"users: {counts['users']} ({time.perf_counter() - started:.1f}s)")
+        films = _films(rng, max(1, int(movies * FILMS_PER_MOVIE)) if movies else 0)
+        counts['films'] = _insert_chunked(connection, insert(CatalogMovie.__table__), films)
+        progress(f"films: {counts['films']} ({time.perf_counter() - started:.1f}s)")
+        counts['movies'] = _insert_chunked(
+            connection, insert(Movie.__table__).prefix_with('OR IGNORE'), _movie_rows(rng, movies, users, films))
+        progress(f"movies: {counts['movies']} ({time.perf_counter() - started:.1f}s)")
+        movie_ids = [row[0] for row in connection.execute(text('SELECT id FROM movies'))]
+        counts['reviews'] = _insert_chunked(
+            connection, insert(Review.__table__), _review_rows(rng, reviews, users, movie_ids))
+        progress(f"reviews: {counts['reviews']} ({time.perf_counter() - started:.1f}s)")
+    with data_manager.engine.connect() as connection:
+        connection.execute(text('ANALYZE'))
+        connection.commit()
+    data_manager.engine.dispose()
+    progress(f"Done in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
+@click.command()
+@click.option('--db', 'db_file', required=True, type=click.Path(dir_okay=False),
+              help='SQLite file to create.')
+@click.option('--scale', type=click.Choice(sorted(SCALES)), default='small', show_default=True,
+              help='Preset data volume.')
+@click.option('--users', type=int, help='Override the number of users.')
+@click.option('--movies', type=int, help='Override the number of movies.')
+@click.option('--reviews', type=int, help='Override the number of reviews.')
+@click.option('--seed', type=int, default=DEFAULT_SEED, show_default=True)
+def main(db_file, scale, users, movies, reviews, seed):
+    """
+    Generate a synthetic benchmark database.
+    """
+    preset_users, preset_movies, preset_reviews = SCALES[scale]
+    generate_database(db_file, users or preset_users, movies or preset_movies,
+                      reviews or preset_reviews, seed, progress=click.echo)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Local stand-in for the OMDb API with configurable latency and error rates.
+
+Answers ``?t=`` (title lookup), ``?i=`` (lookup of an imdbID handed out by an
+earlier title lookup) and ``?s=`` (search) like OMDb does. Answers are derived
+deterministically from the query, so repeated runs see the same data.
+Point the app at it with ``OMDB_URL=http://127.0.0.1:<port>/`` and any non-empty
+``OMDB_API_KEY``.
+
+Usage:
+    python -m benchmarks.fake_omdb --port 8099 --latency 0.08 --error-rate 0.02
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import click
+
+from benchmarks.datagen import FIRST_NAMES, LAST_NAMES, TITLE_WORDS
+
+NOT_FOUND = {'Response': 'False', 'Error': 'Movie not found!'}
+SEARCH_RESULTS = 10
+
+
+class _Server(ThreadingHTTPServer):
+    # Standard-Backlog ist 5; bei vielen parallelen Verbindungen gehen sonst SYNs verloren
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def _seed(query):
+    return int.from_bytes(hashlib.blake2b(query.lower().encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def movie_for_title(title: str):
+    """
+    Build the OMDb answer of a title lookup.
+    Args:
+        title (str): The requested title.
+    Returns:
+        dict: OMDb-style movie JSON (always found).
+    """
+    rng = random.Random(_seed(title))
+    imdb_id = f'tt{rng.randint(1000000, 9999999)}'
+    return {
+        'Title': title.strip().title(),
+        'Year': str(rng.randint(1950, 2024)),
+        'Director': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        'Poster': f'https://m.media-amazon.com/images/M/{imdb_id}.jpg',
+        'imdbRating': f'{rng.uniform(1, 10):.1f}',
+        'imdbID': imdb_id,
+        'Type': 'movie',
+        'Response': 'True',
+    }
+
+
+def search_results(query: str):
+    """
+    Build the OMDb answer of a search.
+    Args:
+        query (str): The search string.
+    Returns:
+        dict: OMDb-style search JSON with up to 10 results.
+    """
+    rng = random.Random(_seed(query))
+    total = rng.choice((0, 3, 10, 42, 250))
+    if not total:
+        return NOT_FOUND
+    results = []
+    for _ in range(min(total, SEARCH_RESULTS)):
+        movie = movie_for_title(f"{query.strip()} {' '.join(rng.sample(TITLE_WORDS, 2))}")
+        results.append({key: movie[key] for key in ('Title', 'Year', 'imdbID', 'Type', 'Poster')})
+    return {'Search': results, 'totalResults': str(total), 'Response': 'True'}
+
+
+class FakeOMDbServer:
+    """
+    Threaded HTTP server imitating OMDb.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, not_found_rate: float = 0.0,
+                 seed: int = 0):
+        """
+        Configure the server (call ``start`` to run it).
+        Args:
+            host (str): Interface to bind.
+            port (int): Port (0 picks a free one).
+            latency (float): Base delay of every answer in seconds.
+            jitter (float): Additional uniformly distributed delay in seconds.
+            error_rate (float): Share of requests answered with HTTP 503.
+            not_found_rate (float): Share of title lookups answered with "Movie not found!".
+            seed (int): Seed of the latency and error randomness.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'not_found': 0}
+        # imdbID -> Titel der Suche, die die ID geliefert hat
+        self._titles = {}
+        self._server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as ``OMDB_URL``."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self):
+        """
+        Serve in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-omdb', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Shut the server down.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        """
+        Serve in the current thread until interrupted.
+        """
+        self._server.serve_forever()
+
+    def answer(self, params):
+        """
+        Decide the answer to a request (after the simulated latency).
+        Args:
+            params (dict): Query parameters (single values).
+        Returns:
+            tuple: (HTTP status, JSON body).
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.error_rate
+            missing = self._rng.random() < self.not_found_rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            self._count('errors')
+            return 503, {'Response': 'False', 'Error': 'Service unavailable'}
+        if not params.get('apikey'):
+            return 401, {'Response': 'False', 'Error': 'No API key provided.'}
+        if params.get('t'):
+            if missing:
+                self._count('not_found')
+                return 200, NOT_FOUND
+            movie = movie_for_title(params['t'])
+            with self._lock:
+                self._titles[movie['imdbID']] = params['t']
+            return 200, movie
+        if params.get('i'):
+            with self._lock:
+                title = self._titles.get(params['i'])
+            if title is not None:
+                return 200, movie_for_title(title)
+        if params.get('s'):
+            return 200, search_results(params['s'])
+        return 200, {'Response': 'False', 'Error': 'Incorrect IMDb ID.'}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Header und Body gehen getrennt raus; ohne TCP_NODELAY kostet das ~40 ms Delayed-ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                status, body = server.answer(params)
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', type=int, default=8099, show_default=True)
+@click.option('--latency', type=float, default=0.0, show_default=True, help='Base delay in seconds.')
+@click.option('--jitter', type=float, default=0.0, show_default=True, help='Extra random delay in seconds.')
+@click.option('--error-rate', type=float, default=0.0, show_default=True, help='Share of HTTP 503 answers.')
+@click.option('--not-found-rate', type=float, default=0.0, show_default=True,
+              help='Share of "Movie not found!" title lookups.')
+@click.option('--seed', type=int, default=0, show_default=True)
+def main(host, port, latency, jitter, error_rate, not_found_rate, seed):
+    """
+    Run the fake OMDb server in the foreground.
+    """
+    server = FakeOMDbServer(host, port, latency, jitter, error_rate, not_found_rate, seed)
+    click.echo(f'Fake OMDb listening on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Timing, percentile statistics and baseline comparison for the benchmarks.
+"""
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Relative Verschlechterung von p50/p95 bzw. Durchsatz, ab der ein Fall als Regression gilt
+DEFAULT_THRESHOLD = 0.15
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    Args:
+        sorted_values (list): Sorted samples.
+        fraction (float): Percentile as a fraction (e.g. 0.95).
+    Returns:
+        float: The percentile, or 0.0 for no samples.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(operation, iterations: int, warmup: int = 0, concurrency: int = 1):
+    """
+    Run an operation repeatedly and collect latency statistics.
+    Args:
+        operation (callable): Called with the iteration number; returns True on
+            success or False for an error (exceptions also count as errors).
+        iterations (int): Number of measured calls.
+        warmup (int): Number of unmeasured calls before.
+        concurrency (int): Number of threads calling concurrently.
+    Returns:
+        dict: 'iterations', 'errors', 'seconds', 'throughput' (calls per second)
+        and 'mean', 'p50', 'p95', 'p99', 'max' latencies in milliseconds.
+    """
+    for n in range(warmup):
+        _call(operation, -1 - n)
+
+    def timed(n):
+        started = time.perf_counter()
+        ok = _call(operation, n)
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(timed, range(iterations)))
+    else:
+        samples = [timed(n) for n in range(iterations)]
+    elapsed = time.perf_counter() - started
+    latencies = sorted(seconds * 1000 for seconds, _ in samples)
+    return {
+        'iterations': iterations,
+        'errors': sum(1 for _, ok in samples if not ok),
+        'seconds': round(elapsed, 4),
+        'throughput': round(iterations / elapsed, 2) if elapsed else 0.0,
+        'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'p50': round(percentile(latencies, 0.50), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+        'p99': round(percentile(latencies, 0.99), 3),
+        'max': round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def _call(operation, n):
+    try:
+        return operation(n) is not False
+    except Exception as e:
+        print(f"Benchmark call failed: {e}")
+        return False
+
+
+def environment_info():
+    """
+    Describe the machine and code version a run was made on.
+    Returns:
+        dict: Python, SQLite and platform versions and the git commit.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+    }
+
+
+def save_baseline(path: str, results, meta):
+    """
+    Write the results of a run as a baseline file.
+    Args:
+        path (str): Target JSON file (directories are created).
+        results (dict): Case name -> statistics from ``measure``.
+        meta (dict): Run parameters (scale, row counts, environment).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str):
+    """
+    Read a baseline file.
+    Args:
+        path (str): JSON file written by ``save_baseline``.
+    Returns:
+        dict: With 'meta' and 'results'.
+    """
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline_results, results, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Compare a run against a baseline.
+    Args:
+        baseline_results (dict): Case name -> statistics of the baseline.
+        results (dict): Case name -> statistics of the current run.
+        threshold (float): Relative change regarded as a regression.
+    Returns:
+        list: One dict per common case with 'name', the p50/p95/throughput ratios
+        (current / baseline) and 'regression' (bool).
+    """
+    rows = []
+    for name in sorted(set(baseline_results) & set(results)):
+        old, new = baseline_results[name], results[name]
+        ratios = {metric: (new[metric] / old[metric] if old[metric] else 1.0)
+                  for metric in ('p50', 'p95', 'throughput')}
+        regression = (ratios['p50'] > 1 + threshold or ratios['p95'] > 1 + threshold
+                      or ratios['throughput'] < 1 - threshold or new['errors'] > old['errors'])
+        rows.append(dict(ratios, name=name, regression=regression))
+    return rows
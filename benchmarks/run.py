@@ -0,0 +1,220 @@
+"""
+Benchmark runner: per-route and per-data-manager-method latency and throughput.
+
+Generates the benchmark database if needed, starts the fake OMDb server and
+points the app at both through the environment before importing it. Routes are
+exercised in-process through Flask's test client, so the numbers cover the
+application and database, not a WSGI server or the network.
+
+Usage:
+    python -m benchmarks.run --scale small --save-baseline small
+    python -m benchmarks.run --scale small --compare small --fail-on-regression
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+
+import click
+
+from benchmarks.datagen import SCALES, DEFAULT_SEED, TITLE_WORDS, generate_database
+from benchmarks.fake_omdb import FakeOMDbServer
+from benchmarks.harness import (DEFAULT_THRESHOLD, measure, environment_info, save_baseline,
+                                load_baseline, compare)
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+PAGE_SIZE = 24
+
+
+def _query(rng):
+    return ' '.join(rng.sample(TITLE_WORDS, rng.randint(1, 2)))
+
+
+def _prefix(rng):
+    return rng.choice(TITLE_WORDS)[:rng.randint(2, 4)]
+
+
+# name -> function(rng, context, n) returning the request path
+ROUTE_CASES = {
+    'route: /': lambda rng, ctx, n: '/',
+    'route: /?page=N': lambda rng, ctx, n: f'/?page={rng.randint(2, 200)}',
+    'route: /users': lambda rng, ctx, n: '/users',
+    'route: /users/<id>': lambda rng, ctx, n: f"/users/{rng.randint(1, ctx['users'])}",
+    'route: /movies/<id>/reviews': lambda rng, ctx, n: f"/movies/{rng.randint(1, ctx['max_movie_id'])}/reviews",
+    'route: /search (local)': lambda rng, ctx, n: f'/search?q={_query(rng)}',
+    # Eindeutige Suchbegriffe: verfehlen DB und OMDb-Cache, gehen also an den (Fake-)OMDb-Server
+    'route: /search (OMDb)': lambda rng, ctx, n: f'/search?q=zqx{rng.randint(0, 10 ** 9)}',
+    'route: /autocomplete_movie_title': lambda rng, ctx, n: f'/autocomplete_movie_title?q={_prefix(rng)}',
+}
+
+# name -> function(data_manager, rng, context) performing one call
+DATAMANAGER_CASES = {
+    'dm: get_all_users': lambda dm, rng, ctx: dm.get_all_users(),
+    'dm: get_user': lambda dm, rng, ctx: dm.get_user(rng.randint(1, ctx['users'])),
+    'dm: get_user_movies': lambda dm, rng, ctx: dm.get_user_movies(rng.randint(1, ctx['users'])),
+    'dm: get_movies_page (offset)': lambda dm, rng, ctx: dm.get_movies_page(rng.randint(1, 200), PAGE_SIZE),
+    'dm: get_movies_page (keyset)': lambda dm, rng, ctx: dm.get_movies_page(
+        1, PAGE_SIZE, after_id=rng.randint(1, ctx['max_movie_id'])),
+    'dm: get_user_movies_page': lambda dm, rng, ctx: dm.get_user_movies_page(
+        rng.randint(1, ctx['users']), 1, PAGE_SIZE),
+    'dm: get_movie': lambda dm, rng, ctx: dm.get_movie(rng.randint(1, ctx['max_movie_id'])),
+    'dm: get_reviews_for_movie': lambda dm, rng, ctx: dm.get_reviews_for_movie(
+        rng.randint(1, ctx['max_movie_id'])),
+    'dm: get_reviews_for_user': lambda dm, rng, ctx: dm.get_reviews_for_user(rng.randint(1, ctx['users'])),
+    'dm: search_movies': lambda dm, rng, ctx: dm.search_movies(_query(rng)),
+}
+
+
+def database_context(db_file):
+    """
+    Read the row counts the cases draw their IDs from.
+    Args:
+        db_file (str): Benchmark database.
+    Returns:
+        dict: 'users', 'movies', 'reviews' and 'max_movie_id'.
+    """
+    connection = sqlite3.connect(db_file)
+    try:
+        context = {table: connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                   for table in ('users', 'movies', 'reviews')}
+        context['max_movie_id'] = connection.execute('SELECT MAX(id) FROM movies').fetchone()[0] or 1
+    finally:
+        connection.close()
+    return context
+
+
+def configure_environment(db_file, omdb_url, page_cache):
+    """
+    Point the app at the benchmark database and the fake OMDb server. Must run
+    before ``app`` is imported.
+    """
+    os.environ.update({
+        'DATABASE_FILE': db_file,
+        'OMDB_URL': omdb_url,
+        'OMDB_API_KEY': 'benchmark',
+        'OMDB_CACHE_DB': '',
+        'OMDB_RATE_LIMIT': '0',
+        'ENRICHMENT_WORKERS': '0',
+        'PAGE_CACHE_SIZE': os.environ.get('PAGE_CACHE_SIZE', '512') if page_cache else '0',
+        'POSTER_CACHE_DIR': tempfile.mkdtemp(prefix='bench-posters-'),
+    })
+
+
+def route_operation(flask_app, paths):
+    """
+    Build a ``measure`` operation requesting the precomputed paths, one test
+    client per thread.
+    """
+    local = threading.local()
+
+    def operation(n):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = flask_app.test_client()
+        response = client.get(paths[n])
+        return response.status_code < 400
+    return operation
+
+
+def _select(cases, patterns):
+    if not patterns:
+        return list(cases)
+    return [name for name in cases if any(pattern in name for pattern in patterns)]
+
+
+def _print_results(results):
+    click.echo(f"{'case':<38} {'iter':>6} {'err':>4} {'req/s':>9} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, stats in results.items():
+        click.echo(f"{name:<38} {stats['iterations']:>6} {stats['errors']:>4} {stats['throughput']:>9.1f} "
+                   f"{stats['mean']:>8.2f} {stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['p99']:>8.2f}")
+    click.echo('(latencies in ms)')
+
+
+def _baseline_path(name):
+    return name if name.endswith('.json') else os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+@click.command()
+@click.option('--db', 'db_file', type=click.Path(dir_okay=False),
+              help='Benchmark database (default: bench_<scale>.db, generated if missing).')
+@click.option('--scale', type=click.Choice(sorted(SCALES)), default='small', show_default=True)
+@click.option('--seed', type=int, default=DEFAULT_SEED, show_default=True)
+@click.option('--suite', type=click.Choice(['all', 'routes', 'datamanager']), default='all', show_default=True)
+@click.option('--only', multiple=True, help='Only run cases whose name contains this text (repeatable).')
+@click.option('--iterations', type=int, default=200, show_default=True)
+@click.option('--warmup', type=int, default=20, show_default=True)
+@click.option('--concurrency', type=int, default=1, show_default=True, help='Threads issuing calls.')
+@click.option('--page-cache/--no-page-cache', default=False, show_default=True,
+              help='Measure routes with the rendered-page cache enabled.')
+@click.option('--omdb-latency', type=float, default=0.05, show_default=True, help='Fake OMDb delay in seconds.')
+@click.option('--omdb-jitter', type=float, default=0.02, show_default=True)
+@click.option('--omdb-error-rate', type=float, default=0.0, show_default=True)
+@click.option('--save-baseline', 'save_name', help='Save the results as baseline (name or .json path).')
+@click.option('--compare', 'compare_name', help='Compare against a saved baseline (name or .json path).')
+@click.option('--threshold', type=float, default=DEFAULT_THRESHOLD, show_default=True,
+              help='Relative slowdown regarded as a regression.')
+@click.option('--fail-on-regression', is_flag=True, help='Exit with status 1 if a case regressed.')
+def main(db_file, scale, seed, suite, only, iterations, warmup, concurrency, page_cache, omdb_latency,
+         omdb_jitter, omdb_error_rate, save_name, compare_name, threshold, fail_on_regression):
+    """
+    Run the benchmarks and report throughput and p50/p95/p99 latencies.
+    """
+    db_file = db_file or f'bench_{scale}.db'
+    if not os.path.exists(db_file):
+        click.echo(f'Generating {db_file} ({scale})...')
+        generate_database(db_file, *SCALES[scale], seed=seed, progress=click.echo)
+    context = database_context(db_file)
+    omdb = FakeOMDbServer(latency=omdb_latency, jitter=omdb_jitter, error_rate=omdb_error_rate, seed=seed)
+    omdb.start()
+    configure_environment(os.path.abspath(db_file), omdb.url, page_cache)
+    # Erst jetzt importieren: app.py liest die Konfiguration beim Import
+    from app import app as flask_app
+    data_manager = flask_app.extensions['data_manager']
+
+    cases = []
+    if suite in ('all', 'routes'):
+        for name in _select(ROUTE_CASES, only):
+            rng = random.Random(f'{seed}:{name}')
+            # Pfade vorab erzeugen: gleiche Folge in jedem Lauf, keine Zufallskosten in der Messung
+            paths = [ROUTE_CASES[name](rng, context, n) for n in range(iterations + warmup)]
+            cases.append((name, route_operation(flask_app, paths)))
+    if suite in ('all', 'datamanager'):
+        for name in _select(DATAMANAGER_CASES, only):
+            call = DATAMANAGER_CASES[name]
+            rngs = [random.Random(f'{seed}:{name}:{n}') for n in range(iterations + warmup)]
+            cases.append((name, lambda n, call=call, rngs=rngs: call(data_manager, rngs[n], context) is not None))
+
+    results = {}
+    try:
+        for name, operation in cases:
+            results[name] = measure(operation, iterations, warmup, concurrency)
+            click.echo(f"{name}: p50 {results[name]['p50']:.2f} ms, {results[name]['throughput']:.1f}/s", err=True)
+    finally:
+        omdb.stop()
+    click.echo(f"\nscale={scale} users={context['users']} movies={context['movies']} "
+               f"reviews={context['reviews']} concurrency={concurrency} page_cache={page_cache}")
+    _print_results(results)
+
+    meta = dict(environment_info(), scale=scale, seed=seed, iterations=iterations, concurrency=concurrency,
+                page_cache=page_cache, omdb_latency=omdb_latency, rows=context)
+    if save_name:
+        path = _baseline_path(save_name)
+        save_baseline(path, results, meta)
+        click.echo(f'Baseline saved to {path}')
+    if compare_name:
+        baseline = load_baseline(_baseline_path(compare_name))
+        if baseline['meta'].get('rows') != context:
+            click.echo('Warning: the baseline was recorded on a different data set.')
+        rows = compare(baseline['results'], results, threshold)
+        click.echo(f"\n{'case':<38} {'p50':>7} {'p95':>7} {'req/s':>7}")
+        for row in rows:
+            click.echo(f"{row['name']:<38} {row['p50']:>6.2f}x {row['p95']:>6.2f}x {row['throughput']:>6.2f}x"
+                       f"{'  REGRESSION' if row['regression'] else ''}")
+        if fail_on_regression and any(row['regression'] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
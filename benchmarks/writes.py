@@ -0,0 +1,96 @@
+"""
+Write throughput benchmark: one file versus shards, across processes.
+
+Every worker process opens its own data manager (as one server worker would)
+and adds movies for its own users; the workers start together and the total
+number of committed movies per second is reported. Processes, not threads, so
+the measurement is not bounded by one interpreter lock and uses all cores.
+
+Usage:
+    python -m benchmarks.writes --processes 1 --processes 4 --shards 0 --shards 4
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import click
+
+from benchmarks.harness import environment_info
+
+
+def _open(db_file, shards, synchronous):
+    from datamanager.sqlite_data_manager import SQLiteDataManager
+    from datamanager.sharded_sqlite_data_manager import ShardedSQLiteDataManager
+    profile = {'synchronous': synchronous}
+    if shards:
+        return ShardedSQLiteDataManager(db_file, shards, profile)
+    return SQLiteDataManager(db_file, profile)
+
+
+def _worker(db_file, shards, synchronous, user_ids, movies, start):
+    data_manager = _open(db_file, shards, synchronous)
+    start.wait()
+    for n in range(movies):
+        for user_id in user_ids:
+            data_manager.add_movie({'name': f'Movie {user_id}-{n}', 'director': 'Benchmark', 'year': 2000,
+                                    'rating': 5.0, 'user_id': user_id})
+
+
+def measure_writes(directory, processes, shards, users_per_process, movies, synchronous):
+    """
+    Add ``movies`` movies per user from ``processes`` processes at once.
+    Returns:
+        dict: 'writes', 'seconds' and 'throughput' (committed movies per second).
+    """
+    db_file = os.path.join(directory, f'writes_{processes}p_{shards}s.db')
+    setup = _open(db_file, shards, synchronous)
+    user_ids = [setup.add_user({'name': f'writer {n}'}).id for n in range(processes * users_per_process)]
+    start = multiprocessing.Event()
+    workers = [multiprocessing.Process(target=_worker, args=(
+        db_file, shards, synchronous, user_ids[n::processes], movies, start)) for n in range(processes)]
+    for worker in workers:
+        worker.start()
+    # Öffnen der Datenbank in den Workern gehört nicht zur Messung
+    time.sleep(1.0)
+    started = time.perf_counter()
+    start.set()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    writes = len(user_ids) * movies
+    return {'writes': writes, 'seconds': round(elapsed, 3), 'throughput': round(writes / elapsed, 1)}
+
+
+@click.command()
+@click.option('--processes', multiple=True, type=int, default=(1, 4), show_default=True,
+              help='Writer processes (repeatable).')
+@click.option('--shards', multiple=True, type=int, default=(0, 4), show_default=True,
+              help='Shard count, 0 for a single file (repeatable).')
+@click.option('--users', 'users_per_process', type=int, default=4, show_default=True,
+              help='Users per process.')
+@click.option('--movies', type=int, default=100, show_default=True, help='Movies per user.')
+@click.option('--synchronous', type=click.Choice(['OFF', 'NORMAL', 'FULL']), default='NORMAL', show_default=True)
+def main(processes, shards, users_per_process, movies, synchronous):
+    """
+    Measure committed movie inserts per second for every combination of
+    writer processes and shard count.
+    """
+    info = environment_info()
+    click.echo(f"cpus={info['cpus']} sqlite={info['sqlite']} synchronous={synchronous} commit={info['commit']}")
+    click.echo(f"{'processes':>9} {'shards':>6} {'writes':>7} {'seconds':>8} {'writes/s':>9}")
+    directory = tempfile.mkdtemp(prefix='bench-writes-')
+    try:
+        for process_count in processes:
+            for shard_count in shards:
+                result = measure_writes(directory, process_count, shard_count, users_per_process, movies,
+                                        synchronous)
+                click.echo(f"{process_count:>9} {shard_count or '-':>6} {result['writes']:>7} "
+                           f"{result['seconds']:>8.2f} {result['throughput']:>9.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
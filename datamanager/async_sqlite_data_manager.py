@@ -0,0 +1,486 @@
+"""
+Async data manager for the ASGI serving mode.
+
+Reads run on SQLAlchemy's asyncio extension with the aiosqlite driver, so a
+coroutine waiting for SQLite does not hold a request thread (aiosqlite uses one
+thread per pooled connection, bounded by the pool size). Writes are delegated
+to the synchronous ``SQLiteDataManager`` in a worker thread: duplicate checks,
+the enrichment queue and the write listeners (page cache, data cache,
+autocomplete index, poster warm-up) then stay in one place, and SQLite only
+admits one writer anyway.
+
+All methods of the interface are coroutines here. Requires the optional
+``aiosqlite`` package.
+"""
+import asyncio
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from datamanager.data_manager_interface import DataManagerInterface
+from datamanager.engine import load_engine_profile, install_pragmas
+from datamanager.models import User, Movie, Review, CatalogMovie
+from datamanager.pagination import CountCache, Page
+from datamanager.rows import projection
+from datamanager.search_index import search_movie_ids_statement
+from datamanager.sqlite_data_manager import SEARCH_LIMIT, STREAM_BATCH_SIZE
+
+try:
+    import aiosqlite
+except ImportError:  # aiosqlite ist nur für den ASGI-Modus nötig
+    aiosqlite = None
+
+
+def create_async_sqlite_engine(db_file_name, profile=None):
+    """
+    Create an async engine (aiosqlite) with the same pragmas and pool limits as
+    ``create_sqlite_engine``.
+    Args:
+        db_file_name (str): The SQLite database file name.
+        profile (dict): Overrides for the engine profile.
+    Returns:
+        AsyncEngine: The configured engine.
+    Raises:
+        RuntimeError: If aiosqlite is not installed.
+    """
+    if aiosqlite is None:
+        raise RuntimeError('The async data manager requires aiosqlite (pip install -r requirements-async.txt)')
+    profile = load_engine_profile(profile)
+    engine = create_async_engine(
+        f'sqlite+aiosqlite:///{db_file_name}',
+        connect_args={'timeout': profile['busy_timeout'] / 1000},
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=profile['pool_size'],
+        max_overflow=profile['max_overflow'],
+        pool_timeout=profile['pool_timeout'],
+        pool_recycle=profile['pool_recycle'])
+    install_pragmas(engine.sync_engine, profile)
+    return engine
+
+
+class AsyncSQLiteDataManager(DataManagerInterface):
+    """
+    Asyncio implementation of the data manager interface on top of a
+    synchronous ``SQLiteDataManager`` (which owns the schema and all writes).
+    """
+
+    def __init__(self, sync_manager, engine_profile=None):
+        """
+        Initialize the async data manager for the database of a sync manager.
+        Args:
+            sync_manager (SQLiteDataManager): Manager whose database is used and
+                to which writes are delegated.
+            engine_profile (dict): Overrides for the engine profile.
+        """
+        self.sync = sync_manager
+        self.engine = create_async_sqlite_engine(sync_manager.engine.url.database, engine_profile)
+        self.Session = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.fts_enabled = sync_manager.fts_enabled
+        # Gecachte COUNT(*)-Ergebnisse, bei jedem Schreibzugriff (über den Sync-Manager) geleert
+        self._counts = CountCache()
+        sync_manager.add_listener(lambda event_name, data: self._counts.clear())
+
+    async def dispose(self):
+        """
+        Close all pooled connections.
+        """
+        await self.engine.dispose()
+
+    def add_listener(self, listener):
+        """
+        Register a write listener (on the sync manager, which performs the writes).
+        """
+        self.sync.add_listener(listener)
+
+    async def _scalars(self, statement):
+        async with self.Session() as session:
+            return list((await session.scalars(statement)).all())
+
+    async def get_all_users(self):
+        """
+        Retrieve all users from the database.
+        Returns:
+            list: A list of User objects.
+        """
+        return await self._scalars(select(User))
+
+    async def get_user(self, user_id):
+        """
+        Retrieve a single user by ID.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            User: The User object, or None if not found.
+        """
+        return await self._get(User, user_id)
+
+    async def get_movie(self, movie_id):
+        """
+        Retrieve a single movie by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            Movie: The Movie object, or None if not found.
+        """
+        return await self._get(Movie, movie_id)
+
+    async def get_review(self, review_id):
+        """
+        Retrieve a single review by ID.
+        Args:
+            review_id (int): The ID of the review.
+        Returns:
+            Review: The Review object, or None if not found.
+        """
+        return await self._get(Review, review_id)
+
+    async def _get(self, model, key):
+        async with self.Session() as session:
+            return await session.get(model, key)
+
+    async def get_user_movies(self, user_id):
+        """
+        Retrieve all movies for a specific user.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            list: A list of Movie objects for the user.
+        """
+        return await self._scalars(select(Movie).filter_by(user_id=user_id))
+
+    async def get_reviews_for_movie(self, movie_id):
+        """
+        Retrieve all reviews for a specific movie.
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            list: A list of Review objects for the movie.
+        """
+        return await self._scalars(select(Review).filter_by(movie_id=movie_id))
+
+    async def get_reviews_for_user(self, user_id):
+        """
+        Retrieve all reviews written by a specific user.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            list: A list of Review objects by the user.
+        """
+        return await self._scalars(select(Review).filter_by(user_id=user_id))
+
+    async def search_movies(self, query, limit=SEARCH_LIMIT):
+        """
+        Search movies by title, director or year (same ranking as the sync manager:
+        FTS5 with bm25, or LIKE if FTS5 is not available).
+        Args:
+            query (str): The search string.
+            limit (int): Maximum number of results.
+        Returns:
+            list: A list of Movie objects, best match first.
+        """
+        async with self.Session() as session:
+            if not self.fts_enabled:
+                like_query = f'%{query}%'
+                statement = select(Movie).where(or_(
+                    Movie.name.ilike(like_query), Movie.director.ilike(like_query),
+                    Movie.year.ilike(like_query))).limit(limit)
+                return list((await session.scalars(statement)).all())
+            ids = []
+            lookup = search_movie_ids_statement(query, limit)
+            if lookup is not None:
+                ids = [row[0] for row in await session.execute(*lookup)]
+            year = query.strip()
+            if year.isdigit() and len(ids) < limit:
+                year_ids = await session.scalars(select(Movie.id).where(
+                    Movie.year == int(year), Movie.id.notin_(ids)).limit(limit - len(ids)))
+                ids += list(year_ids)
+            if not ids:
+                return []
+            movies_by_id = {m.id: m for m in await session.scalars(select(Movie).where(Movie.id.in_(ids)))}
+        return [movies_by_id[i] for i in ids if i in movies_by_id]
+
+    async def get_movies_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all movies, ordered by ID.
+        Args:
+            page (int): The 1-based page number (used for OFFSET when no cursor is given).
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return await self._paginate(Movie, page, per_page, after_id)
+
+    async def get_catalog_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of films on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this catalog ID.
+        Returns:
+            Page: The CatalogMovie objects on the page plus the total count and next cursor.
+        """
+        return await self._paginate(CatalogMovie, page, per_page, after_id)
+
+    async def get_users_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all users, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of users on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this user ID.
+        Returns:
+            Page: The users on the page plus the total count and next cursor.
+        """
+        return await self._paginate(User, page, per_page, after_id)
+
+    async def get_user_movies_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the movies of a specific user, ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return await self._paginate(Movie, page, per_page, after_id, user_id=user_id)
+
+    async def get_reviews_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a specific movie, ordered by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return await self._paginate(Review, page, per_page, after_id, movie_id=movie_id)
+
+    async def get_reviews_for_user_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews written by a specific user, ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return await self._paginate(Review, page, per_page, after_id, user_id=user_id)
+
+    async def get_reviews_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all reviews, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return await self._paginate(Review, page, per_page, after_id)
+
+    async def get_user_rows(self, user_ids=None):
+        """
+        Retrieve the ID and name of users, ordered by ID.
+        Args:
+            user_ids (iterable): Only these users, or None for all users.
+        Returns:
+            list: A list of UserRow tuples.
+        """
+        _, statement, row = projection('users')
+        if user_ids is not None:
+            statement = statement.where(User.id.in_(set(user_ids)))
+        async with self.Session() as session:
+            return [row(*values) for values in await session.execute(statement)]
+
+    async def get_user_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of users as UserRow tuples, ordered by ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return await self._paginate_rows('users', page, per_page, after_id)
+
+    async def get_catalog_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog as FilmRow tuples, ordered by ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return await self._paginate_rows('films', page, per_page, after_id)
+
+    async def get_user_movie_rows_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of a user's movies as MovieRow tuples, ordered by ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return await self._paginate_rows('movies', page, per_page, after_id, user_id=user_id)
+
+    async def get_review_rows_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a movie as ReviewRow tuples, ordered by ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return await self._paginate_rows('reviews', page, per_page, after_id, movie_id=movie_id)
+
+    async def _paginate_rows(self, kind, page, per_page, after_id, **filters):
+        """
+        Paginated projection query, like ``SQLiteDataManager._paginate_rows``.
+        """
+        page = max(1, int(page or 1))
+        per_page = max(1, int(per_page))
+        model, statement, row = projection(kind, after_id, **filters)
+        if after_id is None:
+            statement = statement.offset((page - 1) * per_page)
+        async with self.Session() as session:
+            items = [row(*values) for values in await session.execute(statement.limit(per_page + 1))]
+            total = await self._total(session, model, filters)
+        next_cursor = items[per_page - 1].id if len(items) > per_page else None
+        return Page(items[:per_page], total, page, per_page, next_cursor)
+
+    async def _paginate(self, model, page, per_page, after_id, **filters):
+        """
+        Paginated query ordered by primary key (keyset with a cursor, otherwise
+        LIMIT/OFFSET), like ``SQLiteDataManager._paginate``.
+        """
+        page = max(1, int(page or 1))
+        per_page = max(1, int(per_page))
+        statement = select(model).filter_by(**filters).order_by(model.id)
+        if after_id is not None:
+            statement = statement.where(model.id > after_id)
+        else:
+            statement = statement.offset((page - 1) * per_page)
+        async with self.Session() as session:
+            items = list((await session.scalars(statement.limit(per_page + 1))).all())
+            total = await self._total(session, model, filters)
+        next_cursor = items[per_page - 1].id if len(items) > per_page else None
+        return Page(items[:per_page], total, page, per_page, next_cursor)
+
+    async def _total(self, session, model, filters):
+        """
+        Count the rows matching the filters, memoized until the next write.
+        """
+        key = (model.__tablename__,) + tuple(sorted(filters.items()))
+        total, token = self._counts.get(key)
+        if total is None:
+            total = await session.scalar(select(func.count(model.id)).filter_by(**filters))
+            self._counts.put(key, total, token)
+        return total
+
+    async def iter_users(self, fields, after_id=None):
+        """
+        Stream all users ordered by ID in batches.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only users with a greater ID.
+        Returns:
+            async iterator: One dict per user with the requested columns.
+        """
+        async for row in self._iterate(User, fields, after_id):
+            yield row
+
+    async def iter_movies(self, fields, after_id=None, user_id=None):
+        """
+        Stream movies ordered by ID in batches.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only movies with a greater ID.
+            user_id (int): Only movies of this user.
+        Returns:
+            async iterator: One dict per movie with the requested columns.
+        """
+        filters = {} if user_id is None else {'user_id': user_id}
+        async for row in self._iterate(Movie, fields, after_id, **filters):
+            yield row
+
+    async def iter_reviews(self, fields, after_id=None, user_id=None, movie_id=None):
+        """
+        Stream reviews ordered by ID in batches.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only reviews with a greater ID.
+            user_id (int): Only reviews written by this user.
+            movie_id (int): Only reviews of this movie.
+        Returns:
+            async iterator: One dict per review with the requested columns.
+        """
+        filters = {name: value for name, value in (('user_id', user_id), ('movie_id', movie_id))
+                   if value is not None}
+        async for row in self._iterate(Review, fields, after_id, **filters):
+            yield row
+
+    async def _iterate(self, model, fields, after_id, **filters):
+        columns = [getattr(model, name) for name in fields]
+        statement = select(*columns).filter_by(**filters).order_by(model.id)
+        if after_id is not None:
+            statement = statement.where(model.id > after_id)
+        async with self.Session() as session:
+            result = await session.stream(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+            async for row in result.mappings():
+                yield dict(row)
+
+    # Schreibzugriffe laufen über den Sync-Manager (Listener, Enrichment-Queue, ein Writer)
+
+    async def add_user(self, user):
+        """
+        Add a new user (see ``SQLiteDataManager.add_user``).
+        """
+        return await asyncio.to_thread(self.sync.add_user, user)
+
+    async def add_movie(self, movie):
+        """
+        Add a new movie (see ``SQLiteDataManager.add_movie``).
+        """
+        return await asyncio.to_thread(self.sync.add_movie, movie)
+
+    async def add_movies_bulk(self, movies):
+        """
+        Add many movies in one transaction (see ``SQLiteDataManager.add_movies_bulk``).
+        """
+        return await asyncio.to_thread(self.sync.add_movies_bulk, movies)
+
+    async def add_reviews_bulk(self, reviews):
+        """
+        Add many reviews in one transaction (see ``SQLiteDataManager.add_reviews_bulk``).
+        """
+        return await asyncio.to_thread(self.sync.add_reviews_bulk, reviews)
+
+    async def update_movie(self, movie):
+        """
+        Update a movie (see ``SQLiteDataManager.update_movie``).
+        """
+        return await asyncio.to_thread(self.sync.update_movie, movie)
+
+    async def delete_movie(self, movie_id):
+        """
+        Delete a movie (see ``SQLiteDataManager.delete_movie``).
+        """
+        return await asyncio.to_thread(self.sync.delete_movie, movie_id)
+
+    async def add_review(self, review):
+        """
+        Add a review (see ``SQLiteDataManager.add_review``).
+        """
+        return await asyncio.to_thread(self.sync.add_review, review)
+
+    async def update_review(self, review):
+        """
+        Update a review (see ``SQLiteDataManager.update_review``).
+        """
+        return await asyncio.to_thread(self.sync.update_review, review)
+
+    async def delete_review(self, review_id):
+        """
+        Delete a review (see ``SQLiteDataManager.delete_review``).
+        """
+        return await asyncio.to_thread(self.sync.delete_review, review_id)
@@ -0,0 +1,521 @@
+"""
+Read-through cache in front of any ``DataManagerInterface`` implementation.
+
+``CachingDataManager`` memoizes the read methods of the interface (user list,
+by-id lookups, movie and review lists and their pages) in a bounded LRU. Every
+entry is tagged with the data it contains (e.g. ``user_movies:3``), and the
+wrapped manager's write events invalidate exactly the entries carrying the
+affected tags, including writes that bypass the wrapper (enrichment workers,
+catalog backfill). Writes of other processes arrive as a 'data_changed' event
+(see ``datamanager.data_version``) and drop the whole cache. Wrapped managers
+without write events get the whole cache dropped on every write made through
+the wrapper.
+
+ORM objects are not shared: the cache keeps a snapshot of their loaded
+attributes and every hit gets new instances built from it. Projection rows
+(named tuples) are immutable and handed out as they are.
+
+All other attributes (search, streaming, request scope, listeners, engine)
+are passed through to the wrapped manager.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from datamanager.data_manager_interface import DataManagerInterface
+from datamanager.pagination import Page
+
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class CachingDataManager(DataManagerInterface):
+    """
+    Data manager decorator memoizing reads with tag-based invalidation.
+    """
+
+    def __init__(self, data_manager, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache around a data manager.
+        Args:
+            data_manager (DataManagerInterface): The wrapped data manager.
+            max_entries (int): Maximum number of cached results (0 disables caching).
+        """
+        self.data_manager = data_manager
+        self.max_entries = max_entries
+        self.enabled = max_entries > 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._versions = {}
+        # Wird von clear() erhöht, damit vorher begonnene Abfragen nicht gespeichert werden
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+        add_listener = getattr(data_manager, 'add_listener', None)
+        self._write_events = callable(add_listener)
+        if self._write_events:
+            add_listener(self.handle_write_event)
+
+    def __getattr__(self, name):
+        # Nur für Attribute, die der Wrapper selbst nicht hat
+        if name == 'data_manager':
+            raise AttributeError(name)
+        return getattr(self.data_manager, name)
+
+    def get_all_users(self):
+        """
+        Retrieve all users (cached).
+        Returns:
+            list: A list of User objects.
+        """
+        return self._read('get_all_users', (), {'users'})
+
+    def get_user(self, user_id):
+        """
+        Retrieve a single user by ID (cached).
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            User: The User object, or None if not found.
+        """
+        return self._read('get_user', (user_id,), {f'user:{user_id}'})
+
+    def get_movie(self, movie_id):
+        """
+        Retrieve a single movie by ID (cached).
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            Movie: The Movie object, or None if not found.
+        """
+        return self._read('get_movie', (movie_id,), {f'movie:{movie_id}'})
+
+    def get_review(self, review_id):
+        """
+        Retrieve a single review by ID (cached).
+        Args:
+            review_id (int): The ID of the review.
+        Returns:
+            Review: The Review object, or None if not found.
+        """
+        return self._read('get_review', (review_id,), {f'review:{review_id}', 'reviews'})
+
+    def get_user_movies(self, user_id):
+        """
+        Retrieve all movies of a user (cached).
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            list: A list of Movie objects for the user.
+        """
+        return self._read('get_user_movies', (user_id,), {f'user_movies:{user_id}'})
+
+    def get_reviews_for_movie(self, movie_id):
+        """
+        Retrieve all reviews for a movie (cached).
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            list: A list of Review objects for the movie.
+        """
+        return self._read('get_reviews_for_movie', (movie_id,), {f'movie_reviews:{movie_id}', 'reviews'})
+
+    def get_reviews_for_user(self, user_id):
+        """
+        Retrieve all reviews written by a user (cached).
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            list: A list of Review objects by the user.
+        """
+        return self._read('get_reviews_for_user', (user_id,), {f'user_reviews:{user_id}', 'reviews'})
+
+    def get_movies_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all movies (cached).
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return self._read('get_movies_page', (page, per_page, after_id), {'movies'})
+
+    def get_catalog_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog (cached).
+        Returns:
+            Page: The CatalogMovie objects on the page plus the total count and next cursor.
+        """
+        return self._read('get_catalog_page', (page, per_page, after_id), {'catalog'})
+
+    def get_users_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all users (cached).
+        Returns:
+            Page: The users on the page plus the total count and next cursor.
+        """
+        return self._read('get_users_page', (page, per_page, after_id), {'users'})
+
+    def get_user_movies_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the movies of a user (cached).
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return self._read('get_user_movies_page', (user_id, page, per_page, after_id),
+                          {f'user_movies:{user_id}'})
+
+    def get_reviews_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a movie (cached).
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._read('get_reviews_for_movie_page', (movie_id, page, per_page, after_id),
+                          {f'movie_reviews:{movie_id}', 'reviews'})
+
+    def get_reviews_for_user_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews written by a user (cached).
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._read('get_reviews_for_user_page', (user_id, page, per_page, after_id),
+                          {f'user_reviews:{user_id}', 'reviews'})
+
+    def get_reviews_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all reviews (cached).
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._read('get_reviews_page', (page, per_page, after_id), {'all_reviews', 'reviews'})
+
+    def get_user_rows(self, user_ids=None):
+        """
+        Retrieve the ID and name of users (cached).
+        Returns:
+            list: A list of UserRow tuples.
+        """
+        key = None if user_ids is None else tuple(sorted(set(user_ids)))
+        return self._read('get_user_rows', (key,), {'users'})
+
+    def get_user_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of users as rows (cached).
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._read('get_user_rows_page', (page, per_page, after_id), {'users'})
+
+    def get_catalog_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog as rows (cached).
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._read('get_catalog_rows_page', (page, per_page, after_id), {'catalog'})
+
+    def get_user_movie_rows_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of a user's movies as rows (cached).
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._read('get_user_movie_rows_page', (user_id, page, per_page, after_id),
+                          {f'user_movies:{user_id}'})
+
+    def get_review_rows_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a movie as rows (cached).
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._read('get_review_rows_for_movie_page', (movie_id, page, per_page, after_id),
+                          {f'movie_reviews:{movie_id}', 'reviews'})
+
+    def iter_users(self, fields, after_id=None):
+        """
+        Stream all users (not cached).
+        """
+        return self.data_manager.iter_users(fields, after_id)
+
+    def iter_movies(self, fields, after_id=None, user_id=None):
+        """
+        Stream movies (not cached).
+        """
+        return self.data_manager.iter_movies(fields, after_id, user_id)
+
+    def iter_reviews(self, fields, after_id=None, user_id=None, movie_id=None):
+        """
+        Stream reviews (not cached).
+        """
+        return self.data_manager.iter_reviews(fields, after_id, user_id, movie_id)
+
+    def add_user(self, user):
+        """
+        Add a user and invalidate the user lists.
+        """
+        return self._write('add_user', user)
+
+    def add_movie(self, movie):
+        """
+        Add a movie and invalidate the lists containing it.
+        """
+        return self._write('add_movie', movie)
+
+    def add_movies_bulk(self, movies):
+        """
+        Add many movies and invalidate the lists containing them.
+        """
+        return self._write('add_movies_bulk', movies)
+
+    def add_reviews_bulk(self, reviews):
+        """
+        Add many reviews and invalidate the lists containing them.
+        """
+        return self._write('add_reviews_bulk', reviews)
+
+    def update_movie(self, movie):
+        """
+        Update a movie and invalidate the results containing it.
+        """
+        return self._write('update_movie', movie)
+
+    def delete_movie(self, movie_id):
+        """
+        Delete a movie and invalidate the results containing it or its reviews.
+        """
+        return self._write('delete_movie', movie_id)
+
+    def add_review(self, review):
+        """
+        Add a review and invalidate the lists containing it.
+        """
+        return self._write('add_review', review)
+
+    def update_review(self, review):
+        """
+        Update a review and invalidate the results containing it.
+        """
+        return self._write('update_review', review)
+
+    def delete_review(self, review_id):
+        """
+        Delete a review and invalidate the results containing it.
+        """
+        return self._write('delete_review', review_id)
+
+    def set_enabled(self, enabled):
+        """
+        Switch caching on or off at runtime; switching it off drops all entries.
+        Args:
+            enabled (bool): Whether reads are served from the cache.
+        """
+        self.enabled = bool(enabled) and self.max_entries > 0
+        if not self.enabled:
+            self.clear()
+
+    def invalidate(self, *tags):
+        """
+        Drop all results carrying any of the given tags.
+        Args:
+            tags (str): Tags to invalidate.
+        """
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                for key in self._tags.pop(tag, ()):
+                    self._drop(key)
+            self.stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop all results."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def get_stats(self):
+        """
+        Return a snapshot of the counters.
+        Returns:
+            dict: Hits, misses, invalidations, evictions, the number of entries and
+            the hit rate.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def handle_write_event(self, event, data):
+        """
+        Write listener of the wrapped manager invalidating the cached results
+        that contain the changed data.
+        Args:
+            event (str): The write event name.
+            data (dict): The event payload.
+        """
+        if event == 'user_added':
+            self.invalidate('users')
+        elif event == 'user_updated':
+            self.invalidate('users', f"user:{data['id']}")
+        elif event == 'user_deleted':
+            # Filme und Reviews des Users wurden per Cascade mitgelöscht
+            self.clear()
+        elif event in ('movie_added', 'movie_updated'):
+            # Neue Katalogeinträge können aus dem OMDb-Cache entstanden sein
+            self.invalidate('movies', 'catalog', f"user_movies:{data['user_id']}", f"movie:{data['id']}")
+        elif event == 'movie_deleted':
+            # Reviews des Films wurden per Cascade mitgelöscht
+            self.invalidate('movies', f"user_movies:{data['user_id']}", f"movie:{data['id']}", 'reviews')
+        elif event == 'movies_added':
+            self.invalidate('movies', 'catalog', *{f"user_movies:{m['user_id']}" for m in data['movies']})
+        elif event == 'movies_enriched':
+            self.invalidate('movies', 'catalog',
+                            *{f"user_movies:{m['user_id']}" for m in data['movies']},
+                            *{f"movie:{m['id']}" for m in data['movies']})
+        elif event in ('review_added', 'review_updated', 'review_deleted'):
+            self.invalidate('all_reviews', f"review:{data['id']}", f"movie_reviews:{data['movie_id']}",
+                            f"user_reviews:{data['user_id']}")
+        elif event == 'reviews_added':
+            self.invalidate('all_reviews', *{f'movie_reviews:{movie_id}' for movie_id in data['movie_ids']},
+                            *{f'user_reviews:{user_id}' for user_id in data['user_ids']})
+        elif event == 'data_changed':
+            # Schreibzugriff eines anderen Prozesses: betroffene Einträge sind unbekannt
+            self.clear()
+
+    def _read(self, method, args, tags):
+        if not self.enabled:
+            return getattr(self.data_manager, method)(*args)
+        key = (method, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                versions = {tag: self._versions.get(tag, 0) for tag in tags}
+                generation = self._generation
+        if entry is not None:
+            return _thaw(entry[0])
+        result = _detach(getattr(self.data_manager, method)(*args))
+        self._store(key, _freeze(result), tags, versions, generation)
+        return result
+
+    def _write(self, method, *args):
+        result = getattr(self.data_manager, method)(*args)
+        if not self._write_events:
+            self.clear()
+        return result
+
+    def _store(self, key, result, tags, versions, generation):
+        with self._lock:
+            # Während der Abfrage invalidierte Ergebnisse nicht speichern
+            if (not self.enabled or generation != self._generation
+                    or any(self._versions.get(t, 0) != v for t, v in versions.items())):
+                return
+            self._drop(key)
+            self._entries[key] = (result, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def _detach(result):
+    """
+    Detach the ORM objects of a result from their session, so cached objects
+    are shared between requests without touching a request's session.
+    """
+    objects = result.items if isinstance(result, Page) else result if isinstance(result, list) else [result]
+    for obj in objects:
+        # Projektionszeilen (Tupel) haben keinen ORM-Zustand
+        state = inspect(obj, raiseerr=False) if obj is not None else None
+        if state is not None and state.session is not None:
+            state.session.expunge(obj)
+    return result
+
+
+def _freeze(result):
+    """
+    Snapshot of a result for the cache: ORM objects become (class, loaded
+    attributes) pairs, related objects included; rows and other values stay.
+    """
+    if isinstance(result, Page):
+        return result._replace(items=[_freeze_object(obj, {}) for obj in result.items])
+    if isinstance(result, list):
+        memo = {}
+        return [_freeze_object(obj, memo) for obj in result]
+    return _freeze_object(result, {})
+
+
+def _freeze_object(obj, memo):
+    state = inspect(obj, raiseerr=False) if obj is not None else None
+    if state is None or not hasattr(state, 'mapper'):
+        return obj
+    if id(obj) in memo:
+        return memo[id(obj)]
+    frozen = _Snapshot(state.class_, {})
+    memo[id(obj)] = frozen
+    attributes, relationships = state.mapper.attrs, state.mapper.relationships
+    for name, value in state.dict.items():
+        if name not in attributes:
+            continue
+        if name in relationships:
+            value = ([_freeze_object(item, memo) for item in value] if isinstance(value, list)
+                     else _freeze_object(value, memo))
+        frozen.values[name] = value
+    return frozen
+
+
+def _thaw(frozen):
+    """
+    New ORM instances (not attached to any session) built from a cached snapshot.
+    """
+    if isinstance(frozen, Page):
+        return frozen._replace(items=[_thaw_object(item, {}) for item in frozen.items])
+    if isinstance(frozen, list):
+        memo = {}
+        return [_thaw_object(item, memo) for item in frozen]
+    return _thaw_object(frozen, {})
+
+
+def _thaw_object(frozen, memo):
+    if not isinstance(frozen, _Snapshot):
+        return frozen
+    if id(frozen) in memo:
+        return memo[id(frozen)]
+    obj = frozen.cls.__mapper__.class_manager.new_instance()
+    memo[id(frozen)] = obj
+    for name, value in frozen.values.items():
+        if isinstance(value, list):
+            value = [_thaw_object(item, memo) for item in value]
+        else:
+            value = _thaw_object(value, memo)
+        # Ohne Attribut-Events: kein Backref, keine Änderungshistorie
+        set_committed_value(obj, name, value)
+    return obj
+
+
+class _Snapshot:
+    """Class and loaded attribute values of a cached ORM object."""
+    __slots__ = ('cls', 'values')
+
+    def __init__(self, cls, values):
+        self.cls = cls
+        self.values = values
@@ -0,0 +1,298 @@
+"""
+Shared movie catalog: one ``catalog_movies`` row per film, keyed by imdbID,
+holding the film's OMDb metadata. A user's ``movies`` row only carries the
+personal data (title as entered, director, year, rating) and links to its
+catalog entry through ``catalog_id``, so OMDb data is stored and fetched once
+per film instead of once per user.
+
+Databases from before the catalog stored the OMDb columns on every movie row.
+``backfill`` moves them into the catalog in small batches, each in its own
+short transaction, while the app keeps serving; until a row is migrated its
+own columns are used (see ``Movie.omdb_poster``).
+
+Every entry records when its OMDb data was last fetched (``omdb_fetched_at``).
+``stale_entries`` and ``refresh`` revalidate the oldest entries batch by batch
+(see ``refresher.py``).
+"""
+import time
+
+from sqlalchemy import select, update, or_, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from datamanager import enrichment_queue
+from datamanager.enrichment_queue import enrichment_key, OMDB_COLUMNS
+from datamanager.models import CatalogMovie, Movie
+from omdb import NOT_FOUND
+from utils import get_cached_omdb_raw
+
+BACKFILL_BATCH_SIZE = 500
+LEGACY_COLUMNS = tuple(f'legacy_{column}' for column in OMDB_COLUMNS)
+# OMDb-Daten, die älter sind, gelten als veraltet
+REFRESH_MAX_AGE = 7 * 24 * 3600
+# Spalten, die beim Auffrischen verglichen und bei Änderungen überschrieben werden
+REFRESH_COLUMNS = ('title', 'title_key', *OMDB_COLUMNS)
+
+
+def catalog_values(data, now=None):
+    """
+    Build a catalog row from a raw OMDb answer.
+    Args:
+        data (dict): Raw OMDb JSON.
+        now (float): Current time.
+    Returns:
+        dict: Column values, or None if the answer has no imdbID.
+    """
+    if not data or not data.get('imdbID'):
+        return None
+    title = data.get('Title') or ''
+    now = now or time.time()
+    return {
+        'imdb_id': data['imdbID'],
+        'title': title,
+        'title_key': enrichment_key(title),
+        'omdb_poster': data.get('Poster', None),
+        'omdb_rating': data.get('imdbRating', None),
+        'omdb_director': data.get('Director', None),
+        'omdb_year': data.get('Year', None),
+        'updated_at': now,
+        'omdb_fetched_at': now,
+    }
+
+
+def upsert(session, rows):
+    """
+    Insert catalog rows, updating the OMDb data of films already present.
+    Args:
+        session: SQLAlchemy session (the caller commits).
+        rows (list): Rows built by ``catalog_values``.
+    Returns:
+        dict: imdbID -> catalog entry ('id', 'omdb_poster').
+    """
+    rows = list({row['imdb_id']: row for row in rows}.values())
+    if not rows:
+        return {}
+    statement = sqlite_insert(CatalogMovie.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['imdb_id'],
+        set_={column: statement.excluded[column]
+              for column in (*REFRESH_COLUMNS, 'updated_at', 'omdb_fetched_at')})
+    session.execute(statement, rows)
+    return {row.imdb_id: {'id': row.id, 'omdb_poster': row.omdb_poster} for row in session.execute(
+        select(CatalogMovie.id, CatalogMovie.imdb_id, CatalogMovie.omdb_poster)
+        .where(CatalogMovie.imdb_id.in_([row['imdb_id'] for row in rows])))}
+
+
+def store(session, data):
+    """
+    Store one raw OMDb answer in the catalog.
+    Args:
+        session: SQLAlchemy session (the caller commits).
+        data (dict): Raw OMDb JSON.
+    Returns:
+        dict: The catalog entry ('id', 'omdb_poster'), or None if the answer has no imdbID.
+    """
+    row = catalog_values(data)
+    return upsert(session, [row])[row['imdb_id']] if row else None
+
+
+def year_matches(omdb_year, year):
+    """
+    Check an OMDb year ('1984', '2019–2022') against the year a user entered.
+    Without a year given, any entry matches.
+    """
+    return year is None or (omdb_year or '')[:4] == str(year)
+
+
+def match_titles(session, titles, exact_year=False):
+    """
+    Find the catalog entries of titles entered by users, without asking OMDb.
+    Titles match by their normalized form and the given year; only titles
+    without a year fall back to the first entry with that title (a remake is a
+    different film, so "Dune" from 1984 is not linked to the one from 2021).
+    Args:
+        session: SQLAlchemy session.
+        titles (iterable): (title, year) pairs; year may be None.
+        exact_year (bool): Never fall back, not even for titles without a year.
+    Returns:
+        dict: (title, year) -> catalog entry ('id', 'omdb_poster') for every title found.
+    """
+    titles = set(titles)
+    keys = {enrichment_key(title) for title, _ in titles}
+    if not keys:
+        return {}
+    candidates = {}
+    for row in session.execute(
+            select(CatalogMovie.id, CatalogMovie.title_key, CatalogMovie.omdb_year, CatalogMovie.omdb_poster)
+            .where(CatalogMovie.title_key.in_(keys)).order_by(CatalogMovie.id)):
+        candidates.setdefault(row.title_key, []).append(row)
+    found = {}
+    for title, year in titles:
+        rows = candidates.get(enrichment_key(title))
+        if not rows:
+            continue
+        best = next((row for row in rows if year is not None and year_matches(row.omdb_year, year)), None)
+        if best is None and year is None and not exact_year:
+            best = rows[0]
+        if best is None:
+            continue
+        found[(title, year)] = {'id': best.id, 'omdb_poster': best.omdb_poster}
+    return found
+
+
+def backfill(session, after_id=0, batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Move the OMDb columns of one batch of unmigrated movie rows into the
+    catalog. Rows are linked to an existing entry of the same film, to an entry
+    built from the cached OMDb answer, or, if OMDb has to be asked again for
+    the imdbID, queued for enrichment (their own columns are shown meanwhile).
+    Args:
+        session: SQLAlchemy session (committed by this function).
+        after_id (int): Keyset cursor; only rows with a greater ID are considered.
+        batch_size (int): Maximum number of rows.
+    Returns:
+        dict: 'scanned', 'linked' and 'queued' row counts, 'last_id' (the cursor
+        for the next batch), and for the write events 'movies' (the linked
+        movies) and 'titles' (the queued titles).
+    """
+    rows = session.execute(
+        select(Movie.id, Movie.name, Movie.user_id, Movie.legacy_omdb_year)
+        .where(Movie.id > after_id, Movie.enrichment_status != 'pending', *unmigrated_filter())
+        .order_by(Movie.id).limit(batch_size)).all()
+    stats = {'scanned': len(rows), 'linked': 0, 'queued': 0,
+             'last_id': rows[-1].id if rows else after_id, 'movies': [], 'titles': []}
+    if not rows:
+        return stats
+    # Gleicher Titel und gleiches OMDb-Jahr: bereits migrierte Kopie desselben Films
+    titles = {row.id: (row.name, (row.legacy_omdb_year or '')[:4] or None) for row in rows}
+    matches = match_titles(session, titles.values(), exact_year=True)
+    linked = {}
+    queued = []
+    for row in rows:
+        entry = matches.get(titles[row.id])
+        if entry is None:
+            cached = get_cached_omdb_raw(row.name)
+            if cached is not None and cached is not NOT_FOUND:
+                entry = matches[titles[row.id]] = store(session, cached)
+        if entry is None:
+            queued.append(row)
+        else:
+            linked.setdefault(entry['id'], []).append(row)
+            stats['movies'].append({'id': row.id, 'name': row.name, 'user_id': row.user_id,
+                                    'omdb_poster': entry['omdb_poster']})
+    for catalog_id, movies in linked.items():
+        session.execute(update(Movie).where(Movie.id.in_([row.id for row in movies])).values(
+            catalog_id=catalog_id, enrichment_status='done', **{column: None for column in LEGACY_COLUMNS}))
+    if queued:
+        session.execute(update(Movie).where(Movie.id.in_([row.id for row in queued]))
+                        .values(enrichment_status='pending'))
+        enrichment_queue.enqueue(session, [row.name for row in queued])
+    session.commit()
+    stats['linked'] = sum(len(movies) for movies in linked.values())
+    stats['queued'] = len(queued)
+    stats['titles'] = sorted({row.name for row in queued})
+    return stats
+
+
+def stale_entries(session, max_age=REFRESH_MAX_AGE, limit=BACKFILL_BATCH_SIZE, now=None):
+    """
+    Find the catalog entries whose OMDb data was fetched longest ago.
+    Args:
+        session: SQLAlchemy session.
+        max_age (float): Only entries fetched more than this many seconds ago.
+        limit (int): Maximum number of entries.
+        now (float): Current time.
+    Returns:
+        list: Dicts with 'id', 'imdb_id', 'omdb_fetched_at' and the
+        ``REFRESH_COLUMNS`` values, oldest first.
+    """
+    cutoff = (now or time.time()) - max_age
+    columns = [getattr(CatalogMovie, column) for column in ('id', 'imdb_id', 'omdb_fetched_at', *REFRESH_COLUMNS)]
+    return [dict(row._mapping) for row in session.execute(
+        select(*columns).where(CatalogMovie.omdb_fetched_at < cutoff)
+        .order_by(CatalogMovie.omdb_fetched_at, CatalogMovie.id).limit(limit))]
+
+
+def refresh(session, entries, answers, now=None):
+    """
+    Store fresh OMDb answers for catalog entries. Only entries whose values
+    changed are written, in one bulk UPDATE; all checked entries get a new
+    fetch time.
+    Args:
+        session: SQLAlchemy session (committed by this function).
+        entries (list): Entries from ``stale_entries`` that were looked up.
+        answers (dict): imdbID -> raw OMDb JSON, or None if OMDb no longer knows
+            the ID (the entry keeps its data).
+        now (float): Current time.
+    Returns:
+        dict: 'checked' and 'changed' entry counts, and for the write event
+        'movies' (the movies linked to changed entries).
+    """
+    now = now or time.time()
+    checked = [entry for entry in entries if entry['imdb_id'] in answers]
+    changed = []
+    for entry in checked:
+        values = catalog_values(answers[entry['imdb_id']], now)
+        if values is None or values['imdb_id'] != entry['imdb_id']:
+            continue
+        if any(values[column] != entry[column] for column in REFRESH_COLUMNS):
+            changed.append(dict({column: values[column] for column in REFRESH_COLUMNS},
+                                id=entry['id'], updated_at=now))
+    stats = {'checked': len(checked), 'changed': len(changed), 'movies': []}
+    if not checked:
+        return stats
+    if changed:
+        # executemany über den Primärschlüssel: ein UPDATE-Statement für die ganze Charge
+        session.execute(update(CatalogMovie), changed)
+        posters = {row['id']: row['omdb_poster'] for row in changed}
+        stats['movies'] = [
+            {'id': row.id, 'name': row.name, 'user_id': row.user_id, 'omdb_poster': posters[row.catalog_id]}
+            for row in session.execute(select(Movie.id, Movie.name, Movie.user_id, Movie.catalog_id)
+                                       .where(Movie.catalog_id.in_(list(posters))))]
+    session.execute(update(CatalogMovie).where(CatalogMovie.id.in_([entry['id'] for entry in checked]))
+                    .values(omdb_fetched_at=now))
+    session.commit()
+    return stats
+
+
+def refresh_stats(session, max_age=REFRESH_MAX_AGE, now=None):
+    """
+    Report how fresh the OMDb data of the catalog is.
+    Args:
+        session: SQLAlchemy session.
+        max_age (float): Age in seconds from which an entry counts as stale.
+        now (float): Current time.
+    Returns:
+        dict: 'stale_films' (to be refreshed) and 'oldest_fetch_seconds' (age of
+        the oldest entry, 0 for an empty catalog).
+    """
+    now = now or time.time()
+    oldest = session.execute(select(func.min(CatalogMovie.omdb_fetched_at))).scalar()
+    return {
+        'stale_films': session.execute(select(func.count()).select_from(CatalogMovie)
+                                       .where(CatalogMovie.omdb_fetched_at < now - max_age)).scalar(),
+        'oldest_fetch_seconds': round(now - oldest, 1) if oldest is not None else 0,
+    }
+
+
+def unmigrated_filter():
+    """
+    Criteria of movie rows whose OMDb data has not been moved to the catalog yet.
+    """
+    return (Movie.catalog_id.is_(None), or_(*(getattr(Movie, column).isnot(None) for column in LEGACY_COLUMNS)))
+
+
+def catalog_stats(session):
+    """
+    Report the catalog size and the migration progress.
+    Args:
+        session: SQLAlchemy session.
+    Returns:
+        dict: 'films' in the catalog, 'linked_movies' and 'unmigrated_movies'.
+    """
+    return {
+        'films': session.execute(select(func.count()).select_from(CatalogMovie)).scalar(),
+        'linked_movies': session.execute(
+            select(func.count()).select_from(Movie).where(Movie.catalog_id.isnot(None))).scalar(),
+        'unmigrated_movies': session.execute(
+            select(func.count()).select_from(Movie).where(*unmigrated_filter())).scalar(),
+    }
@@ -15,6 +15,39 @@ class DataManagerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_user(self, user_id):
+        """
+        Retrieve a single user by ID.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            object: The user object, or None if not found.
+        """
+        pass
+
+    @abstractmethod
+    def get_movie(self, movie_id):
+        """
+        Retrieve a single movie by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            object: The movie object, or None if not found.
+        """
+        pass
+
+    @abstractmethod
+    def get_review(self, review_id):
+        """
+        Retrieve a single review by ID.
+        Args:
+            review_id (int): The ID of the review.
+        Returns:
+            object: The review object, or None if not found.
+        """
+        pass
+
     @abstractmethod
     def get_user_movies(self, user_id):
         """
@@ -48,6 +81,30 @@ class DataManagerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_movies_bulk(self, movies):
+        """
+        Add many movies at once, skipping movies already present for their user.
+        Args:
+            movies (list): A list of dictionaries containing movie information.
+        Returns:
+            int: The number of inserted movies.
+        Raises:
+            Exception: If the movies could not be stored (as opposed to skipped).
+        """
+        pass
+
+    @abstractmethod
+    def add_reviews_bulk(self, reviews):
+        """
+        Add many reviews at once.
+        Args:
+            reviews (list): A list of dictionaries containing review information.
+        Returns:
+            int: The number of inserted reviews.
+        """
+        pass
+
     @abstractmethod
     def update_movie(self, movie):
         """
@@ -124,3 +181,203 @@ class DataManagerInterface(ABC):
             object: The deleted review object or None if not found.
         """
         pass
+
+    @abstractmethod
+    def get_movies_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all movies, ordered by ID.
+        Args:
+            page (int): The 1-based page number (used for OFFSET when no cursor is given).
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_catalog_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog (each film once), ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of films on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this ID.
+        Returns:
+            Page: The films on the page, total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_users_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all users, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of users on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this user ID.
+        Returns:
+            Page: The users on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_movies_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the movies of a specific user, ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_reviews_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a specific movie, ordered by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_reviews_for_user_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews written by a specific user, ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_reviews_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all reviews, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def iter_users(self, fields, after_id=None):
+        """
+        Stream all users ordered by ID without loading them into memory at once.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only users with a greater ID.
+        Returns:
+            iterator: One dict per user with the requested columns.
+        """
+        pass
+
+    @abstractmethod
+    def iter_movies(self, fields, after_id=None, user_id=None):
+        """
+        Stream movies ordered by ID without loading them into memory at once.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only movies with a greater ID.
+            user_id (int): Only movies of this user.
+        Returns:
+            iterator: One dict per movie with the requested columns.
+        """
+        pass
+
+    @abstractmethod
+    def iter_reviews(self, fields, after_id=None, user_id=None, movie_id=None):
+        """
+        Stream reviews ordered by ID without loading them into memory at once.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only reviews with a greater ID.
+            user_id (int): Only reviews written by this user.
+            movie_id (int): Only reviews of this movie.
+        Returns:
+            iterator: One dict per review with the requested columns.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_rows(self, user_ids=None):
+        """
+        Retrieve the ID and name of users, ordered by ID.
+        Args:
+            user_ids (iterable): Only these users, or None for all users.
+        Returns:
+            list: A list of UserRow tuples.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of users as UserRow tuples, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of users on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this user ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_catalog_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog as FilmRow tuples, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of films on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_movie_rows_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of a user's movies as MovieRow tuples (OMDb data
+        joined in), ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        pass
+
+    @abstractmethod
+    def get_review_rows_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a movie as ReviewRow tuples (with
+        the reviewers' names), ordered by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        pass
@@ -0,0 +1,41 @@
+"""
+Write counter shared by all processes using a database file.
+
+Caches in front of the database (rendered pages, data manager reads, the
+pagination counts) live in one process, and the write events that invalidate
+them only reach the process that made the write. The ``data_version`` table
+therefore holds a counter that every write made through a data manager
+increments after its commit. Each process compares it with the value it saw
+last (once per request) and drops its caches if another process wrote in
+between. The process's own writes are already invalidated precisely by their
+write events; they are recognized because they advance the counter by exactly
+one.
+"""
+from sqlalchemy import select, text
+
+from datamanager.models import DataVersion
+
+_BUMP = text('INSERT INTO data_version (id, version) VALUES (1, 1) '
+             'ON CONFLICT (id) DO UPDATE SET version = version + 1 RETURNING version')
+
+
+def bump(connection):
+    """
+    Increment the write counter (creating it on first use).
+    Args:
+        connection: SQLAlchemy connection or session (the caller commits).
+    Returns:
+        int: The new counter value.
+    """
+    return connection.execute(_BUMP).scalar()
+
+
+def current(connection):
+    """
+    Read the write counter.
+    Args:
+        connection: SQLAlchemy connection or session.
+    Returns:
+        int: The counter value, 0 if nothing was written yet.
+    """
+    return connection.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar() or 0
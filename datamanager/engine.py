@@ -0,0 +1,94 @@
+"""
+SQLite engine profile: journal mode, pragmas, busy timeout and connection pool.
+
+The defaults suit a multi-threaded web server: WAL lets readers proceed while
+one writer commits, the busy timeout makes writers wait for the lock instead of
+failing with "database is locked", and a bounded pool reuses connections.
+Every setting can be overridden per call or through ``SQLITE_*`` environment
+variables.
+"""
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool, StaticPool
+
+DEFAULT_ENGINE_PROFILE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,  # negative = KiB, i.e. 64 MB page cache per connection
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,  # milliseconds
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+    'pool_recycle': 3600,
+}
+
+_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+
+def load_engine_profile(overrides=None):
+    """
+    Build the engine profile from the defaults, the environment
+    (e.g. ``SQLITE_JOURNAL_MODE``, ``SQLITE_POOL_SIZE``) and explicit overrides.
+    Args:
+        overrides (dict): Settings taking precedence over everything else.
+    Returns:
+        dict: The complete profile.
+    """
+    profile = dict(DEFAULT_ENGINE_PROFILE)
+    for name, default in DEFAULT_ENGINE_PROFILE.items():
+        value = os.getenv(f'SQLITE_{name.upper()}')
+        if value is not None:
+            profile[name] = type(default)(value)
+    profile.update(overrides or {})
+    return profile
+
+
+def create_sqlite_engine(db_file_name, profile=None):
+    """
+    Create a SQLAlchemy engine for a SQLite file configured with an engine profile.
+    Args:
+        db_file_name (str): The SQLite database file name (or ':memory:').
+        profile (dict): Overrides for the engine profile.
+    Returns:
+        Engine: The configured engine.
+    """
+    profile = load_engine_profile(profile)
+    connect_args = {
+        'timeout': profile['busy_timeout'] / 1000,
+        'check_same_thread': False,
+    }
+    if db_file_name == ':memory:':
+        engine = create_engine('sqlite://', connect_args=connect_args, poolclass=StaticPool)
+    else:
+        engine = create_engine(
+            f'sqlite:///{db_file_name}',
+            connect_args=connect_args,
+            poolclass=QueuePool,
+            pool_size=profile['pool_size'],
+            max_overflow=profile['max_overflow'],
+            pool_timeout=profile['pool_timeout'],
+            pool_recycle=profile['pool_recycle'])
+
+    install_pragmas(engine, profile)
+    engine.profile = profile
+    return engine
+
+
+def install_pragmas(engine, profile):
+    """
+    Apply the profile's pragmas to every new connection of an engine.
+    Args:
+        engine (Engine): The engine (for async engines its ``sync_engine``).
+        profile (dict): The engine profile.
+    """
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name in _PRAGMAS:
+            value = profile.get(name)
+            if value is not None:
+                cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
@@ -0,0 +1,191 @@
+"""
+Durable OMDb enrichment job queue stored in the ``enrichment_jobs`` table.
+
+Movies are written with ``enrichment_status = 'pending'`` and one job per
+normalized title is queued in the same transaction. Background workers claim
+jobs with a lease, look the title up on OMDb, store the film in the catalog and
+link every pending movie with that title to it. Failed lookups are retried
+with exponential backoff.
+"""
+import random
+import time
+
+from sqlalchemy import text, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from datamanager.models import EnrichmentJob, Movie
+
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+
+OMDB_COLUMNS = ('omdb_poster', 'omdb_rating', 'omdb_director', 'omdb_year')
+
+
+def enrichment_key(title):
+    """
+    Normalize a title the way SQLite's ``lower(trim(name))`` does (ASCII-only
+    lower-casing, surrounding spaces removed), so jobs can be matched to movies
+    through the ``ix_movies_enrichment_pending`` index.
+    Args:
+        title (str): Movie title.
+    Returns:
+        str: The job key.
+    """
+    return ''.join(c.lower() if 'A' <= c <= 'Z' else c for c in (title or '').strip(' '))
+
+
+def _pending_movies_filter(key):
+    return (Movie.enrichment_status == 'pending',
+            func.lower(func.trim(Movie.name)) == key)
+
+
+def enqueue(session, titles, now=None):
+    """
+    Queue enrichment jobs for titles. A title that already has a job is not
+    queued twice; a finished or failed job is reset to pending.
+    Args:
+        session: SQLAlchemy session (the caller commits).
+        titles (iterable): Movie titles.
+        now (float): Current time, defaults to ``time.time()``.
+    Returns:
+        int: The number of distinct titles passed in.
+    """
+    now = now or time.time()
+    rows = {}
+    for title in titles:
+        key = enrichment_key(title)
+        if key and key not in rows:
+            rows[key] = {'title_key': key, 'title': title, 'status': 'pending', 'attempts': 0,
+                         'next_attempt_at': now, 'created_at': now, 'updated_at': now}
+    if not rows:
+        return 0
+    statement = sqlite_insert(EnrichmentJob.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['title_key'],
+        set_={'status': 'pending', 'attempts': 0, 'last_error': None,
+              'next_attempt_at': statement.excluded.next_attempt_at,
+              'updated_at': statement.excluded.updated_at},
+        where=EnrichmentJob.__table__.c.status != 'pending')
+    session.execute(statement, list(rows.values()))
+    return len(rows)
+
+
+def claim(session, now=None, lease=LEASE_SECONDS):
+    """
+    Atomically claim the next due job (or one whose lease expired).
+    Args:
+        session: SQLAlchemy session (committed by this function).
+        now (float): Current time.
+        lease (int): Seconds until an unfinished claim may be taken over.
+    Returns:
+        dict: The job ('id', 'title', 'title_key', 'attempts'), or None if no job is due.
+    """
+    now = now or time.time()
+    row = session.execute(text("""
+        UPDATE enrichment_jobs
+        SET status = 'running', locked_until = :lease, attempts = attempts + 1, updated_at = :now
+        WHERE id = (
+            SELECT id FROM enrichment_jobs
+            WHERE (status = 'pending' AND next_attempt_at <= :now)
+               OR (status = 'running' AND locked_until < :now)
+            ORDER BY next_attempt_at LIMIT 1)
+        RETURNING id, title, title_key, attempts
+    """), {'now': now, 'lease': now + lease}).first()
+    session.commit()
+    return dict(row._mapping) if row else None
+
+
+def complete(session, job, entry, now=None, year=None):
+    """
+    Link all pending movies with the job's title to the film found on OMDb.
+    OMDb answers a title lookup with one film; pending movies from another year
+    (e.g. a remake) are not linked to it but marked 'not_found'.
+    Args:
+        session: SQLAlchemy session (committed by this function).
+        job (dict): The claimed job.
+        entry (dict): The film's catalog entry ('id', 'omdb_poster'), or None if
+            OMDb does not know the title.
+        now (float): Current time.
+        year (str): The film's OMDb year ('1984', '2019–2022'), if known.
+    Returns:
+        list: Dicts ('id', 'name', 'user_id', 'omdb_poster') of the updated movies.
+    """
+    now = now or time.time()
+    # Die OMDb-Daten stehen im Katalog; eventuelle Altwerte der Zeile werden geleert
+    values = {f'legacy_{column}': None for column in OMDB_COLUMNS}
+    values.update(catalog_id=entry['id'] if entry else None,
+                  enrichment_status='done' if entry else 'not_found')
+    release_year = (year or '')[:4]
+    other_years = []
+    if entry and release_year.isdigit():
+        other_years = _resolve_movies(session, job, {'enrichment_status': 'not_found'},
+                                      Movie.year != int(release_year))
+    poster = entry['omdb_poster'] if entry else None
+    movies = [dict(movie, omdb_poster=poster) for movie in _resolve_movies(session, job, values)]
+    session.execute(
+        update(EnrichmentJob).where(EnrichmentJob.id == job['id'], EnrichmentJob.status == 'running')
+        .values(status='done', locked_until=None, last_error=None, updated_at=now))
+    session.commit()
+    return movies + [dict(movie, omdb_poster=None) for movie in other_years]
+
+
+def fail(session, job, error, now=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Record a failed attempt: schedule a retry with exponential backoff and jitter,
+    or give up after ``max_attempts`` and mark the movies as failed.
+    Args:
+        session: SQLAlchemy session (committed by this function).
+        job (dict): The claimed job.
+        error (str): Error description.
+        now (float): Current time.
+        max_attempts (int): Number of attempts before giving up.
+    Returns:
+        bool: True if the job will be retried.
+    """
+    now = now or time.time()
+    retry = job['attempts'] < max_attempts
+    if retry:
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (job['attempts'] - 1))
+        values = {'status': 'pending', 'next_attempt_at': now + delay * random.uniform(0.8, 1.2)}
+    else:
+        values = {'status': 'failed'}
+        _resolve_movies(session, job, {'enrichment_status': 'failed'})
+    session.execute(
+        update(EnrichmentJob).where(EnrichmentJob.id == job['id'], EnrichmentJob.status == 'running')
+        .values(locked_until=None, last_error=str(error)[:500], updated_at=now, **values))
+    session.commit()
+    return retry
+
+
+def queue_stats(session, now=None):
+    """
+    Report the queue depth.
+    Args:
+        session: SQLAlchemy session.
+        now (float): Current time.
+    Returns:
+        dict: Job counts per status, the number of movies still pending and the
+        age in seconds of the oldest pending job.
+    """
+    now = now or time.time()
+    stats = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+    for status, count in session.execute(
+            select(EnrichmentJob.status, func.count()).group_by(EnrichmentJob.status)):
+        stats[status] = count
+    oldest = session.execute(
+        select(func.min(EnrichmentJob.created_at)).where(EnrichmentJob.status == 'pending')).scalar()
+    stats['oldest_pending_seconds'] = round(now - oldest, 1) if oldest else 0
+    stats['movies_pending'] = session.execute(
+        select(func.count()).select_from(Movie).where(Movie.enrichment_status == 'pending')).scalar()
+    return stats
+
+
+def _resolve_movies(session, job, values, *extra_criteria):
+    criteria = _pending_movies_filter(job['title_key']) + extra_criteria
+    movies = [dict(row._mapping) for row in session.execute(
+        select(Movie.id, Movie.name, Movie.user_id).where(*criteria))]
+    if movies:
+        session.execute(update(Movie).where(*criteria).values(**values))
+    return movies
@@ -0,0 +1,85 @@
+"""
+Proxy creating the real data manager on first use.
+
+Creating a data manager opens the database and checks its schema. Behind a
+``LazyDataManager`` this happens on the first call instead of at import, so
+importing the app (e.g. in the master process of a pre-forking server) opens
+no database connections that the forked workers would share, and the
+configuration can still be changed until then. Write listeners registered
+before are attached once the data manager exists.
+"""
+import threading
+
+
+class LazyDataManager:
+    """
+    Data manager proxy deferring the creation of the wrapped data manager.
+    """
+
+    def __init__(self, factory=None):
+        """
+        Initialize the proxy.
+        Args:
+            factory (callable): Returns the data manager; called once, on first use.
+        """
+        self._factory = factory
+        self._data_manager = None
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    @property
+    def created(self):
+        """True once the data manager has been created."""
+        return self._data_manager is not None
+
+    def configure(self, factory):
+        """
+        Replace the factory.
+        Args:
+            factory (callable): Returns the data manager.
+        Raises:
+            RuntimeError: If the data manager has already been created.
+        """
+        with self._lock:
+            if self._data_manager is not None:
+                raise RuntimeError('The data manager has already been created')
+            self._factory = factory
+
+    def get(self):
+        """
+        The data manager, created on the first call.
+        Returns:
+            DataManagerInterface: The wrapped data manager.
+        Raises:
+            RuntimeError: If no factory is configured.
+        """
+        data_manager = self._data_manager
+        if data_manager is None:
+            with self._lock:
+                if self._data_manager is None:
+                    if self._factory is None:
+                        raise RuntimeError('No data manager configured')
+                    data_manager = self._factory()
+                    for listener in self._listeners:
+                        data_manager.add_listener(listener)
+                    self._data_manager = data_manager
+                data_manager = self._data_manager
+        return data_manager
+
+    def add_listener(self, listener):
+        """
+        Register a write listener, without creating the data manager.
+        Args:
+            listener (callable): Called as ``listener(event, data)``.
+        """
+        with self._lock:
+            if self._data_manager is None:
+                self._listeners.append(listener)
+                return
+        self._data_manager.add_listener(listener)
+
+    def __getattr__(self, name):
+        # Private Attribute nicht weiterreichen (z. B. vor dem Ende von __init__)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
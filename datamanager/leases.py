@@ -0,0 +1,46 @@
+"""
+Named leases shared by all processes using a database file.
+
+Some background jobs must run in one process only, even though every serving
+process starts them (e.g. the catalog refresher, whose OMDb budget is meant
+for the whole deployment). A lease row names its owner and expires after a
+given time; the owner renews it before every unit of work, and another
+process can only take it over once it has expired, e.g. after its owner died.
+"""
+import time
+
+from sqlalchemy import delete, text
+
+from datamanager.models import Lease
+
+_ACQUIRE = text('INSERT INTO leases (name, owner, expires_at) VALUES (:name, :owner, :expires_at) '
+                'ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+                'WHERE leases.owner = excluded.owner OR leases.expires_at <= :now RETURNING owner')
+
+
+def acquire(session, name, owner, seconds, now=None):
+    """
+    Take or renew a lease.
+    Args:
+        session: SQLAlchemy session (the caller commits).
+        name (str): Name of the lease.
+        owner (str): Identifier of the acquiring process.
+        seconds (float): Lifetime of the lease from now.
+        now (float): Current time.
+    Returns:
+        bool: True if the caller holds the lease now.
+    """
+    now = now or time.time()
+    return session.execute(_ACQUIRE, {'name': name, 'owner': owner, 'expires_at': now + seconds,
+                                      'now': now}).scalar() is not None
+
+
+def release(session, name, owner):
+    """
+    Give up a lease held by the owner.
+    Args:
+        session: SQLAlchemy session (the caller commits).
+        name (str): Name of the lease.
+        owner (str): Identifier of the process holding it.
+    """
+    session.execute(delete(Lease).where(Lease.name == name, Lease.owner == owner))
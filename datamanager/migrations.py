@@ -0,0 +1,156 @@
+"""
+Lightweight, versioned schema migrations for the SQLite database.
+
+``Base.metadata.create_all`` only creates missing tables; it never alters
+existing ones. Schema changes for existing databases are therefore listed here
+as numbered migrations. The number of the last applied migration is stored in
+SQLite's ``PRAGMA user_version``, so each migration runs exactly once per
+database file, in order, inside its own transaction.
+"""
+from sqlalchemy import text
+
+
+def _add_lookup_indexes(connection):
+    """
+    Index the foreign keys used by per-movie and per-review lookups, enforce
+    unique movies per user (the unique index starts with ``user_id`` and also
+    serves per-user lookups) and index case-insensitive user name lookups.
+    Duplicate movies of a user (same name and year) are merged into the oldest
+    row first, moving their reviews over; reviews of unknown movies are left
+    as they are.
+    """
+    connection.execute(text("""
+        UPDATE reviews SET movie_id = (
+            SELECT MIN(keep.id) FROM movies AS dup
+            JOIN movies AS keep
+              ON keep.user_id IS dup.user_id AND keep.name = dup.name AND keep.year = dup.year
+            WHERE dup.id = reviews.movie_id)
+        WHERE movie_id IN (SELECT id FROM movies)
+          AND movie_id NOT IN (SELECT MIN(id) FROM movies GROUP BY user_id, name, year)
+    """))
+    connection.execute(text(
+        "DELETE FROM movies WHERE id NOT IN (SELECT MIN(id) FROM movies GROUP BY user_id, name, year)"))
+    for statement in (
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_movies_user_name_year ON movies (user_id, name, year)",
+            "CREATE INDEX IF NOT EXISTS ix_reviews_movie_id ON reviews (movie_id)",
+            "CREATE INDEX IF NOT EXISTS ix_reviews_user_id ON reviews (user_id)",
+            "CREATE INDEX IF NOT EXISTS ix_users_name_lower ON users (lower(name))"):
+        connection.execute(text(statement))
+
+
+def _add_enrichment_status(connection):
+    """
+    Track the OMDb enrichment state of each movie. Existing movies count as
+    enriched if they already have OMDb data.
+    """
+    columns = {row[1] for row in connection.execute(text('PRAGMA table_info(movies)'))}
+    if 'enrichment_status' not in columns:
+        connection.execute(text('ALTER TABLE movies ADD COLUMN enrichment_status VARCHAR'))
+    connection.execute(text(
+        "UPDATE movies SET enrichment_status = CASE WHEN omdb_poster IS NULL AND omdb_rating IS NULL "
+        "THEN 'not_found' ELSE 'done' END WHERE enrichment_status IS NULL"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_movies_enrichment_pending ON movies (lower(trim(name))) "
+        "WHERE enrichment_status = 'pending'"))
+
+
+def _add_catalog_link(connection):
+    """
+    Link movies to the shared film catalog (the ``catalog_movies`` table is
+    created by ``create_all``). Only the column is added here; the OMDb data of
+    existing rows is moved into the catalog online, in batches, by
+    ``datamanager.catalog.backfill``. The full-text index is dropped so that
+    ``ensure_fts_index`` rebuilds it on top of the catalog's OMDb director.
+    """
+    columns = {row[1] for row in connection.execute(text('PRAGMA table_info(movies)'))}
+    if 'catalog_id' not in columns:
+        connection.execute(text(
+            'ALTER TABLE movies ADD COLUMN catalog_id INTEGER REFERENCES catalog_movies (id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_movies_catalog_id ON movies (catalog_id)'))
+    for trigger in ('movies_fts_ai', 'movies_fts_ad', 'movies_fts_au'):
+        connection.execute(text(f'DROP TRIGGER IF EXISTS {trigger}'))
+    connection.execute(text('DROP TABLE IF EXISTS movies_fts'))
+
+
+def _add_catalog_fetched_at(connection):
+    """
+    Track when the OMDb data of each catalog entry was last fetched, so that
+    the oldest entries can be refreshed first. Existing entries count as
+    fetched when they were last written.
+    """
+    columns = {row[1] for row in connection.execute(text('PRAGMA table_info(catalog_movies)'))}
+    if 'omdb_fetched_at' not in columns:
+        connection.execute(text(
+            'ALTER TABLE catalog_movies ADD COLUMN omdb_fetched_at FLOAT NOT NULL DEFAULT 0'))
+        connection.execute(text('UPDATE catalog_movies SET omdb_fetched_at = updated_at'))
+    connection.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_catalog_movies_omdb_fetched_at ON catalog_movies (omdb_fetched_at)'))
+
+
+def _add_year_index(connection):
+    """
+    Index the release year, which the search matches for queries that are a
+    year (``movies.year = ?``) instead of scanning the table.
+    """
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_movies_year ON movies (year)'))
+
+
+def _unique_user_names_ignoring_case(connection):
+    """
+    Make user names unique regardless of case, so that concurrent adds of
+    "Ann" and "ann" cannot both succeed. Users whose name only differs in case
+    from an older user's are renamed to "name (id)" first.
+    """
+    duplicates = connection.execute(text(
+        "SELECT id, name FROM users WHERE id NOT IN (SELECT MIN(id) FROM users GROUP BY lower(name)) "
+        "ORDER BY id")).all()
+    for user_id, name in duplicates:
+        renamed = f'{name} ({user_id})'
+        print(f"User {user_id} umbenannt: '{name}' -> '{renamed}' (Name nur in Groß-/Kleinschreibung doppelt)")
+        connection.execute(text('UPDATE users SET name = :name WHERE id = :id'), {'name': renamed, 'id': user_id})
+    connection.execute(text('DROP INDEX IF EXISTS ix_users_name_lower'))
+    connection.execute(text('CREATE UNIQUE INDEX ix_users_name_lower ON users (lower(name))'))
+
+
+# (version, description, function applying the change to a connection)
+MIGRATIONS = [
+    (1, 'Add lookup indexes and unique movies per user', _add_lookup_indexes),
+    (2, 'Add movie enrichment status', _add_enrichment_status),
+    (3, 'Link movies to the film catalog', _add_catalog_link),
+    (4, 'Track when catalog entries were fetched from OMDb', _add_catalog_fetched_at),
+    (5, 'Index the movie year', _add_year_index),
+    (6, 'Make user names unique regardless of case', _unique_user_names_ignoring_case),
+]
+# Version einer Datenbank, auf die alle Migrationen angewendet sind
+SCHEMA_VERSION = max(version for version, _, _ in MIGRATIONS)
+
+
+def get_schema_version(connection):
+    """
+    Read the schema version of the database.
+    Args:
+        connection: SQLAlchemy connection.
+    Returns:
+        int: The number of the last applied migration.
+    """
+    return connection.execute(text('PRAGMA user_version')).scalar()
+
+
+def run_migrations(engine, migrations=None):
+    """
+    Apply all migrations newer than the database's schema version.
+    Args:
+        engine: SQLAlchemy engine of the database.
+        migrations (list): Migrations to consider, defaults to ``MIGRATIONS``.
+    Returns:
+        list: (version, description) of every migration applied by this call.
+    """
+    applied = []
+    for version, description, migrate in sorted(migrations or MIGRATIONS, key=lambda m: m[0]):
+        with engine.begin() as connection:
+            if get_schema_version(connection) >= version:
+                continue
+            migrate(connection)
+            connection.execute(text(f'PRAGMA user_version = {int(version)}'))
+        applied.append((version, description))
+    return applied
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Text, Boolean, Index, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -11,6 +12,9 @@ class User(Base):
     __tablename__ = 'users'
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
+    __table_args__ = (
+        Index('ix_users_name_lower', func.lower(name), unique=True),
+    )
     movies = relationship(
         'Movie',
         back_populates='user',
@@ -21,27 +25,93 @@ class User(Base):
         cascade='all, delete-orphan')
 
 
+class CatalogMovie(Base):
+    """
+    SQLAlchemy model for a film of the shared catalog. Its OMDb metadata is
+    stored once per film (keyed by imdbID), however many users list it.
+    """
+    __tablename__ = 'catalog_movies'
+    id = Column(Integer, primary_key=True)
+    imdb_id = Column(String, nullable=False, unique=True)
+    title = Column(String, nullable=False)
+    # Normalisierter Titel (wie enrichment_key), um Filme der User zuzuordnen
+    title_key = Column(String, nullable=False, index=True)
+    omdb_poster = Column(String, nullable=True)
+    omdb_rating = Column(String, nullable=True)
+    omdb_director = Column(String, nullable=True)
+    omdb_year = Column(String, nullable=True)
+    updated_at = Column(Float, nullable=False)
+    # Letzte Abfrage bei OMDb, auch wenn sich nichts geändert hat; die ältesten werden zuerst aufgefrischt
+    omdb_fetched_at = Column(Float, nullable=False, index=True)
+    movies = relationship('Movie', back_populates='catalog')
+
+
+def _catalog_field(name):
+    """
+    OMDb attribute of a movie, read from its catalog entry. Rows not yet moved
+    to the catalog by the migration still carry the value in their own column.
+    """
+    legacy = f'legacy_{name}'
+
+    def getter(self):
+        if self.catalog is not None:
+            return getattr(self.catalog, name)
+        return getattr(self, legacy)
+
+    def expression(cls):
+        return func.coalesce(
+            select(getattr(CatalogMovie, name)).where(CatalogMovie.id == cls.catalog_id).scalar_subquery(),
+            getattr(cls, legacy)).label(name)
+
+    return hybrid_property(getter).expression(expression)
+
+
 class Movie(Base):
     """
-    SQLAlchemy Movie model representing a movie in the database.
+    SQLAlchemy Movie model representing a movie in a user's list. The OMDb data
+    lives in the linked catalog entry.
     """
     __tablename__ = 'movies'
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     director = Column(String, nullable=False)
-    year = Column(Integer, nullable=False)
+    year = Column(Integer, nullable=False, index=True)
     rating = Column(Float, nullable=False)
+    # Kein eigener Index: user_id führt den Unique-Index (user_id, name, year) an
     user_id = Column(Integer, ForeignKey('users.id'))
     user = relationship('User', back_populates='movies')
     reviews = relationship(
         'Review',
         back_populates='movie',
         cascade='all, delete-orphan')
-    # OMDb Felder
-    omdb_poster = Column(String, nullable=True)
-    omdb_rating = Column(String, nullable=True)
-    omdb_director = Column(String, nullable=True)
-    omdb_year = Column(String, nullable=True)
+    catalog_id = Column(Integer, ForeignKey('catalog_movies.id'), nullable=True, index=True)
+    catalog = relationship('CatalogMovie', back_populates='movies', lazy='joined')
+    # OMDb-Spalten pro Kopie aus der Zeit vor dem Katalog; leer, sobald migriert
+    legacy_omdb_poster = Column('omdb_poster', String, nullable=True)
+    legacy_omdb_rating = Column('omdb_rating', String, nullable=True)
+    legacy_omdb_director = Column('omdb_director', String, nullable=True)
+    legacy_omdb_year = Column('omdb_year', String, nullable=True)
+    omdb_poster = _catalog_field('omdb_poster')
+    omdb_rating = _catalog_field('omdb_rating')
+    omdb_director = _catalog_field('omdb_director')
+    omdb_year = _catalog_field('omdb_year')
+    # 'pending' bis der Enrichment-Worker den Film dem Katalog zugeordnet hat,
+    # dann 'done', 'not_found' oder 'failed'
+    enrichment_status = Column(String, nullable=True)
+
+    @hybrid_property
+    def imdb_id(self):
+        return self.catalog.imdb_id if self.catalog is not None else None
+
+    @imdb_id.expression
+    def imdb_id(cls):
+        return select(CatalogMovie.imdb_id).where(
+            CatalogMovie.id == cls.catalog_id).scalar_subquery().label('imdb_id')
+    __table_args__ = (
+        Index('ux_movies_user_name_year', 'user_id', 'name', 'year', unique=True),
+        Index('ix_movies_enrichment_pending', func.lower(func.trim(name)),
+              sqlite_where=enrichment_status == 'pending'),
+    )
 
 
 class Review(Base):
@@ -50,10 +120,64 @@ class Review(Base):
     """
     __tablename__ = 'reviews'
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    movie_id = Column(Integer, ForeignKey('movies.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    movie_id = Column(Integer, ForeignKey('movies.id'), nullable=False, index=True)
     review_text = Column(Text, nullable=False)
     rating = Column(Float, nullable=False)
 
     user = relationship('User', back_populates='reviews')
     movie = relationship('Movie', back_populates='reviews')
+
+
+class OMDbCacheEntry(Base):
+    """
+    SQLAlchemy model for a cached OMDb API response (persistent cache tier).
+    """
+    __tablename__ = 'omdb_cache'
+    key = Column(String, primary_key=True)
+    payload = Column(Text, nullable=True)
+    found = Column(Boolean, nullable=False, default=True)
+    fetched_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
+
+
+class EnrichmentJob(Base):
+    """
+    SQLAlchemy model for a queued OMDb enrichment job. There is at most one job
+    per normalized title; all movies with that title are filled by it.
+    """
+    __tablename__ = 'enrichment_jobs'
+    id = Column(Integer, primary_key=True)
+    title_key = Column(String, nullable=False, unique=True)
+    title = Column(String, nullable=False)
+    status = Column(String, nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(Float, nullable=False)
+    locked_until = Column(Float, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)
+    __table_args__ = (
+        Index('ix_enrichment_jobs_status_next', 'status', 'next_attempt_at'),
+    )
+
+
+class DataVersion(Base):
+    """
+    SQLAlchemy model for the write counter of a database file (a single row),
+    shared by all processes using the file (see ``datamanager.data_version``).
+    """
+    __tablename__ = 'data_version'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+
+
+class Lease(Base):
+    """
+    SQLAlchemy model for a named lease held by one process at a time (see
+    ``datamanager.leases``).
+    """
+    __tablename__ = 'leases'
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(Float, nullable=False)
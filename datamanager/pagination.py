@@ -0,0 +1,67 @@
+import threading
+from typing import NamedTuple, Optional, List, Any
+
+
+class Page(NamedTuple):
+    """
+    One page of a paginated query result.
+    Attributes:
+        items (list): The objects on this page.
+        total (int): Total number of objects across all pages.
+        page (int): The 1-based page number.
+        per_page (int): Maximum number of objects per page.
+        next_cursor (int): ID to pass as ``after_id`` to seek to the next page,
+            or None if this is the last page.
+    """
+    items: List[Any]
+    total: int
+    page: int
+    per_page: int
+    next_cursor: Optional[int]
+
+    @property
+    def total_pages(self):
+        """
+        Number of pages needed for all objects (at least 1).
+        """
+        return max(1, -(-self.total // self.per_page))
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class CountCache:
+    """
+    Memoized COUNT(*) results for the pagination, shared by all threads of a
+    process. ``clear()`` is called on every write (own writes and the
+    'data_changed' event for writes of other processes); a count that was
+    computed while a write happened is not stored.
+    """
+
+    def __init__(self):
+        self._totals = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns:
+            tuple: The memoized total (or None) and a token to pass to ``put``.
+        """
+        with self._lock:
+            return self._totals.get(key), self._generation
+
+    def put(self, key, total, token):
+        with self._lock:
+            if token == self._generation:
+                self._totals[key] = total
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._totals.clear()
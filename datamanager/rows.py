@@ -0,0 +1,115 @@
+"""
+Lightweight row projections for the list views.
+
+List pages only show a few columns per item. The projection queries here
+select exactly those columns, with the OMDb data and the reviewer names joined
+in the same statement, and return them as named tuples instead of ORM
+instances: no identity map, no attribute instrumentation, and nothing left to
+lazy-load once the session is closed.
+"""
+from typing import NamedTuple, Optional, Union
+
+from sqlalchemy import func, select
+
+from datamanager.models import User, Movie, Review, CatalogMovie
+
+
+class MovieRow(NamedTuple):
+    """
+    A movie of a user's list, with the OMDb data taking precedence over the
+    user's own director, year and rating (as on the movie cards).
+    """
+    id: int
+    name: str
+    director: str
+    year: Union[str, int]
+    rating: Union[str, float]
+    poster: Optional[str]
+
+
+class FilmRow(NamedTuple):
+    """
+    A film of the catalog (home page).
+    """
+    id: int
+    imdb_id: str
+    name: str
+    director: Optional[str]
+    year: Optional[str]
+    rating: Optional[str]
+    poster: Optional[str]
+
+
+class ReviewRow(NamedTuple):
+    """
+    A review with the name of its author.
+    """
+    id: int
+    movie_id: int
+    user_id: int
+    user_name: Optional[str]
+    rating: float
+    review_text: str
+
+
+class UserRow(NamedTuple):
+    """
+    A user's ID and name (user lists and selection fields).
+    """
+    id: int
+    name: str
+
+
+def _prefer(omdb_column, own_column):
+    # Wie "omdb or own" in Python: leere OMDb-Werte zählen als fehlend
+    return func.coalesce(func.nullif(omdb_column, ''), own_column)
+
+
+def _movie_rows():
+    return select(
+        Movie.id, Movie.name,
+        _prefer(func.coalesce(CatalogMovie.omdb_director, Movie.legacy_omdb_director), Movie.director),
+        _prefer(func.coalesce(CatalogMovie.omdb_year, Movie.legacy_omdb_year), Movie.year),
+        _prefer(func.coalesce(CatalogMovie.omdb_rating, Movie.legacy_omdb_rating), Movie.rating),
+        func.coalesce(CatalogMovie.omdb_poster, Movie.legacy_omdb_poster),
+    ).select_from(Movie).outerjoin(CatalogMovie, CatalogMovie.id == Movie.catalog_id)
+
+
+def _film_rows():
+    return select(CatalogMovie.id, CatalogMovie.imdb_id, CatalogMovie.title, CatalogMovie.omdb_director,
+                  CatalogMovie.omdb_year, CatalogMovie.omdb_rating, CatalogMovie.omdb_poster)
+
+
+def _review_rows():
+    return select(Review.id, Review.movie_id, Review.user_id, User.name, Review.rating, Review.review_text
+                  ).select_from(Review).outerjoin(User, User.id == Review.user_id)
+
+
+def _user_rows():
+    return select(User.id, User.name)
+
+
+# Art -> (Modell für Filter/Sortierung, Abfrage, Zeilentyp)
+PROJECTIONS = {
+    'movies': (Movie, _movie_rows, MovieRow),
+    'films': (CatalogMovie, _film_rows, FilmRow),
+    'reviews': (Review, _review_rows, ReviewRow),
+    'users': (User, _user_rows, UserRow),
+}
+
+
+def projection(kind, after_id=None, **filters):
+    """
+    Build a projection query ordered by primary key.
+    Args:
+        kind (str): 'movies', 'films', 'reviews' or 'users'.
+        after_id (int): Only rows with a greater ID.
+        filters: Column values of the projected model to match (e.g. user_id=3).
+    Returns:
+        tuple: (model, select statement, row type).
+    """
+    model, build, row = PROJECTIONS[kind]
+    statement = build().where(*(getattr(model, name) == value for name, value in filters.items()))
+    if after_id is not None:
+        statement = statement.where(model.id > after_id)
+    return model, statement.order_by(model.id), row
@@ -0,0 +1,153 @@
+"""
+SQLite FTS5 full-text index over movie titles and directors.
+
+``movies_fts`` is an external-content FTS5 table on top of the
+``movies_fts_content`` view, which adds the OMDb director of each movie's
+catalog entry to its own title and director. Triggers on ``movies`` and
+``catalog_movies`` keep it in sync on insert, update and delete, so every write
+path (ORM, bulk inserts, raw SQL) updates the index.
+"""
+import re
+
+from sqlalchemy import text
+
+FTS_TABLE = 'movies_fts'
+CONTENT_VIEW = 'movies_fts_content'
+
+# bm25() weights for the indexed columns (name, director, omdb_director)
+BM25_WEIGHTS = (10.0, 4.0, 4.0)
+
+# OMDb-Regisseur aus dem Katalog, bei noch nicht migrierten Zeilen aus der eigenen Spalte
+_OMDB_DIRECTOR = ("COALESCE((SELECT omdb_director FROM catalog_movies WHERE id = {row}.catalog_id), "
+                  "{row}.omdb_director)")
+
+_CONTENT_VIEW_DDL = f"""CREATE VIEW IF NOT EXISTS {CONTENT_VIEW} AS
+    SELECT id, name, director, {_OMDB_DIRECTOR.format(row='movies')} AS omdb_director FROM movies"""
+
+_DDL = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, director, omdb_director,
+        content='{CONTENT_VIEW}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_ai AFTER INSERT ON movies BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, director, omdb_director)
+        VALUES (new.id, new.name, new.director, {_OMDB_DIRECTOR.format(row='new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_ad AFTER DELETE ON movies BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, director, omdb_director)
+        VALUES ('delete', old.id, old.name, old.director, {_OMDB_DIRECTOR.format(row='old')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_au
+        AFTER UPDATE OF name, director, omdb_director, catalog_id ON movies BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, director, omdb_director)
+        VALUES ('delete', old.id, old.name, old.director, {_OMDB_DIRECTOR.format(row='old')});
+        INSERT INTO {FTS_TABLE}(rowid, name, director, omdb_director)
+        VALUES (new.id, new.name, new.director, {_OMDB_DIRECTOR.format(row='new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS catalog_movies_fts_au
+        AFTER UPDATE OF omdb_director ON catalog_movies
+        WHEN old.omdb_director IS NOT new.omdb_director BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, director, omdb_director)
+        SELECT 'delete', id, name, director, COALESCE(old.omdb_director, omdb_director)
+        FROM movies WHERE catalog_id = new.id;
+        INSERT INTO {FTS_TABLE}(rowid, name, director, omdb_director)
+        SELECT id, name, director, COALESCE(new.omdb_director, omdb_director)
+        FROM movies WHERE catalog_id = new.id;
+    END""",
+]
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts5_available(connection) -> bool:
+    """
+    Check whether the SQLite build supports FTS5.
+    Args:
+        connection: SQLAlchemy connection.
+    Returns:
+        bool: True if FTS5 virtual tables can be created.
+    """
+    options = {row[0] for row in connection.execute(text('PRAGMA compile_options'))}
+    if 'ENABLE_FTS5' in options:
+        return True
+    try:
+        connection.execute(text('CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)'))
+        connection.execute(text('DROP TABLE temp._fts5_probe'))
+        return True
+    except Exception:
+        return False
+
+
+def ensure_fts_index(engine) -> bool:
+    """
+    Create the FTS5 table and its sync triggers if missing, and populate the
+    index from the existing rows when it is created for the first time.
+    Args:
+        engine: SQLAlchemy engine of the movie database.
+    Returns:
+        bool: True if full-text search is available, False if the SQLite build
+        lacks FTS5 (callers fall back to LIKE search).
+    """
+    with engine.begin() as connection:
+        if not fts5_available(connection):
+            return False
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}).first()
+        connection.execute(text(_CONTENT_VIEW_DDL))
+        if not exists:
+            for statement in _DDL:
+                connection.execute(text(statement))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        else:
+            for statement in _DDL[1:]:
+                connection.execute(text(statement))
+    return True
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free user input into a safe FTS5 MATCH expression. Every token is quoted
+    (so FTS5 operators in the input are not interpreted) and matched as a prefix;
+    all tokens must match.
+    Args:
+        query (str): The search string.
+    Returns:
+        str: The MATCH expression, or an empty string if the input has no tokens.
+    """
+    tokens = _TOKEN_RE.findall(query or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_movie_ids_statement(query: str, limit: int):
+    """
+    Build the ranked FTS5 lookup for a query.
+    Args:
+        query (str): The search string.
+        limit (int): Maximum number of IDs.
+    Returns:
+        tuple: (statement, parameters), or None if the query has no tokens.
+    """
+    match = build_match_query(query)
+    if not match:
+        return None
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    statement = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+                     f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT :limit")
+    return statement, {'match': match, 'limit': limit}
+
+
+def search_movie_ids(session, query: str, limit: int):
+    """
+    Find movie IDs matching the query, best bm25 rank first.
+    Args:
+        session: SQLAlchemy session.
+        query (str): The search string.
+        limit (int): Maximum number of IDs.
+    Returns:
+        list: Movie IDs ordered by relevance.
+    """
+    lookup = search_movie_ids_statement(query, limit)
+    if lookup is None:
+        return []
+    return [row[0] for row in session.execute(*lookup)]
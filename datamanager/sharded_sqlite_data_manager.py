@@ -0,0 +1,759 @@
+"""
+SQLite data manager partitioned across several database files.
+
+SQLite admits one writer per file. ``ShardedSQLiteDataManager`` keeps the users
+in a small global file and spreads the user-owned data over N shard files, so
+writes of users on different shards commit in parallel:
+
+* A user's movies live on shard ``user_id % N``. Reviews live on the shard of
+  the movie they belong to, so a movie, its reviews and the cascade between
+  them stay in one file.
+* Every shard hands out IDs from its own range (shard k: ``k * SHARD_ID_SPAN + 1``
+  upwards, via AUTOINCREMENT sequences seeded when the shard is created). The
+  shard of a movie or review is therefore known from its ID alone, and IDs
+  stay unique and globally ordered across shards.
+* Each shard is a complete ``SQLiteDataManager`` with its own film catalog,
+  enrichment queue and full-text index; a film listed on several shards has
+  one catalog entry per shard. The catalog listing shows such a film once,
+  with the entry of the lowest shard: every shard's listing skips the IMDb
+  IDs of the shards before it, whose files are attached to its connections.
+
+Reads of one user, movie or review go to one shard. Cross-shard reads (all
+movies, search, the catalog, global pages, a user's reviews) run on all shards
+in parallel and are merged. The number of shards is fixed when the database is
+created; SQLite attaches at most 10 files to a connection, so the catalog
+listing limits it to ``MAX_SHARDS``.
+"""
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, zip_longest
+
+from sqlalchemy import MetaData, event, exists, func, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from datamanager.data_manager_interface import DataManagerInterface
+from datamanager.engine import create_sqlite_engine
+from datamanager.models import Base, Movie, Review, CatalogMovie
+from datamanager.pagination import Page, CountCache
+from datamanager.rows import projection
+from datamanager.sqlite_data_manager import SQLiteDataManager, SEARCH_LIMIT
+from datamanager import catalog
+
+# IDs pro Shard; Shard k vergibt IDs ab k * SHARD_ID_SPAN + 1
+SHARD_ID_SPAN = 10 ** 12
+SHARDED_TABLES = ('movies', 'reviews', 'catalog_movies')
+# SQLite hängt höchstens 10 Dateien an eine Verbindung an (SQLITE_MAX_ATTACHED)
+MAX_SHARDS = 11
+
+
+def shard_file_names(db_file_name, shards):
+    """
+    File names of the shards belonging to a global database file.
+    Args:
+        db_file_name (str): The global SQLite file, e.g. 'moviwebapp.db'.
+        shards (int): Number of shards.
+    Returns:
+        list: e.g. ['moviwebapp.shard0.db', 'moviwebapp.shard1.db'].
+    """
+    root, ext = os.path.splitext(db_file_name)
+    return [f'{root}.shard{k}{ext or ".db"}' for k in range(shards)]
+
+
+def create_shard_schema(db_file_name, shard, engine_profile=None):
+    """
+    Create the schema of a new shard file with ID sequences starting at the
+    shard's range. Existing shard files are left unchanged.
+    Args:
+        db_file_name (str): The shard's SQLite file.
+        shard (int): The shard number.
+        engine_profile (dict): Overrides for the engine profile.
+    """
+    engine = create_sqlite_engine(db_file_name, engine_profile)
+    try:
+        if inspect(engine).has_table('movies'):
+            return
+        metadata = MetaData()
+        for table in Base.metadata.sorted_tables:
+            copy = table.to_metadata(metadata)
+            if table.name in SHARDED_TABLES:
+                copy.dialect_options['sqlite']['autoincrement'] = True
+        metadata.create_all(engine)
+        with engine.begin() as connection:
+            for name in SHARDED_TABLES:
+                connection.execute(text('INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)'),
+                                   {'name': name, 'seq': shard * SHARD_ID_SPAN})
+    finally:
+        engine.dispose()
+
+
+class ShardedSQLiteDataManager(DataManagerInterface):
+    """
+    Data manager implementation spreading movies and reviews over several
+    SQLite files by user.
+    """
+
+    def __init__(self, db_file_name, shards, engine_profile=None, create_schema=True):
+        """
+        Open (or create) the global database file and its shards.
+        Args:
+            db_file_name (str): The global SQLite file holding the users.
+            shards (int): Number of shard files.
+            engine_profile (dict): Overrides for the engine profile of every file.
+            create_schema (bool): Create missing tables and apply pending
+                migrations in every file (see ``SQLiteDataManager``).
+        Raises:
+            ValueError: If the number of shards is out of range or the shard
+                files on disk do not match it.
+        """
+        if not 1 <= shards <= MAX_SHARDS:
+            raise ValueError(f'Between 1 and {MAX_SHARDS} shards are supported')
+        files = shard_file_names(db_file_name, shards + 1)
+        present = [os.path.exists(name) for name in files]
+        if present[-1] or (any(present) and not all(present[:-1])):
+            raise ValueError(f'The shard files of {db_file_name} do not match {shards} shards')
+        self.users = SQLiteDataManager(db_file_name, engine_profile, create_schema)
+        self.shards = []
+        for shard, name in enumerate(files[:-1]):
+            create_shard_schema(name, shard, engine_profile)
+            self.shards.append(SQLiteDataManager(name, engine_profile, create_schema))
+        self.managers = [self.users] + self.shards
+        self.engine = self.users.engine
+        self.fts_enabled = all(shard.fts_enabled for shard in self.shards)
+        self._executor = ThreadPoolExecutor(max_workers=shards, thread_name_prefix='shard')
+        self._next_claim = 0
+        self._catalog_counts = CountCache()
+        self._catalogs = [_CatalogListing(shard, manager, files[:shard], engine_profile, self._catalog_counts)
+                          for shard, manager in enumerate(self.shards)]
+        for manager in self.shards:
+            # Ein neuer Film auf Shard k ändert die Listen aller höheren Shards
+            manager.add_listener(lambda event, data: self._catalog_counts.clear())
+
+    def begin_request_scope(self):
+        """
+        Start a request scope on the global file and every shard.
+        """
+        for manager in self.managers:
+            manager.begin_request_scope()
+
+    def end_request_scope(self, exception=None):
+        """
+        End the request scope on the global file and every shard.
+        Args:
+            exception (Exception): The exception that ended the request, if any.
+        """
+        for manager in self.managers:
+            manager.end_request_scope(exception)
+
+    def check_data_version(self):
+        """
+        Check the write counters of the global file and every shard for writes
+        of other processes (see ``SQLiteDataManager.check_data_version``).
+        Returns:
+            bool: True if another process changed any of the files.
+        """
+        return any([manager.check_data_version() for manager in self.managers])
+
+    def add_listener(self, listener):
+        """
+        Register a write listener on the global file and every shard.
+        Args:
+            listener (callable): Called as ``listener(event, data)``.
+        """
+        for manager in self.managers:
+            manager.add_listener(listener)
+
+    def shard_for_user(self, user_id):
+        """
+        The shard holding a user's movies (movies without a user live on shard 0).
+        """
+        return self.shards[(user_id or 0) % len(self.shards)]
+
+    def shard_for_id(self, key):
+        """
+        The shard that handed out a movie, review or catalog ID, or None if the
+        ID belongs to no shard.
+        """
+        if not key or key < 1:
+            return None
+        shard = (key - 1) // SHARD_ID_SPAN
+        return self.shards[shard] if shard < len(self.shards) else None
+
+    def _fan_out(self, call, shards=None):
+        """
+        Run ``call(shard)`` on all shards (or their ``shards`` views) in parallel.
+        Returns:
+            list: The results in shard order.
+        """
+        return list(self._executor.map(call, self.shards if shards is None else shards))
+
+    def get_all_users(self):
+        """
+        Retrieve all users from the global file.
+        Returns:
+            list: A list of User objects.
+        """
+        return self.users.get_all_users()
+
+    def get_user(self, user_id):
+        """
+        Retrieve a single user by ID.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            User: The User object, or None if not found.
+        """
+        return self.users.get_user(user_id)
+
+    def get_movie(self, movie_id):
+        """
+        Retrieve a single movie by ID from its shard.
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            Movie: The Movie object, or None if not found.
+        """
+        shard = self.shard_for_id(movie_id)
+        return shard.get_movie(movie_id) if shard else None
+
+    def get_review(self, review_id):
+        """
+        Retrieve a single review by ID from its shard.
+        Args:
+            review_id (int): The ID of the review.
+        Returns:
+            Review: The Review object, or None if not found.
+        """
+        shard = self.shard_for_id(review_id)
+        return shard.get_review(review_id) if shard else None
+
+    def get_user_movies(self, user_id):
+        """
+        Retrieve all movies for a specific user from the user's shard.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            list: A list of Movie objects for the user.
+        """
+        return self.shard_for_user(user_id).get_user_movies(user_id)
+
+    def add_user(self, user):
+        """
+        Add a new user to the global file, only if the name is unique.
+        Args:
+            user (dict): A dictionary containing user information.
+        Returns:
+            User: The created User object, or None if already exists.
+        """
+        return self.users.add_user(user)
+
+    def add_movie(self, movie):
+        """
+        Add a new movie on the user's shard.
+        Args:
+            movie (dict): A dictionary containing movie information.
+        Returns:
+            Movie: The created Movie object, or None if already exists for the user.
+        """
+        return self.shard_for_user(movie['user_id']).add_movie(movie)
+
+    def add_movies_bulk(self, movies):
+        """
+        Add many movies; each shard inserts its part in its own transaction, all
+        shards in parallel.
+        Args:
+            movies (list): A list of dictionaries containing movie information.
+        Returns:
+            int: The number of inserted movies.
+        Raises:
+            SQLAlchemyError: The error of the first failed shard (the other shards'
+                parts may be stored).
+        """
+        parts = {}
+        for movie in movies:
+            parts.setdefault(id(self.shard_for_user(movie['user_id'])), []).append(movie)
+        return sum(self._fan_out(lambda shard: shard.add_movies_bulk(parts.get(id(shard), []))))
+
+    def add_reviews_bulk(self, reviews):
+        """
+        Add many reviews on the shards of their movies, all shards in parallel.
+        Reviews of unknown movies are skipped.
+        Args:
+            reviews (list): A list of dictionaries containing review information.
+        Returns:
+            int: The number of inserted reviews.
+        """
+        parts = {}
+        for review in reviews:
+            shard = self.shard_for_id(review['movie_id'])
+            if shard is not None:
+                parts.setdefault(id(shard), []).append(review)
+        return sum(self._fan_out(lambda shard: shard.add_reviews_bulk(parts.get(id(shard), []))))
+
+    def update_movie(self, movie):
+        """
+        Update an existing movie on its shard.
+        Args:
+            movie (dict): A dictionary containing updated movie information.
+        Returns:
+            Movie: The updated Movie object, or None if not found.
+        """
+        shard = self.shard_for_id(movie['id'])
+        return shard.update_movie(movie) if shard else None
+
+    def delete_movie(self, movie_id):
+        """
+        Delete a movie (and its reviews) from its shard.
+        Args:
+            movie_id (int): The ID of the movie to delete.
+        Returns:
+            Movie: The deleted Movie object, or None if not found.
+        """
+        shard = self.shard_for_id(movie_id)
+        return shard.delete_movie(movie_id) if shard else None
+
+    def add_review(self, review):
+        """
+        Add a new review on the shard of its movie.
+        Args:
+            review (dict): A dictionary containing review information.
+        Returns:
+            Review: The created Review object, or None if the movie is unknown.
+        """
+        shard = self.shard_for_id(review['movie_id'])
+        return shard.add_review(review) if shard else None
+
+    def get_reviews_for_movie(self, movie_id):
+        """
+        Retrieve all reviews for a specific movie from its shard.
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            list: A list of Review objects for the movie.
+        """
+        shard = self.shard_for_id(movie_id)
+        return shard.get_reviews_for_movie(movie_id) if shard else []
+
+    def get_reviews_for_user(self, user_id):
+        """
+        Retrieve all reviews written by a specific user from all shards.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            list: A list of Review objects by the user, ordered by ID.
+        """
+        return list(chain.from_iterable(self._fan_out(lambda shard: shard.get_reviews_for_user(user_id))))
+
+    def update_review(self, review):
+        """
+        Update an existing review on its shard.
+        Args:
+            review (dict): A dictionary containing updated review information.
+        Returns:
+            Review: The updated Review object, or None if not found.
+        """
+        shard = self.shard_for_id(review['id'])
+        return shard.update_review(review) if shard else None
+
+    def delete_review(self, review_id):
+        """
+        Delete a review from its shard.
+        Args:
+            review_id (int): The ID of the review to delete.
+        Returns:
+            Review: The deleted Review object, or None if not found.
+        """
+        shard = self.shard_for_id(review_id)
+        return shard.delete_review(review_id) if shard else None
+
+    def search_movies(self, query, limit=SEARCH_LIMIT):
+        """
+        Search movies on all shards in parallel. The ranked results of the
+        shards are interleaved (best hit of every shard first).
+        Args:
+            query (str): The search string.
+            limit (int): Maximum number of results.
+        Returns:
+            list: A list of Movie objects.
+        """
+        results = self._fan_out(lambda shard: shard.search_movies(query, limit))
+        merged = [movie for movie in chain.from_iterable(zip_longest(*results)) if movie is not None]
+        return merged[:limit]
+
+    def get_all_movies(self):
+        """
+        Retrieve all movies from all shards.
+        Returns:
+            list: A list of all Movie objects, ordered by shard.
+        """
+        return list(chain.from_iterable(self._fan_out(lambda shard: shard.get_all_movies())))
+
+    def get_movie_titles(self):
+        """
+        Retrieve the title and poster URL of every movie on all shards.
+        Returns:
+            list: A list of (name, omdb_poster) tuples.
+        """
+        return list(chain.from_iterable(self._fan_out(lambda shard: shard.get_movie_titles())))
+
+    def claim_enrichment_job(self):
+        """
+        Claim the next due OMDb enrichment job, visiting the shards' queues in turn.
+        Returns:
+            dict: The job (with the 'shard' it belongs to), or None if none is due.
+        """
+        for _ in range(len(self.shards)):
+            shard = self._next_claim % len(self.shards)
+            self._next_claim = shard + 1
+            job = self.shards[shard].claim_enrichment_job()
+            if job is not None:
+                return dict(job, shard=shard)
+        return None
+
+    def complete_enrichment_job(self, job, data):
+        """
+        Complete a job on the shard it was claimed from.
+        Returns:
+            int: The number of updated movies.
+        """
+        return self.shards[job['shard']].complete_enrichment_job(job, data)
+
+    def fail_enrichment_job(self, job, error):
+        """
+        Record a failed enrichment attempt on the shard the job was claimed from.
+        Returns:
+            bool: True if the job will be retried.
+        """
+        return self.shards[job['shard']].fail_enrichment_job(job, error)
+
+    def backfill_catalog(self, after_id=0, batch_size=catalog.BACKFILL_BATCH_SIZE):
+        """
+        Move one batch of movie rows from before the catalog into it. The batch
+        continues on the next shard when a shard is done, so fewer scanned rows
+        than ``batch_size`` still means the migration is complete.
+        Args:
+            after_id (int): Keyset cursor returned by the previous batch.
+            batch_size (int): Maximum number of rows.
+        Returns:
+            dict: 'scanned', 'linked' and 'queued' row counts and 'last_id'.
+        """
+        totals = {'scanned': 0, 'linked': 0, 'queued': 0}
+        shard = after_id // SHARD_ID_SPAN
+        while shard < len(self.shards) and totals['scanned'] < batch_size:
+            limit = batch_size - totals['scanned']
+            stats = self.shards[shard].backfill_catalog(max(after_id, shard * SHARD_ID_SPAN), limit)
+            for name in totals:
+                totals[name] += stats[name]
+            after_id = stats['last_id']
+            if stats['scanned'] < limit:
+                # Shard fertig, der Cursor springt an den Anfang des nächsten Bereichs
+                shard += 1
+                after_id = shard * SHARD_ID_SPAN
+        totals['last_id'] = after_id
+        return totals
+
+    def get_catalog_stats(self):
+        """
+        Report the size of the shards' catalogs and the progress of their migration.
+        Returns:
+            dict: Number of (distinct) films, linked movies and movies still to migrate.
+        """
+        stats = _sum_stats(self._fan_out(lambda shard: shard.get_catalog_stats()))
+        stats['films'] = sum(self._fan_out(lambda listing: _shard_count(listing, CatalogMovie, {}), self._catalogs))
+        return stats
+
+    def get_stale_catalog_entries(self, max_age=catalog.REFRESH_MAX_AGE, limit=catalog.BACKFILL_BATCH_SIZE):
+        """
+        Find the catalog entries of all shards whose OMDb data was fetched longest ago.
+        Returns:
+            list: Entry dicts, oldest first.
+        """
+        parts = self._fan_out(lambda shard: shard.get_stale_catalog_entries(max_age, limit))
+        return list(heapq.merge(*parts, key=lambda entry: (entry['omdb_fetched_at'], entry['id'])))[:limit]
+
+    def refresh_catalog_entries(self, entries, answers):
+        """
+        Store fresh OMDb answers on the shards the entries belong to (catalog IDs
+        encode their shard).
+        Returns:
+            dict: 'checked' and 'changed' entry counts.
+        """
+        by_shard = {}
+        for entry in entries:
+            by_shard.setdefault(self.shard_for_id(entry['id']), []).append(entry)
+        return _sum_stats([shard.refresh_catalog_entries(shard_entries, answers)
+                           for shard, shard_entries in by_shard.items() if shard is not None]
+                          or [{'checked': 0, 'changed': 0}])
+
+    def acquire_lease(self, name, owner, seconds):
+        """
+        Take or renew a lease in the global file.
+        Returns:
+            bool: True if the caller holds the lease.
+        """
+        return self.users.acquire_lease(name, owner, seconds)
+
+    def release_lease(self, name, owner):
+        """
+        Give up a lease held in the global file.
+        """
+        self.users.release_lease(name, owner)
+
+    def get_catalog_refresh_stats(self, max_age=catalog.REFRESH_MAX_AGE):
+        """
+        Report how fresh the OMDb data of the shards' catalogs is.
+        Returns:
+            dict: Number of stale entries and age of the oldest fetch in seconds.
+        """
+        return _sum_stats(self._fan_out(lambda shard: shard.get_catalog_refresh_stats(max_age)),
+                          oldest_fetch_seconds=max)
+
+    def get_enrichment_queue_stats(self):
+        """
+        Report the depth of the shards' OMDb enrichment queues.
+        Returns:
+            dict: Job counts per status, pending movies and oldest pending job age.
+        """
+        return _sum_stats(self._fan_out(lambda shard: shard.get_enrichment_queue_stats()),
+                          oldest_pending_seconds=max)
+
+    def get_movies_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all movies, ordered by ID, from all shards.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return self._paginate(Movie, page, per_page, after_id)
+
+    def get_catalog_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the shards' film catalogs, ordered by ID. A film
+        listed on several shards appears once, with the entry of the lowest shard.
+        Returns:
+            Page: The CatalogMovie objects on the page plus the total count and next cursor.
+        """
+        return self._paginate(CatalogMovie, page, per_page, after_id, shards=self._catalogs)
+
+    def get_users_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all users from the global file.
+        Returns:
+            Page: The users on the page plus the total count and next cursor.
+        """
+        return self.users.get_users_page(page, per_page, after_id)
+
+    def get_user_movies_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the movies of a user from the user's shard.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return self.shard_for_user(user_id).get_user_movies_page(user_id, page, per_page, after_id)
+
+    def get_reviews_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a movie from its shard.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        shard = self.shard_for_id(movie_id)
+        if shard is None:
+            return Page([], 0, max(1, int(page or 1)), max(1, int(per_page)), None)
+        return shard.get_reviews_for_movie_page(movie_id, page, per_page, after_id)
+
+    def get_reviews_for_user_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews written by a user, from all shards.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._paginate(Review, page, per_page, after_id, user_id=user_id)
+
+    def get_reviews_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all reviews, ordered by ID, from all shards.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._paginate(Review, page, per_page, after_id)
+
+    def get_user_rows(self, user_ids=None):
+        """
+        Retrieve the ID and name of users from the global file.
+        Returns:
+            list: A list of UserRow tuples.
+        """
+        return self.users.get_user_rows(user_ids)
+
+    def get_user_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of users as rows from the global file.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self.users.get_user_rows_page(page, per_page, after_id)
+
+    def get_catalog_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the shards' film catalogs as rows, ordered by ID,
+        each film once (see ``get_catalog_page``).
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._paginate(CatalogMovie, page, per_page, after_id, kind='films', shards=self._catalogs)
+
+    def get_user_movie_rows_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of a user's movies as rows from the user's shard.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self.shard_for_user(user_id).get_user_movie_rows_page(user_id, page, per_page, after_id)
+
+    def get_review_rows_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a movie as rows from its shard; the
+        reviewers' names come from the global file in one query.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        shard = self.shard_for_id(movie_id)
+        if shard is None:
+            return Page([], 0, max(1, int(page or 1)), max(1, int(per_page)), None)
+        rows = shard.get_review_rows_for_movie_page(movie_id, page, per_page, after_id)
+        names = {user.id: user.name for user in self.users.get_user_rows({row.user_id for row in rows.items})}
+        return rows._replace(items=[row._replace(user_name=names.get(row.user_id)) for row in rows.items])
+
+    def iter_users(self, fields, after_id=None):
+        """
+        Stream all users from the global file.
+        """
+        return self.users.iter_users(fields, after_id)
+
+    def iter_movies(self, fields, after_id=None, user_id=None):
+        """
+        Stream movies ordered by ID: one shard for a user, otherwise the shards
+        one after another (their ID ranges follow each other).
+        """
+        if user_id is not None:
+            return self.shard_for_user(user_id).iter_movies(fields, after_id, user_id)
+        return chain.from_iterable(shard.iter_movies(fields, after_id) for shard in self.shards)
+
+    def iter_reviews(self, fields, after_id=None, user_id=None, movie_id=None):
+        """
+        Stream reviews ordered by ID: one shard for a movie, otherwise the
+        shards one after another.
+        """
+        if movie_id is not None:
+            shard = self.shard_for_id(movie_id)
+            return shard.iter_reviews(fields, after_id, user_id, movie_id) if shard else iter(())
+        return chain.from_iterable(shard.iter_reviews(fields, after_id, user_id) for shard in self.shards)
+
+    def _paginate(self, model, page, per_page, after_id, kind=None, shards=None, **filters):
+        """
+        Paginate over all shards (or their ``shards`` views), returning ORM
+        objects or, with ``kind``, the rows of that projection. With a cursor
+        every shard seeks past it in parallel and the pages are merged by ID;
+        otherwise the shards' counts locate the global offset, which only
+        touches the shards it falls on.
+        """
+        page = max(1, int(page or 1))
+        per_page = max(1, int(per_page))
+        shards = self.shards if shards is None else shards
+        totals = self._fan_out(lambda shard: _shard_count(shard, model, filters), shards)
+        if after_id is not None:
+            parts = self._fan_out(lambda shard: _shard_rows(shard, model, kind, filters, after_id, 0, per_page + 1),
+                                  shards)
+            items = list(heapq.merge(*parts, key=lambda obj: obj.id))[:per_page + 1]
+        else:
+            # Shards liegen in ID-Reihenfolge hintereinander: globaler Offset -> Shard und lokaler Offset
+            offset, limit, ranges = (page - 1) * per_page, per_page + 1, {}
+            for shard, total in zip(shards, totals):
+                if limit and offset < total:
+                    ranges[id(shard)] = (offset, min(limit, total - offset))
+                    limit -= ranges[id(shard)][1]
+                offset = max(0, offset - total)
+            parts = self._fan_out(lambda shard: _shard_rows(shard, model, kind, filters, None, *ranges[id(shard)])
+                                  if id(shard) in ranges else [], shards)
+            items = list(chain.from_iterable(parts))
+        next_cursor = items[per_page - 1].id if len(items) > per_page else None
+        return Page(items[:per_page], sum(totals), page, per_page, next_cursor)
+
+
+def _shard_count(shard, model, filters):
+    session = shard.Session()
+    try:
+        return shard._count(session, model, filters)
+    finally:
+        shard._release(session)
+
+
+def _shard_rows(shard, model, kind, filters, after_id, offset, limit):
+    criteria = getattr(shard, 'criteria', ())
+    session = shard.Session()
+    try:
+        if kind is not None:
+            _, statement, row = projection(kind, after_id, **filters)
+            statement = statement.where(*criteria)
+            return [row(*values) for values in session.execute(statement.offset(offset).limit(limit))]
+        query = session.query(model).filter_by(**filters).filter(*criteria).order_by(model.id)
+        if after_id is not None:
+            query = query.filter(model.id > after_id)
+        return query.offset(offset).limit(limit).all()
+    finally:
+        shard._release(session)
+
+
+class _CatalogListing:
+    """
+    Read-only view of one shard's catalog without the films a lower shard
+    already lists. The lower shards' files are attached to the connections of
+    its own engine, so the check is a NOT EXISTS on their unique imdb_id index.
+    Quacks like a shard for ``_shard_count`` and ``_shard_rows``.
+    """
+
+    def __init__(self, shard, manager, lower_files, engine_profile, counts):
+        self.shard = shard
+        self.counts = counts
+        if lower_files:
+            engine = create_sqlite_engine(manager.engine.url.database, engine_profile)
+            _attach(engine, lower_files)
+        else:
+            engine = manager.engine
+        self.Session = sessionmaker(bind=engine)
+        metadata = MetaData()
+        lower_tables = [CatalogMovie.__table__.to_metadata(metadata, schema=f'shard{lower}').alias(f'lower{lower}')
+                        for lower in range(len(lower_files))]
+        self.criteria = [~exists().where(table.c.imdb_id == CatalogMovie.imdb_id) for table in lower_tables]
+
+    def _count(self, session, model, filters):
+        key = (self.shard,) + tuple(sorted(filters.items()))
+        total, token = self.counts.get(key)
+        if total is None:
+            total = session.query(func.count(model.id)).filter_by(**filters).filter(*self.criteria).scalar()
+            self.counts.put(key, total, token)
+        return total
+
+    def _release(self, session):
+        session.close()
+
+
+def _attach(engine, files):
+    @event.listens_for(engine, 'connect')
+    def attach_lower_shards(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for shard, name in enumerate(files):
+            cursor.execute(f'ATTACH DATABASE ? AS shard{shard}', (name,))
+        cursor.close()
+
+
+def _sum_stats(parts, **combine):
+    """
+    Combine the stats dicts of the shards: values are summed unless ``combine``
+    names another function for a key.
+    """
+    stats = {}
+    for part in parts:
+        for name, value in part.items():
+            stats[name] = combine.get(name, sum)((stats[name], value)) if name in stats else value
+    return stats
@@ -1,7 +1,26 @@
 from datamanager.data_manager_interface import DataManagerInterface
-from datamanager.models import User, Movie, Review, Base
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from datamanager.models import User, Movie, Review, CatalogMovie, Base
+from datamanager.pagination import CountCache, Page
+from datamanager.rows import projection
+from datamanager.search_index import ensure_fts_index, search_movie_ids, FTS_TABLE
+from datamanager.engine import create_sqlite_engine
+from datamanager.migrations import run_migrations, get_schema_version, SCHEMA_VERSION
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker, scoped_session
+import contextvars
+import threading
+from datamanager import enrichment_queue, catalog, data_version, leases
+from omdb import NOT_FOUND
+from utils import get_cached_omdb_raw
+
+SEARCH_LIMIT = 200
+# Zeilen pro INSERT/Duplikat-Abfrage beim Bulk-Import (SQLite-Parameterlimit beachten)
+BULK_CHUNK_SIZE = 500
+BULK_MOVIE_COLUMNS = ('name', 'director', 'year', 'rating', 'user_id')
+BULK_REVIEW_COLUMNS = ('user_id', 'movie_id', 'review_text', 'rating')
+# Zeilen pro Fetch beim Streamen großer Ergebnismengen (iter_*)
+STREAM_BATCH_SIZE = 1000
 
 
 class SQLiteDataManager(DataManagerInterface):
@@ -9,15 +28,188 @@ class SQLiteDataManager(DataManagerInterface):
     Data manager implementation for SQLite using SQLAlchemy ORM.
     """
 
-    def __init__(self, db_file_name):
+    def __init__(self, db_file_name, engine_profile=None, create_schema=True):
         """
         Initialize the SQLiteDataManager with the given database file name.
         Args:
             db_file_name (str): The SQLite database file name.
+            engine_profile (dict): Overrides for the engine profile (journal mode,
+                pragmas, busy timeout, pool), see ``datamanager.engine``.
+            create_schema (bool): Create missing tables and apply pending
+                migrations. If False, an outdated schema is only reported and
+                must be brought up to date with ``migrate()``.
+        """
+        self.engine = create_sqlite_engine(db_file_name, engine_profile)
+        # Ein aktuelles Schema wird nur gelesen, nicht per create_all reflektiert
+        current, self.fts_enabled = self._check_schema()
+        if not current:
+            if create_schema:
+                self.migrate()
+            else:
+                print(f"Database {db_file_name} has pending schema migrations "
+                      f"(apply them with 'flask --app app db-migrate')")
+        # Innerhalb eines Requests teilen sich alle Aufrufe eine Session, die erst beim
+        # Teardown committet bzw. geschlossen wird; der Scope steht in einer ContextVar,
+        # damit nebenläufige Coroutinen im ASGI-Modus (ein Thread) getrennt bleiben.
+        # Außerhalb eines Requests hat jeder Thread seine eigene Session.
+        self._scope = contextvars.ContextVar(f'request_scope_{id(self)}', default=None)
+        self.Session = scoped_session(sessionmaker(bind=self.engine, expire_on_commit=False),
+                                      scopefunc=self._session_key)
+        self._stream_session = sessionmaker(bind=self.engine)
+        # Gecachte COUNT(*)-Ergebnisse für die Pagination, bei jedem eigenen oder fremden
+        # Schreibzugriff geleert (check_data_version)
+        self._counts = CountCache()
+        self._listeners = []
+        # Zuletzt gesehener Stand des Schreibzählers, den alle Prozesse teilen
+        self._seen_version = self._read_data_version()
+        self._version_lock = threading.Lock()
+
+    def _check_schema(self):
+        """
+        Check with a single catalog query whether the schema is up to date.
+        Returns:
+            tuple: (True if all tables exist and all migrations are applied,
+            True if the full-text index exists).
+        """
+        with self.engine.connect() as connection:
+            version = get_schema_version(connection)
+            tables = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+        current = version >= SCHEMA_VERSION and tables.issuperset(Base.metadata.tables)
+        return current, FTS_TABLE in tables
+
+    def migrate(self):
+        """
+        Create missing tables, apply pending migrations and set up the
+        full-text index.
+        Returns:
+            list: (version, description) of every migration applied by this call.
         """
-        self.engine = create_engine(f'sqlite:///{db_file_name}')
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        applied = run_migrations(self.engine)
+        self.fts_enabled = ensure_fts_index(self.engine)
+        return applied
+
+    def begin_request_scope(self):
+        """
+        Start a request scope: until ``end_request_scope`` all calls in this
+        context (the request's thread, or its task in the ASGI mode) share one
+        session instead of opening and closing their own.
+        """
+        self._scope.set(object())
+
+    def end_request_scope(self, exception=None):
+        """
+        End the request scope, committing (or rolling back on error) and closing
+        the shared session.
+        Args:
+            exception (Exception): The exception that ended the request, if any.
+        """
+        session = self.Session()
+        try:
+            if exception is None:
+                session.commit()
+            else:
+                session.rollback()
+        finally:
+            self.Session.remove()
+            self._scope.set(None)
+
+    def _release(self, session):
+        """
+        Close the session after a call, unless it is shared by the current request.
+        """
+        if self._scope.get() is None:
+            self.Session.remove()
+
+    def _session_key(self):
+        # Im Request-Scope gehört die Session dem Request, sonst dem Thread
+        scope = self._scope.get()
+        return threading.get_ident() if scope is None else scope
+
+    def _discard(self):
+        """
+        Roll back the current session after a failed write and release it.
+        """
+        session = self.Session()
+        session.rollback()
+        self._release(session)
+
+    def add_listener(self, listener):
+        """
+        Register a callback that is notified after every successful write.
+        Args:
+            listener (callable): Called as ``listener(event, data)`` with the event
+                name (e.g. 'movie_added') and a dictionary describing the change.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event, **data):
+        """
+        Invalidate the count cache, advance the shared write counter and inform
+        all write listeners.
+        """
+        self._counts.clear()
+        self._record_write()
+        self._dispatch(event, data)
+
+    def _dispatch(self, event, data):
+        """
+        Inform all write listeners of an event.
+        """
+        for listener in self._listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                print(f"Fehler in einem Write-Listener ({event}): {e}")
+
+    def check_data_version(self):
+        """
+        Check whether another process wrote to the database since the last
+        check (see ``datamanager.data_version``). If so, the count cache is
+        cleared and the listeners get a 'data_changed' event, so they drop
+        everything they cached. Called once per request.
+        Returns:
+            bool: True if another process changed the data.
+        """
+        version = self._read_data_version()
+        with self._version_lock:
+            if version is None or version == self._seen_version:
+                return False
+            self._seen_version = version
+        self._counts.clear()
+        self._dispatch('data_changed', {})
+        return True
+
+    def _read_data_version(self):
+        """
+        Read the shared write counter, or None if it cannot be read (e.g. the
+        schema is not migrated yet).
+        """
+        session = self.Session()
+        try:
+            return data_version.current(session)
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Lesen der Datenversion: {e}")
+            return None
+        finally:
+            self._release(session)
+
+    def _record_write(self):
+        """
+        Advance the shared write counter after a commit. If it moved by more than
+        this write, another process wrote meanwhile, and the next check drops
+        the caches.
+        """
+        try:
+            with self.engine.begin() as connection:
+                version = data_version.bump(connection)
+        except Exception as e:
+            print(f"Fehler beim Erhöhen der Datenversion: {e}")
+            return
+        with self._version_lock:
+            if self._seen_version is not None and version == self._seen_version + 1:
+                self._seen_version = version
 
     def get_all_users(self):
         """
@@ -27,9 +219,49 @@ class SQLiteDataManager(DataManagerInterface):
         """
         session = self.Session()
         users = session.query(User).all()
-        session.close()
+        self._release(session)
         return users
 
+    def get_user(self, user_id):
+        """
+        Retrieve a single user by ID.
+        Args:
+            user_id (int): The ID of the user.
+        Returns:
+            User: The User object, or None if not found.
+        """
+        return self._get_by_id(User, user_id)
+
+    def get_movie(self, movie_id):
+        """
+        Retrieve a single movie by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+        Returns:
+            Movie: The Movie object, or None if not found.
+        """
+        return self._get_by_id(Movie, movie_id)
+
+    def get_review(self, review_id):
+        """
+        Retrieve a single review by ID.
+        Args:
+            review_id (int): The ID of the review.
+        Returns:
+            Review: The Review object, or None if not found.
+        """
+        return self._get_by_id(Review, review_id)
+
+    def _get_by_id(self, model, key):
+        """
+        Primary-key lookup; within a request scope the session's identity map
+        answers repeated lookups without a query.
+        """
+        session = self.Session()
+        obj = session.get(model, key)
+        self._release(session)
+        return obj
+
     def get_user_movies(self, user_id):
         """
         Retrieve all movies for a specific user.
@@ -40,7 +272,7 @@ class SQLiteDataManager(DataManagerInterface):
         """
         session = self.Session()
         movies = session.query(Movie).filter_by(user_id=user_id).all()
-        session.close()
+        self._release(session)
         return movies
 
     def add_user(self, user):
@@ -53,16 +285,25 @@ class SQLiteDataManager(DataManagerInterface):
         """
         try:
             session = self.Session()
-            existing = session.query(User).filter_by(name=user['name']).first()
+            existing = session.query(User).filter(
+                func.lower(User.name) == user['name'].lower()).first()
             if existing:
-                session.close()
+                self._release(session)
                 return None
             new_user = User(name=user['name'])
             session.add(new_user)
+            session.flush()
+            event = {'id': new_user.id, 'name': new_user.name}
             session.commit()
-            session.close()
+            self._release(session)
+            self._notify('user_added', **event)
             return new_user
+        except IntegrityError:
+            # Gleichzeitig angelegt: der Unique-Index auf lower(name) hat entschieden
+            self._discard()
+            return None
         except Exception as e:
+            self._discard()
             print(f"Fehler beim Hinzufügen eines Users: {e}")
             return None
 
@@ -75,52 +316,136 @@ class SQLiteDataManager(DataManagerInterface):
             Movie: The created Movie object, or None if already exists for the user.
         """
         try:
-            import requests
-            import os
             session = self.Session()
             existing = session.query(Movie).filter_by(
                 name=movie['name'], year=movie['year'], user_id=movie['user_id']).first()
             if existing:
-                session.close()
+                self._release(session)
                 return None
-            # OMDb-Daten abrufen
-            OMDB_API_KEY = os.getenv('OMDB_API_KEY')
-            omdb_poster = None
-            omdb_rating = None
-            omdb_director = None
-            omdb_year = None
-            if OMDB_API_KEY:
-                url = f"http://www.omdbapi.com/?t={movie['name']}&apikey={OMDB_API_KEY}&type=movie&plot=short&r=json"
-                try:
-                    r = requests.get(url)
-                    if r.status_code == 200:
-                        data = r.json()
-                        if data.get('Response') == 'True':
-                            omdb_poster = data.get('Poster', None)
-                            omdb_rating = data.get('imdbRating', None)
-                            omdb_director = data.get('Director', None)
-                            omdb_year = data.get('Year', None)
-                except Exception:
-                    pass
+            # OMDb-Daten nur aus Katalog oder Cache; sonst übernimmt der Enrichment-Worker
+            entry, status = self._catalog_link(session, movie['name'], movie['year'])
             new_movie = Movie(
                 name=movie['name'],
                 director=movie['director'],
                 year=movie['year'],
                 rating=movie['rating'],
                 user_id=movie['user_id'],
-                omdb_poster=omdb_poster,
-                omdb_rating=omdb_rating,
-                omdb_director=omdb_director,
-                omdb_year=omdb_year
+                catalog=entry,
+                enrichment_status=status
             )
             session.add(new_movie)
+            if new_movie.enrichment_status == 'pending':
+                enrichment_queue.enqueue(session, [new_movie.name])
+            session.flush()
+            event = {'id': new_movie.id, 'name': new_movie.name,
+                     'user_id': new_movie.user_id, 'omdb_poster': new_movie.omdb_poster}
             session.commit()
-            session.close()
+            self._release(session)
+            self._notify('movie_added', **event)
+            if new_movie.enrichment_status == 'pending':
+                self._notify('enrichment_queued', titles=[new_movie.name])
             return new_movie
         except Exception as e:
+            self._discard()
             print(f"Fehler beim Hinzufügen eines Films: {e}")
             return None
 
+    def add_movies_bulk(self, movies):
+        """
+        Add many movies in a single transaction with one batched INSERT per chunk.
+        Duplicates (same user, name and year), both against the database and within
+        the list, are detected with one query per chunk and skipped, so the call is
+        idempotent. No OMDb requests are made: a raw OMDb answer passed under
+        'omdb' is stored in the catalog, titles already in the catalog are linked
+        to it, and enrichment jobs are queued for the rest.
+        Args:
+            movies (list): A list of dictionaries containing movie information.
+        Returns:
+            int: The number of inserted movies.
+        Raises:
+            SQLAlchemyError: If the transaction failed (it is rolled back, nothing is inserted).
+        """
+        if not movies:
+            return 0
+        try:
+            session = self.Session()
+            inserted = []
+            table = Movie.__table__
+            for start in range(0, len(movies), BULK_CHUNK_SIZE):
+                chunk = movies[start:start + BULK_CHUNK_SIZE]
+                # user_id/name IN (...) nutzt den Unique-Index (user_id, name, year)
+                existing = set(session.query(Movie.user_id, Movie.name, Movie.year).filter(
+                    Movie.user_id.in_({m['user_id'] for m in chunk}),
+                    Movie.name.in_({m['name'] for m in chunk})).all())
+                entries = catalog.upsert(session, [
+                    row for row in (catalog.catalog_values(m.get('omdb')) for m in chunk) if row])
+                matches = catalog.match_titles(session, {(m['name'], m['year']) for m in chunk})
+                rows = []
+                candidates = []
+                for movie in chunk:
+                    key = (movie['user_id'], movie['name'], movie['year'])
+                    if key in existing:
+                        continue
+                    existing.add(key)
+                    row = {column: movie.get(column) for column in BULK_MOVIE_COLUMNS}
+                    entry = entries.get((movie.get('omdb') or {}).get('imdbID')) or matches.get(
+                        (movie['name'], movie['year']))
+                    row['catalog_id'] = entry['id'] if entry else None
+                    row['enrichment_status'] = movie.get('enrichment_status', 'done' if entry else 'pending')
+                    rows.append(row)
+                    candidates.append({'name': row['name'], 'user_id': row['user_id'], 'year': row['year'],
+                                       'omdb_poster': entry['omdb_poster'] if entry else None,
+                                       'enrichment_status': row['enrichment_status']})
+                if rows:
+                    # OR IGNORE überspringt Duplikate paralleler Schreiber stillschweigend;
+                    # RETURNING liefert nur die tatsächlich eingefügten Zeilen
+                    added = set(session.execute(
+                        insert(table).prefix_with('OR IGNORE').returning(table.c.user_id, table.c.name, table.c.year),
+                        rows).tuples())
+                    inserted.extend(m for m in candidates if (m['user_id'], m['name'], m['year']) in added)
+            # Filme ohne Katalogeintrag werden später vom Enrichment-Worker ergänzt
+            pending = [m['name'] for m in inserted if m['enrichment_status'] == 'pending']
+            enrichment_queue.enqueue(session, pending)
+            session.commit()
+            self._release(session)
+            if inserted:
+                self._notify('movies_added', movies=[
+                    {'name': m['name'], 'user_id': m['user_id'], 'omdb_poster': m['omdb_poster']}
+                    for m in inserted])
+            if pending:
+                self._notify('enrichment_queued', titles=pending)
+            return len(inserted)
+        except Exception as e:
+            self._discard()
+            print(f"Fehler beim Hinzufügen mehrerer Filme: {e}")
+            raise
+
+    def add_reviews_bulk(self, reviews):
+        """
+        Add many reviews in a single transaction with one batched INSERT per chunk.
+        Args:
+            reviews (list): A list of dictionaries containing review information.
+        Returns:
+            int: The number of inserted reviews.
+        """
+        if not reviews:
+            return 0
+        try:
+            session = self.Session()
+            for start in range(0, len(reviews), BULK_CHUNK_SIZE):
+                session.execute(insert(Review.__table__), [
+                    {column: review[column] for column in BULK_REVIEW_COLUMNS}
+                    for review in reviews[start:start + BULK_CHUNK_SIZE]])
+            session.commit()
+            self._release(session)
+            self._notify('reviews_added', movie_ids=sorted({r['movie_id'] for r in reviews}),
+                         user_ids=sorted({r['user_id'] for r in reviews}))
+            return len(reviews)
+        except Exception as e:
+            self._discard()
+            print(f"Fehler beim Hinzufügen mehrerer Reviews: {e}")
+            return 0
+
     def update_movie(self, movie):
         """
         Update an existing movie in the database.
@@ -130,39 +455,242 @@ class SQLiteDataManager(DataManagerInterface):
             Movie: The updated Movie object, or None if not found.
         """
         try:
-            import requests
-            import os
             session = self.Session()
             db_movie = session.query(Movie).filter_by(id=movie['id']).first()
+            event = None
             if db_movie:
+                old_name = db_movie.name
                 db_movie.name = movie['name']
                 db_movie.director = movie['director']
                 db_movie.year = movie['year']
                 db_movie.rating = movie['rating']
-                # OMDb-Daten aktualisieren
-                OMDB_API_KEY = os.getenv('OMDB_API_KEY')
-                if OMDB_API_KEY:
-                    url = f"http://www.omdbapi.com/?t={movie['name']}&apikey={OMDB_API_KEY}&type=movie&plot=short&r=json"
-                    try:
-                        r = requests.get(url)
-                        if r.status_code == 200:
-                            data = r.json()
-                            if data.get('Response') == 'True':
-                                db_movie.omdb_poster = data.get('Poster', None)
-                                db_movie.omdb_rating = data.get(
-                                    'imdbRating', None)
-                                db_movie.omdb_director = data.get(
-                                    'Director', None)
-                                db_movie.omdb_year = data.get('Year', None)
-                    except Exception:
-                        pass
+                # Katalogeintrag nur bei geändertem Titel neu bestimmen (Katalog, Cache oder Worker)
+                refresh = old_name != db_movie.name or db_movie.enrichment_status == 'failed'
+                if refresh:
+                    db_movie.catalog, db_movie.enrichment_status = self._catalog_link(
+                        session, db_movie.name, db_movie.year)
+                    for column in catalog.LEGACY_COLUMNS:
+                        setattr(db_movie, column, None)
+                queued = refresh and db_movie.enrichment_status == 'pending'
+                if queued:
+                    enrichment_queue.enqueue(session, [db_movie.name])
+                event = {'id': db_movie.id, 'name': db_movie.name, 'old_name': old_name,
+                         'user_id': db_movie.user_id, 'omdb_poster': db_movie.omdb_poster}
                 session.commit()
-            session.close()
+            self._release(session)
+            if event:
+                self._notify('movie_updated', **event)
+                if queued:
+                    self._notify('enrichment_queued', titles=[event['name']])
             return db_movie
         except Exception as e:
+            self._discard()
             print(f"Fehler beim Aktualisieren eines Films: {e}")
             return None
 
+    @staticmethod
+    def _catalog_link(session, title, year):
+        """
+        Find the catalog entry of a movie from the catalog itself or the cached
+        OMDb answer, so writes never wait for the network. A cached answer for
+        another year is not used; the movie stays pending instead.
+        Returns:
+            tuple: (CatalogMovie or None, enrichment status).
+        """
+        entry = catalog.match_titles(session, [(title, year)]).get((title, year))
+        if entry is None:
+            cached = get_cached_omdb_raw(title)
+            if cached is None or (cached is not NOT_FOUND and not catalog.year_matches(cached.get('Year'), year)):
+                return None, 'pending'
+            entry = catalog.store(session, cached) if cached is not NOT_FOUND else None
+            if entry is None:
+                return None, 'not_found'
+        return session.get(CatalogMovie, entry['id']), 'done'
+
+    def claim_enrichment_job(self):
+        """
+        Claim the next due OMDb enrichment job.
+        Returns:
+            dict: The job ('id', 'title', 'title_key', 'attempts'), or None if none is due.
+        """
+        session = self.Session()
+        try:
+            return enrichment_queue.claim(session)
+        finally:
+            self._release(session)
+
+    def complete_enrichment_job(self, job, data):
+        """
+        Store the film in the catalog and link all pending movies with the job's
+        title and the film's year to it.
+        Args:
+            job (dict): The claimed job.
+            data (dict): Raw OMDb JSON, or None if OMDb does not know the title.
+        Returns:
+            int: The number of updated movies.
+        """
+        session = self.Session()
+        try:
+            entry = catalog.store(session, data) if data else None
+            movies = enrichment_queue.complete(session, job, entry, year=(data or {}).get('Year'))
+        finally:
+            self._release(session)
+        if movies:
+            self._notify('movies_enriched', movies=movies)
+        return len(movies)
+
+    def fail_enrichment_job(self, job, error):
+        """
+        Record a failed enrichment attempt (retried with backoff until it gives up).
+        Args:
+            job (dict): The claimed job.
+            error (str): Error description.
+        Returns:
+            bool: True if the job will be retried.
+        """
+        session = self.Session()
+        try:
+            return enrichment_queue.fail(session, job, error)
+        finally:
+            self._release(session)
+
+    def backfill_catalog(self, after_id=0, batch_size=catalog.BACKFILL_BATCH_SIZE):
+        """
+        Move one batch of movie rows from before the catalog into it (online
+        migration, see ``datamanager.catalog``).
+        Args:
+            after_id (int): Keyset cursor returned by the previous batch.
+            batch_size (int): Maximum number of rows.
+        Returns:
+            dict: 'scanned', 'linked' and 'queued' row counts and 'last_id', the
+            cursor for the next batch. Fewer scanned rows than ``batch_size``
+            means the migration is complete.
+        """
+        session = self.Session()
+        try:
+            stats = catalog.backfill(session, after_id, batch_size)
+        finally:
+            self._release(session)
+        movies = stats.pop('movies')
+        titles = stats.pop('titles')
+        if movies:
+            self._notify('movies_enriched', movies=movies)
+        if titles:
+            self._notify('enrichment_queued', titles=titles)
+        return stats
+
+    def get_catalog_stats(self):
+        """
+        Report the size of the catalog and the progress of its migration.
+        Returns:
+            dict: Number of films, linked movies and movies still to migrate.
+        """
+        session = self.Session()
+        stats = catalog.catalog_stats(session)
+        self._release(session)
+        return stats
+
+    def get_stale_catalog_entries(self, max_age=catalog.REFRESH_MAX_AGE, limit=catalog.BACKFILL_BATCH_SIZE):
+        """
+        Find the catalog entries whose OMDb data was fetched longest ago.
+        Args:
+            max_age (float): Only entries fetched more than this many seconds ago.
+            limit (int): Maximum number of entries.
+        Returns:
+            list: Entry dicts ('id', 'imdb_id', 'omdb_fetched_at', title and OMDb
+            columns), oldest first.
+        """
+        session = self.Session()
+        try:
+            return catalog.stale_entries(session, max_age, limit)
+        finally:
+            self._release(session)
+
+    def refresh_catalog_entries(self, entries, answers):
+        """
+        Store fresh OMDb answers for catalog entries, writing only the entries
+        whose values changed (see ``datamanager.catalog.refresh``).
+        Args:
+            entries (list): Entries from ``get_stale_catalog_entries`` that were looked up.
+            answers (dict): imdbID -> raw OMDb JSON, or None if OMDb no longer knows the ID.
+        Returns:
+            dict: 'checked' and 'changed' entry counts.
+        """
+        session = self.Session()
+        try:
+            stats = catalog.refresh(session, entries, answers)
+        finally:
+            self._release(session)
+        # Auch ohne verknüpfte Filme: Katalogseiten zeigen die geänderten Einträge
+        if stats['changed']:
+            self._notify('movies_enriched', movies=stats['movies'])
+        return {'checked': stats['checked'], 'changed': stats['changed']}
+
+    def acquire_lease(self, name, owner, seconds):
+        """
+        Take or renew a lease, so a background job runs in one process only
+        (see ``datamanager.leases``).
+        Args:
+            name (str): Name of the lease.
+            owner (str): Identifier of the calling process.
+            seconds (float): Lifetime of the lease.
+        Returns:
+            bool: True if the caller holds the lease.
+        """
+        session = self.Session()
+        try:
+            held = leases.acquire(session, name, owner, seconds)
+            session.commit()
+            return held
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Anfordern der Lease {name}: {e}")
+            return False
+        finally:
+            self._release(session)
+
+    def release_lease(self, name, owner):
+        """
+        Give up a lease held by the caller.
+        Args:
+            name (str): Name of the lease.
+            owner (str): Identifier of the calling process.
+        """
+        session = self.Session()
+        try:
+            leases.release(session, name, owner)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Freigeben der Lease {name}: {e}")
+        finally:
+            self._release(session)
+
+    def get_catalog_refresh_stats(self, max_age=catalog.REFRESH_MAX_AGE):
+        """
+        Report how fresh the OMDb data of the catalog is.
+        Args:
+            max_age (float): Age in seconds from which an entry counts as stale.
+        Returns:
+            dict: Number of stale entries and age of the oldest fetch in seconds.
+        """
+        session = self.Session()
+        try:
+            return catalog.refresh_stats(session, max_age)
+        finally:
+            self._release(session)
+
+    def get_enrichment_queue_stats(self):
+        """
+        Report the depth of the OMDb enrichment queue.
+        Returns:
+            dict: Job counts per status, pending movies and oldest pending job age.
+        """
+        session = self.Session()
+        stats = enrichment_queue.queue_stats(session)
+        self._release(session)
+        return stats
+
     def delete_movie(self, movie_id):
         """
         Delete a movie from the database.
@@ -175,11 +703,14 @@ class SQLiteDataManager(DataManagerInterface):
             session = self.Session()
             movie = session.query(Movie).filter_by(id=movie_id).first()
             if movie:
+                event = {'id': movie.id, 'name': movie.name, 'user_id': movie.user_id}
                 session.delete(movie)
                 session.commit()
-            session.close()
+                self._notify('movie_deleted', **event)
+            self._release(session)
             return movie
         except Exception as e:
+            self._discard()
             print(f"Fehler beim Löschen eines Films: {e}")
             return None
 
@@ -200,10 +731,15 @@ class SQLiteDataManager(DataManagerInterface):
                 rating=review['rating']
             )
             session.add(new_review)
+            session.flush()
+            event = {'id': new_review.id, 'movie_id': new_review.movie_id,
+                     'user_id': new_review.user_id}
             session.commit()
-            session.close()
+            self._release(session)
+            self._notify('review_added', **event)
             return new_review
         except Exception as e:
+            self._discard()
             print(f"Fehler beim Hinzufügen einer Review: {e}")
             return None
 
@@ -217,7 +753,7 @@ class SQLiteDataManager(DataManagerInterface):
         """
         session = self.Session()
         reviews = session.query(Review).filter_by(movie_id=movie_id).all()
-        session.close()
+        self._release(session)
         return reviews
 
     def get_reviews_for_user(self, user_id):
@@ -230,7 +766,7 @@ class SQLiteDataManager(DataManagerInterface):
         """
         session = self.Session()
         reviews = session.query(Review).filter_by(user_id=user_id).all()
-        session.close()
+        self._release(session)
         return reviews
 
     def update_review(self, review):
@@ -248,10 +784,14 @@ class SQLiteDataManager(DataManagerInterface):
             if db_review:
                 db_review.review_text = review['review_text']
                 db_review.rating = review['rating']
+                event = {'id': db_review.id, 'movie_id': db_review.movie_id,
+                         'user_id': db_review.user_id}
                 session.commit()
-            session.close()
+                self._notify('review_updated', **event)
+            self._release(session)
             return db_review
         except Exception as e:
+            self._discard()
             print(f"Fehler beim Aktualisieren einer Review: {e}")
             return None
 
@@ -267,30 +807,54 @@ class SQLiteDataManager(DataManagerInterface):
             session = self.Session()
             review = session.query(Review).filter_by(id=review_id).first()
             if review:
+                event = {'id': review.id, 'movie_id': review.movie_id,
+                         'user_id': review.user_id}
                 session.delete(review)
                 session.commit()
-            session.close()
+                self._notify('review_deleted', **event)
+            self._release(session)
             return review
         except Exception as e:
+            self._discard()
             print(f"Fehler beim Löschen einer Review: {e}")
             return None
 
-    def search_movies(self, query):
+    def search_movies(self, query, limit=SEARCH_LIMIT):
         """
-        Suche Filme nach Titel, Regisseur oder Jahr (unscharf, case-insensitive).
+        Suche Filme nach Titel, Regisseur oder Jahr (case-insensitive).
+        Mit FTS5 werden Präfix- und Mehrwort-Suchen unterstützt und die Treffer
+        nach bm25 sortiert; ohne FTS5 wird auf eine LIKE-Suche zurückgegriffen.
         Args:
             query (str): Suchbegriff
+            limit (int): Maximale Anzahl Treffer
         Returns:
             list: Liste von Movie-Objekten
         """
+        if not self.fts_enabled:
+            return self._search_movies_like(query, limit)
+        session = self.Session()
+        ids = search_movie_ids(session, query, limit)
+        year = query.strip()
+        if year.isdigit() and len(ids) < limit:
+            year_ids = session.query(Movie.id).filter(
+                Movie.year == int(year), Movie.id.notin_(ids)).limit(limit - len(ids)).all()
+            ids += [row.id for row in year_ids]
+        movies_by_id = {m.id: m for m in session.query(Movie).filter(Movie.id.in_(ids))} if ids else {}
+        self._release(session)
+        return [movies_by_id[i] for i in ids if i in movies_by_id]
+
+    def _search_movies_like(self, query, limit):
+        """
+        Fallback-Suche per LIKE (Full Table Scan), falls SQLite kein FTS5 unterstützt.
+        """
         session = self.Session()
         like_query = f"%{query}%"
         movies = session.query(Movie).filter(
             (Movie.name.ilike(like_query)) |
             (Movie.director.ilike(like_query)) |
             (Movie.year.ilike(like_query))
-        ).all()
-        session.close()
+        ).limit(limit).all()
+        self._release(session)
         return movies
 
     def get_all_movies(self):
@@ -301,5 +865,278 @@ class SQLiteDataManager(DataManagerInterface):
         """
         session = self.Session()
         movies = session.query(Movie).all()
-        session.close()
+        self._release(session)
         return movies
+
+    def get_movie_titles(self):
+        """
+        Retrieve the title and poster URL of every movie (for the autocomplete index).
+        Returns:
+            list: A list of (name, omdb_poster) tuples.
+        """
+        session = self.Session()
+        titles = session.query(Movie.name, Movie.omdb_poster).all()
+        self._release(session)
+        return titles
+
+    def get_movies_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all movies, ordered by ID.
+        Args:
+            page (int): The 1-based page number (used for OFFSET when no cursor is given).
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return self._paginate(Movie, page, per_page, after_id)
+
+    def get_catalog_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog (each film once, however many users
+        list it), ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of films on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this catalog ID.
+        Returns:
+            Page: The CatalogMovie objects on the page plus the total count and next cursor.
+        """
+        return self._paginate(CatalogMovie, page, per_page, after_id)
+
+    def get_users_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all users, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of users on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this user ID.
+        Returns:
+            Page: The users on the page plus the total count and next cursor.
+        """
+        return self._paginate(User, page, per_page, after_id)
+
+    def get_user_movies_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the movies of a specific user, ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The movies on the page plus the total count and next cursor.
+        """
+        return self._paginate(Movie, page, per_page, after_id, user_id=user_id)
+
+    def get_reviews_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a specific movie, ordered by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._paginate(Review, page, per_page, after_id, movie_id=movie_id)
+
+    def get_reviews_for_user_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews written by a specific user, ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._paginate(Review, page, per_page, after_id, user_id=user_id)
+
+    def get_reviews_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of all reviews, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The reviews on the page plus the total count and next cursor.
+        """
+        return self._paginate(Review, page, per_page, after_id)
+
+    def get_user_rows(self, user_ids=None):
+        """
+        Retrieve the ID and name of users, ordered by ID.
+        Args:
+            user_ids (iterable): Only these users, or None for all users.
+        Returns:
+            list: A list of UserRow tuples.
+        """
+        _, statement, row = projection('users')
+        if user_ids is not None:
+            statement = statement.where(User.id.in_(set(user_ids)))
+        session = self.Session()
+        rows = [row(*values) for values in session.execute(statement)]
+        self._release(session)
+        return rows
+
+    def get_user_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of users as UserRow tuples, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of users on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this user ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._paginate_rows('users', page, per_page, after_id)
+
+    def get_catalog_rows_page(self, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the film catalog as FilmRow tuples, ordered by ID.
+        Args:
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of films on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this catalog ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._paginate_rows('films', page, per_page, after_id)
+
+    def get_user_movie_rows_page(self, user_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of a user's movies as MovieRow tuples, with the OMDb
+        data joined in, ordered by ID.
+        Args:
+            user_id (int): The ID of the user.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of movies on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this movie ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._paginate_rows('movies', page, per_page, after_id, user_id=user_id)
+
+    def get_review_rows_for_movie_page(self, movie_id, page=1, per_page=24, after_id=None):
+        """
+        Retrieve one page of the reviews for a movie as ReviewRow tuples, with
+        the reviewers' names joined in, ordered by ID.
+        Args:
+            movie_id (int): The ID of the movie.
+            page (int): The 1-based page number.
+            per_page (int): Maximum number of reviews on the page.
+            after_id (int): Keyset cursor; if given, the page starts after this review ID.
+        Returns:
+            Page: The rows on the page plus the total count and next cursor.
+        """
+        return self._paginate_rows('reviews', page, per_page, after_id, movie_id=movie_id)
+
+    def iter_users(self, fields, after_id=None):
+        """
+        Stream all users ordered by ID without loading them into memory at once.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only users with a greater ID.
+        Returns:
+            iterator: One dict per user with the requested columns.
+        """
+        return self._iterate(User, fields, after_id)
+
+    def iter_movies(self, fields, after_id=None, user_id=None):
+        """
+        Stream movies ordered by ID without loading them into memory at once.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only movies with a greater ID.
+            user_id (int): Only movies of this user.
+        Returns:
+            iterator: One dict per movie with the requested columns.
+        """
+        filters = {} if user_id is None else {'user_id': user_id}
+        return self._iterate(Movie, fields, after_id, **filters)
+
+    def iter_reviews(self, fields, after_id=None, user_id=None, movie_id=None):
+        """
+        Stream reviews ordered by ID without loading them into memory at once.
+        Args:
+            fields (list): Names of the columns to return.
+            after_id (int): Only reviews with a greater ID.
+            user_id (int): Only reviews written by this user.
+            movie_id (int): Only reviews of this movie.
+        Returns:
+            iterator: One dict per review with the requested columns.
+        """
+        filters = {name: value for name, value in (('user_id', user_id), ('movie_id', movie_id))
+                   if value is not None}
+        return self._iterate(Review, fields, after_id, **filters)
+
+    def _iterate(self, model, fields, after_id, **filters):
+        """
+        Stream the requested columns in primary key order. Only the columns are
+        selected (no ORM objects) and rows are fetched ``STREAM_BATCH_SIZE`` at a
+        time, so memory stays constant however large the table is. The stream
+        uses its own session, as it may outlive the request scope.
+        """
+        columns = [getattr(model, name) for name in fields]
+        statement = select(*columns).filter_by(**filters).order_by(model.id)
+        if after_id is not None:
+            statement = statement.where(model.id > after_id)
+        session = self._stream_session()
+        try:
+            result = session.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+            for row in result.mappings():
+                yield dict(row)
+        finally:
+            session.close()
+
+    def _count(self, session, model, filters):
+        """
+        Count the rows matching the filters, memoized until the next write.
+        """
+        key = (model.__tablename__,) + tuple(sorted(filters.items()))
+        total, token = self._counts.get(key)
+        if total is None:
+            total = session.query(func.count(model.id)).filter_by(**filters).scalar()
+            self._counts.put(key, total, token)
+        return total
+
+    def _paginate(self, model, page, per_page, after_id, **filters):
+        """
+        Run a paginated query ordered by primary key. With a cursor the page is
+        fetched by seeking on the primary key index (``id > after_id``), so deep
+        pages cost the same as the first one; otherwise LIMIT/OFFSET is used.
+        """
+        page = max(1, int(page or 1))
+        per_page = max(1, int(per_page))
+        session = self.Session()
+        query = session.query(model).filter_by(**filters).order_by(model.id)
+        if after_id is not None:
+            query = query.filter(model.id > after_id)
+        else:
+            query = query.offset((page - 1) * per_page)
+        items = query.limit(per_page + 1).all()
+        total = self._count(session, model, filters)
+        self._release(session)
+        next_cursor = items[per_page - 1].id if len(items) > per_page else None
+        return Page(items[:per_page], total, page, per_page, next_cursor)
+
+    def _paginate_rows(self, kind, page, per_page, after_id, **filters):
+        """
+        Paginated projection query (see ``datamanager.rows``), paged like
+        ``_paginate`` and sharing its memoized counts.
+        """
+        page = max(1, int(page or 1))
+        per_page = max(1, int(per_page))
+        model, statement, row = projection(kind, after_id, **filters)
+        if after_id is None:
+            statement = statement.offset((page - 1) * per_page)
+        session = self.Session()
+        items = [row(*values) for values in session.execute(statement.limit(per_page + 1))]
+        total = self._count(session, model, filters)
+        self._release(session)
+        next_cursor = items[per_page - 1].id if len(items) > per_page else None
+        return Page(items[:per_page], total, page, per_page, next_cursor)
@@ -0,0 +1,174 @@
+"""
+Background worker pool draining the OMDb enrichment queue.
+
+Writes never call OMDb: movies are stored with ``enrichment_status = 'pending'``
+and a job is queued (see ``datamanager.enrichment_queue``). The workers here
+claim jobs, look the titles up on OMDb (through the OMDb cache) and link the
+movies to the film's catalog entry. Failed lookups are retried with backoff by
+the queue. When the queue is idle, the workers move movie rows from before the
+catalog into it, one batch at a time (see ``datamanager.catalog``).
+"""
+import threading
+from typing import Optional, Dict, Any
+
+from omdb import NOT_FOUND
+from utils import fetch_omdb_raw, get_cached_omdb_raw
+
+DEFAULT_WORKERS = 2
+POLL_INTERVAL = 5.0
+
+
+class EnrichmentError(Exception):
+    """
+    Raised when an OMDb lookup fails for a reason other than "not found".
+    """
+
+
+def lookup_title(title: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a title on OMDb for enrichment.
+
+    Args:
+        title (str): Movie title
+
+    Returns:
+        Optional[Dict[str, Any]]: Raw OMDb JSON, or None if OMDb does not know the title
+
+    Raises:
+        EnrichmentError: If OMDb could not be asked (network error, missing API key)
+    """
+    data = fetch_omdb_raw(title)
+    if data:
+        return data
+    if get_cached_omdb_raw(title) is NOT_FOUND:
+        return None
+    raise EnrichmentError(f"OMDb lookup for '{title}' failed")
+
+
+class EnrichmentWorkerPool:
+    """
+    Pool of daemon threads processing enrichment jobs.
+    """
+
+    def __init__(self, data_manager, workers: int = DEFAULT_WORKERS,
+                 poll_interval: float = POLL_INTERVAL, lookup=lookup_title):
+        """
+        Initialize the pool.
+        Args:
+            data_manager: Data manager providing the enrichment queue methods.
+            workers (int): Number of worker threads.
+            poll_interval (float): Seconds to wait for new jobs when the queue is idle.
+            lookup (callable): Function returning raw OMDb data for a title.
+        """
+        self.data_manager = data_manager
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lookup = lookup
+        self.stats = {'processed': 0, 'enriched_movies': 0, 'not_found': 0, 'retries': 0, 'failed': 0}
+        self._threads = []
+        # Cursor der Katalog-Migration; None, sobald alle Zeilen migriert sind
+        self._backfill_cursor = 0
+        self._backfill_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        data_manager.add_listener(self._on_write)
+
+    @property
+    def running(self) -> bool:
+        """True while worker threads are started."""
+        return bool(self._threads)
+
+    def start(self):
+        """
+        Start the worker threads (no-op if already running).
+        """
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f'enrichment-worker-{number}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the worker threads after their current job.
+        Args:
+            timeout (float): Seconds to wait for each thread.
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+
+    def process_one(self) -> bool:
+        """
+        Claim and process a single due job, or if none is due, migrate one batch
+        of movies into the catalog.
+        Returns:
+            bool: False if there was nothing to do.
+        """
+        job = self.data_manager.claim_enrichment_job()
+        if job is None:
+            return self.backfill_step()
+        try:
+            data = self.lookup(job['title'])
+        except Exception as e:
+            retry = self.data_manager.fail_enrichment_job(job, e)
+            self._count('retries' if retry else 'failed')
+            return True
+        updated = self.data_manager.complete_enrichment_job(job, data)
+        self._count('processed')
+        self._count('enriched_movies' if data else 'not_found', updated if data else 1)
+        return True
+
+    def backfill_step(self) -> bool:
+        """
+        Migrate the next batch of movie rows into the catalog.
+        Returns:
+            bool: False if the migration is complete or another worker runs a batch.
+        """
+        if self._backfill_cursor is None or not self._backfill_lock.acquire(blocking=False):
+            return False
+        try:
+            stats = self.data_manager.backfill_catalog(self._backfill_cursor)
+            self._backfill_cursor = stats['last_id'] if stats['scanned'] else None
+            return stats['scanned'] > 0
+        finally:
+            self._backfill_lock.release()
+
+    def run_pending(self, limit: Optional[int] = None) -> int:
+        """
+        Process due jobs in the calling thread until the queue is drained.
+        Args:
+            limit (int): Maximum number of jobs, or None for no limit.
+        Returns:
+            int: The number of processed jobs.
+        """
+        count = 0
+        while (limit is None or count < limit) and self.process_one():
+            count += 1
+        return count
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                if self.process_one():
+                    continue
+            except Exception as e:
+                print(f"Error in enrichment worker: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _on_write(self, event, data):
+        if event == 'enrichment_queued':
+            self._wakeup.set()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
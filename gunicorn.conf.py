@@ -0,0 +1,24 @@
+"""
+Gunicorn settings: ``gunicorn app:app`` picks this file up automatically.
+
+The app is imported once in the master process and the workers are forked from
+it, so a worker starts without importing Flask, SQLAlchemy and the app again.
+Nothing opens the database at import; every worker creates its own data
+manager after the fork and, with ``WARMUP=1``, warms it up before accepting
+requests.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+preload_app = True
+
+
+def post_worker_init(worker):
+    """
+    Warm up the freshly forked worker before it accepts requests.
+    """
+    from app import app, warmup
+    if app.config['WARMUP']:
+        seconds = warmup(app)
+        worker.log.info('Warmup finished in %.0f ms', seconds * 1000)
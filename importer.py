@@ -0,0 +1,215 @@
+"""
+Streaming importer for movie lists (CSV, JSON arrays and JSON Lines).
+
+Files are read incrementally and written in batches through
+``add_movies_bulk``, so memory use does not depend on the file size. No OMDb
+requests are made during the import; OMDb data is filled in later.
+"""
+import codecs
+import csv
+import io
+import json
+import time
+from typing import Iterator, Dict, Any, Optional, Callable
+
+from utils import validate_movie_data
+
+DEFAULT_BATCH_SIZE = 1000
+READ_CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 20
+
+_FIELD_ALIASES = {
+    'name': ('name', 'title', 'movie'),
+    'director': ('director',),
+    'year': ('year',),
+    'rating': ('rating', 'your rating', 'imdbrating'),
+}
+
+
+def _text_stream(stream):
+    """
+    Wrap a binary stream in a UTF-8 text stream (text streams are returned as is).
+    """
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+
+def iter_csv_rows(stream) -> Iterator[Dict[str, Any]]:
+    """
+    Read rows from a CSV file with a header line.
+
+    Args:
+        stream: Binary or text file object
+
+    Yields:
+        Dict[str, Any]: One dictionary per row
+    """
+    yield from csv.DictReader(_text_stream(stream))
+
+
+def iter_json_rows(stream) -> Iterator[Dict[str, Any]]:
+    """
+    Read objects from a JSON array or a JSON Lines file without loading the whole
+    file: the input is decoded chunk by chunk and each object is parsed as soon
+    as it is complete.
+
+    Args:
+        stream: Binary or text file object
+
+    Yields:
+        Dict[str, Any]: One dictionary per JSON object
+    """
+    if isinstance(stream, io.TextIOBase):
+        read = stream.read
+    else:
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        read = lambda size: decoder.decode(stream.read(size), final=False)  # noqa: E731
+    json_decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    while True:
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+                position += 1
+            if position >= len(buffer):
+                break
+            try:
+                item, end = json_decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                break
+            position = end
+            if isinstance(item, dict):
+                yield item
+        buffer = buffer[position:]
+        if eof:
+            break
+        chunk = read(READ_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        buffer += chunk
+
+
+def iter_rows(stream, file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read rows from a movie list file.
+
+    Args:
+        stream: Binary or text file object
+        file_format (str): 'csv' or 'json' (JSON array or JSON Lines)
+
+    Yields:
+        Dict[str, Any]: One dictionary per movie
+    """
+    if file_format == 'csv':
+        return iter_csv_rows(stream)
+    if file_format in ('json', 'jsonl', 'ndjson'):
+        return iter_json_rows(stream)
+    raise ValueError(f"Unsupported format '{file_format}'. Use csv or json.")
+
+
+def detect_format(filename: str) -> str:
+    """
+    Guess the file format from the file name.
+
+    Args:
+        filename (str): Name of the uploaded or given file
+
+    Returns:
+        str: 'csv' or 'json'
+    """
+    return 'csv' if (filename or '').lower().endswith('.csv') else 'json'
+
+
+def normalize_movie_row(row: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """
+    Validate an imported row and convert it to a movie dictionary.
+
+    Args:
+        row (dict): Raw row from the file (keys are matched case-insensitively)
+        user_id (int): Owner of the imported movies
+
+    Returns:
+        Dict[str, Any]: Movie data for ``add_movies_bulk``
+
+    Raises:
+        ValueError: If the row has no title or an invalid year or rating
+    """
+    lowered = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+    values = {}
+    for field, aliases in _FIELD_ALIASES.items():
+        values[field] = next((lowered[a] for a in aliases if lowered.get(a) not in (None, '')), None)
+    name = str(values['name'] or '').strip()
+    if not name:
+        raise ValueError('missing title')
+    try:
+        year = int(str(values['year']).strip()[:4])
+        rating = float(str(values['rating']).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}': year must be an integer and rating a number")
+    is_valid, error = validate_movie_data(year, rating)
+    if not is_valid:
+        raise ValueError(f"'{name}': {error}")
+    return {
+        'name': name,
+        'director': str(values['director'] or '').strip(),
+        'year': year,
+        'rating': rating,
+        'user_id': user_id
+    }
+
+
+def import_movies(data_manager, rows, user_id: int, batch_size: int = DEFAULT_BATCH_SIZE,
+                  progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Import movies for a user in batches.
+
+    Args:
+        data_manager: Data manager providing ``add_movies_bulk``
+        rows: Iterable of raw row dictionaries
+        user_id (int): Owner of the imported movies
+        batch_size (int): Number of rows per bulk insert
+        progress (callable): Receives a message after each batch
+
+    Returns:
+        Dict[str, Any]: Counts of read, inserted, duplicate, invalid and failed
+        (not stored because of a database error) rows, the first error messages
+        and the elapsed seconds
+    """
+    started = time.perf_counter()
+    summary = {'read': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        try:
+            inserted = data_manager.add_movies_bulk(batch)
+        except Exception as e:
+            # Datenbankfehler sind keine Duplikate: die Zeilen des Batches zählen als fehlgeschlagen
+            summary['failed'] += len(batch)
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append(f"{len(batch)} rows up to row {summary['read']} not stored: {e}")
+        else:
+            summary['inserted'] += inserted
+            summary['duplicates'] += len(batch) - inserted
+        batch.clear()
+        if progress:
+            progress(f"{summary['read']} rows read, {summary['inserted']} inserted")
+
+    for row in rows:
+        summary['read'] += 1
+        try:
+            batch.append(normalize_movie_row(row, user_id))
+        except ValueError as e:
+            summary['invalid'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append(f"Row {summary['read']}: {e}")
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
@@ -0,0 +1,298 @@
+"""
+Per-request performance instrumentation and Prometheus metrics.
+
+``instrument_app`` hooks SQLAlchemy's cursor events, Flask's template signals
+and request lifecycle, and records per route the total latency, the number of
+SQL queries, the time spent in the database, in OMDb calls and in template
+rendering. OMDb requests are recorded through ``observe_omdb_request`` (an
+``OMDbClient`` listener). Everything is exposed in the Prometheus text format
+by ``MetricsRegistry.render`` and, optionally, as a ``Server-Timing`` header.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Tuple
+
+from flask import request, g, template_rendered, before_render_template, got_request_exception
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with labels.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increase the counter.
+        Args:
+            amount (float): Increment.
+            labels: Label values.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram:
+    """
+    Histogram with cumulative buckets, sum and count per label set.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        """
+        Record an observation.
+        Args:
+            value (float): Observed value (e.g. seconds).
+            labels: Label values.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def collect(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            values = sorted((key, (list(e[0]), e[1], e[2])) for key, e in self._values.items())
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            yield f'{self.name}_bucket{_format_labels(self.labelnames, key, [("le", "+Inf")])} {count}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {count}'
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+    Collectors add gauges computed at scrape time (e.g. cache statistics).
+    """
+
+    def __init__(self, prefix: str = 'moviweb'):
+        """
+        Initialize the registry and the standard request metrics.
+        Args:
+            prefix (str): Prefix of all metric names.
+        """
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []
+        self.requests = self.histogram(
+            'http_request_duration_seconds', 'Total request latency.', ('route', 'method', 'status'))
+        self.queries = self.histogram(
+            'http_request_db_queries', 'SQL queries per request.', ('route',), QUERY_COUNT_BUCKETS)
+        self.db_time = self.histogram(
+            'http_request_db_seconds', 'Time spent in SQL queries per request.', ('route',))
+        self.omdb_time = self.histogram(
+            'http_request_omdb_seconds', 'Time spent in OMDb calls per request.', ('route',))
+        self.render_time = self.histogram(
+            'template_render_seconds', 'Template render time.', ('template',))
+        self.query_time = self.histogram(
+            'db_query_duration_seconds', 'Duration of single SQL statements.')
+        self.omdb_requests = self.histogram(
+            'omdb_request_duration_seconds', 'OMDb HTTP attempts by kind and status.', ('kind', 'status'))
+        self.errors = self.counter(
+            'http_request_exceptions_total', 'Unhandled exceptions by route.', ('route', 'exception'))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(f'{self.prefix}_{name}', documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(f'{self.prefix}_{name}', documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, name: str, documentation: str, collect: Callable[[], Dict[str, float]]):
+        """
+        Register a gauge family computed at scrape time.
+        Args:
+            name (str): Metric name (without prefix).
+            documentation (str): Help text.
+            collect (callable): Returns a dict of 'key' label value -> number.
+        """
+        self._collectors.append((f'{self.prefix}_{name}', documentation, collect))
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for name, documentation, collect in self._collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"Error collecting metric {name}: {e}")
+                continue
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'{name}{_format_labels(("key",), (key,))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class _RequestTimings:
+    __slots__ = ('queries', 'db_seconds', 'omdb_calls', 'omdb_seconds', 'render_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.omdb_calls = 0
+        self.omdb_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+# ContextVar statt threading.local: gilt pro Thread und pro asyncio-Task (ASGI-Modus)
+_current = ContextVar('request_timings', default=None)
+
+
+def observe_omdb_request(registry: MetricsRegistry):
+    """
+    Build an ``OMDbClient`` listener recording OMDb attempts in the registry and
+    in the timings of the current request.
+    Args:
+        registry (MetricsRegistry): Target registry.
+    Returns:
+        callable: The listener.
+    """
+    def listener(kind, status, seconds):
+        registry.omdb_requests.observe(seconds, kind=kind, status=status)
+        timings = _current.get()
+        if timings is not None:
+            timings.omdb_calls += 1
+            timings.omdb_seconds += seconds
+    return listener
+
+
+def instrument_app(app, registry: MetricsRegistry, server_timing: bool = False):
+    """
+    Record per-request metrics for a Flask app.
+    Args:
+        app (Flask): The application.
+        registry (MetricsRegistry): Target registry.
+        server_timing (bool): Add a ``Server-Timing`` header to every response.
+    """
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info['query_start'].pop()
+        registry.query_time.observe(seconds)
+        timings = _current.get()
+        if timings is not None:
+            timings.queries += 1
+            timings.db_seconds += seconds
+
+    def before_render(sender, template, context, **extra):
+        g._render_started = time.perf_counter()
+
+    def rendered(sender, template, context, **extra):
+        started = g.pop('_render_started', None)
+        if started is not None:
+            seconds = time.perf_counter() - started
+            registry.render_time.observe(seconds, template=template.name or 'string')
+            timings = _current.get()
+            if timings is not None:
+                timings.render_seconds += seconds
+
+    def exception(sender, exception, **extra):
+        registry.errors.inc(route=_route(), exception=type(exception).__name__)
+
+    before_render_template.connect(before_render, app, weak=False)
+    template_rendered.connect(rendered, app, weak=False)
+    got_request_exception.connect(exception, app, weak=False)
+
+    @app.before_request
+    def start_request_timer():
+        _current.set(_RequestTimings())
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('_request_started', None)
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        timings = _current.get() or _RequestTimings()
+        route = _route()
+        registry.requests.observe(total, route=route, method=request.method, status=response.status_code)
+        registry.queries.observe(timings.queries, route=route)
+        registry.db_time.observe(timings.db_seconds, route=route)
+        registry.omdb_time.observe(timings.omdb_seconds, route=route)
+        if server_timing:
+            response.headers.add('Server-Timing', ', '.join([
+                f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries"',
+                f'omdb;dur={timings.omdb_seconds * 1000:.1f};desc="{timings.omdb_calls} calls"',
+                f'render;dur={timings.render_seconds * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}']))
+        _current.set(None)
+        return response
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
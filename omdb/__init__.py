@@ -0,0 +1,4 @@
+from omdb.cache import (OMDbCache, get_omdb_cache, NOT_FOUND, normalize_title,
+                        title_key, imdb_key, search_key)
+from omdb.client import OMDbClient, OMDbUnavailable, OMDbRateLimited, CircuitBreaker, get_omdb_client
+from omdb.throttle import SingleFlight, TokenBucket
@@ -0,0 +1,220 @@
+"""
+Non-blocking OMDb client for the ASGI serving mode.
+
+``AsyncOMDbClient`` sends requests with ``httpx.AsyncClient`` on the event loop,
+so a slow OMDb answer holds no thread while it is in flight. It shares the
+response cache, circuit breaker, rate limiter, counters and listeners of a
+synchronous ``OMDbClient``: both serving modes see the same OMDb health and
+together respect one rate limit. Requires the optional ``httpx`` package.
+"""
+import asyncio
+import random
+import time
+from typing import Optional, Dict, Any
+
+from omdb.cache import title_key, search_key, NOT_FOUND
+from omdb.client import (OMDbClient, OMDbUnavailable, OMDbRateLimited, RETRY_STATUSES, SEARCH_TIMEOUT,
+                         title_params, search_params, request_kind)
+
+try:
+    import httpx
+except ImportError:  # httpx ist nur für den ASGI-Modus nötig
+    httpx = None
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of ``SingleFlight``: concurrent calls with the same key
+    await one shared task. The task is shielded, so a caller that is cancelled
+    does not cancel the lookup for the others.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        Run ``fn()`` (a coroutine function) once per key at a time.
+        Args:
+            key: Identifies identical calls.
+            fn (callable): Returns the coroutine to run.
+        Returns:
+            The coroutine's result.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+class AsyncOMDbClient:
+    """
+    Async OMDb client sharing its state with a synchronous ``OMDbClient``.
+    """
+
+    def __init__(self, client: OMDbClient):
+        """
+        Initialize the client. Create it inside the event loop it is used in.
+        Args:
+            client (OMDbClient): Client providing configuration, cache, breaker,
+                limiter, counters and listeners.
+        Raises:
+            RuntimeError: If httpx is not installed.
+        """
+        if httpx is None:
+            raise RuntimeError('The async OMDb client requires httpx (pip install -r requirements-async.txt)')
+        self.client = client
+        self.flight = AsyncSingleFlight()
+        # Wie beim requests-Pool: keine Obergrenze für gleichzeitige Verbindungen, pool_size bleiben offen
+        self.http = httpx.AsyncClient(
+            timeout=_httpx_timeout(client.timeout),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=client.pool_size))
+
+    async def aclose(self):
+        """
+        Close the pooled connections.
+        """
+        await self.http.aclose()
+
+    async def request(self, params: Dict[str, Any], timeout=None, retries: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Send a request to OMDb (same retry, breaker and throttling rules as
+        ``OMDbClient.request``).
+        Args:
+            params (dict): Query parameters (the API key is added).
+            timeout: (connect, read) timeout, defaults to the client's timeout.
+            retries (int): Retries after a failed attempt, defaults to the client's setting.
+        Returns:
+            dict: The decoded JSON answer.
+        Raises:
+            OMDbRateLimited: If no rate limiter token was available in time.
+            OMDbUnavailable: If the circuit is open or all attempts failed.
+        """
+        client = self.client
+        timeout = timeout or client.timeout
+        kind = request_kind(params)
+        # Erst der Breaker: bei offenem Circuit sofort abbrechen, ohne auf ein Token zu warten
+        if not client.breaker.allow():
+            client._count('short_circuited')
+            client._notify(kind, 'short_circuited', 0.0)
+            raise OMDbUnavailable('OMDb circuit is open')
+        try:
+            await self._throttle(timeout)
+        except (asyncio.CancelledError, OMDbRateLimited):
+            client.breaker.release()
+            raise
+        retries = client.retries if retries is None else retries
+        params = dict(params, apikey=client.api_key)
+        error = None
+        try:
+            for attempt in range(retries + 1):
+                if attempt:
+                    client._count('retries')
+                    await asyncio.sleep(random.uniform(0, client.backoff * 2 ** (attempt - 1)))
+                    await self._throttle(None)
+                client._count('requests')
+                started = time.perf_counter()
+                status = 'error'
+                try:
+                    response = await self.http.get(client.base_url, params=params, timeout=_httpx_timeout(timeout))
+                    status = response.status_code
+                    if response.status_code in RETRY_STATUSES:
+                        error = f'HTTP {response.status_code}'
+                        continue
+                    data = response.json()
+                except httpx.TimeoutException as e:
+                    status, error = 'timeout', e
+                    continue
+                except (httpx.HTTPError, ValueError) as e:
+                    error = e
+                    continue
+                finally:
+                    client._notify(kind, status, time.perf_counter() - started)
+                client.breaker.record_success()
+                return data
+        except asyncio.CancelledError:
+            client.breaker.release()
+            raise
+        client._count('failures')
+        client.breaker.record_failure()
+        raise OMDbUnavailable(f'OMDb request failed: {error}')
+
+    async def get_by_title(self, title: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the raw OMDb response for a title, cached. Concurrent lookups of
+        the same title share one request.
+        Args:
+            title (str): Movie title.
+        Returns:
+            Optional[Dict[str, Any]]: Raw OMDb JSON, or None if not found or OMDb
+            is unavailable and nothing is cached.
+        """
+        if not title:
+            return None
+        key = title_key(title)
+        cached = await asyncio.to_thread(self.client.cache.get, key)
+        if cached is NOT_FOUND:
+            return None
+        if cached is not None:
+            return cached
+        if not self.client.api_key:
+            return None
+        return await self.flight.do(key, lambda: self._fetch_title(title, key))
+
+    async def _fetch_title(self, title, key):
+        try:
+            data = await self.request(title_params(title))
+        except OMDbUnavailable as e:
+            print(f"OMDb lookup for '{title}' failed: {e}")
+            return await asyncio.to_thread(self.client._stale_title, key)
+        # Cache-Schreibzugriffe gehen (SQLite-Tier) in einen Thread, nie auf den Event-Loop
+        return await asyncio.to_thread(self.client._store_title, key, data)
+
+    async def search(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Search OMDb for movie titles, cached, with the short search timeout and
+        without retries.
+        Args:
+            query (str): Search string.
+        Returns:
+            Optional[Dict[str, Any]]: Dict with 'results' and 'total', or None if
+            OMDb could not be reached.
+        """
+        key = search_key(query)
+        cached = await asyncio.to_thread(self.client.cache.get, key)
+        if cached is NOT_FOUND:
+            return {'results': [], 'total': 0}
+        if cached is not None:
+            return cached
+        if not self.client.api_key:
+            return None
+        return await self.flight.do(key, lambda: self._fetch_search(query, key))
+
+    async def _fetch_search(self, query, key):
+        try:
+            data = await self.request(search_params(query), timeout=SEARCH_TIMEOUT, retries=0)
+        except OMDbUnavailable:
+            return await asyncio.to_thread(self.client._stale_search, key)
+        return await asyncio.to_thread(self.client._store_search, key, data)
+
+    async def _throttle(self, timeout):
+        limiter = self.client.limiter
+        if limiter is None:
+            return
+        wait = limiter.reserve(timeout[1] if isinstance(timeout, tuple) else timeout)
+        if wait is None:
+            self.client._count('throttled')
+            raise OMDbRateLimited('OMDb rate limit reached')
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def _httpx_timeout(timeout):
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
@@ -0,0 +1,292 @@
+"""
+Two-tier cache for OMDb API responses.
+
+The first tier is a bounded in-process LRU, the second a SQLite table
+(``omdb_cache``) that survives restarts and is shared by all worker processes.
+Entries are keyed by a normalized title (``t:<title>``), an imdbID
+(``i:<imdbID>``) or a search string (``s:<query>``). "Movie not found!"
+answers are cached as well (negative caching) with a shorter TTL.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from datamanager.engine import create_sqlite_engine
+from datamanager.models import Base, OMDbCacheEntry
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 6 * 3600
+DEFAULT_MAX_ENTRIES = 2048
+
+# Sentinel returned by lookups for cached "not found" answers.
+NOT_FOUND = object()
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a movie title for use as cache key (case- and whitespace-insensitive).
+
+    Args:
+        title (str): Movie title
+
+    Returns:
+        str: Normalized title
+    """
+    return ' '.join((title or '').split()).casefold()
+
+
+def title_key(title: str) -> str:
+    """Cache key for a lookup by title."""
+    return f't:{normalize_title(title)}'
+
+
+def imdb_key(imdb_id: str) -> str:
+    """Cache key for a lookup by imdbID."""
+    return f'i:{(imdb_id or "").strip().lower()}'
+
+
+def search_key(query: str) -> str:
+    """Cache key for a search (``?s=``) request."""
+    return f's:{normalize_title(query)}'
+
+
+class OMDbCache:
+    """
+    In-process LRU backed by a persistent SQLite table, with TTLs, negative
+    caching and hit/miss counters.
+    """
+
+    def __init__(self, db_file_name: Optional[str] = None, ttl: int = DEFAULT_TTL,
+                 negative_ttl: int = DEFAULT_NEGATIVE_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+        Args:
+            db_file_name (str): SQLite file for the persistent tier, or None to
+                keep the cache in memory only.
+            ttl (int): Lifetime of positive entries in seconds.
+            negative_ttl (int): Lifetime of "not found" entries in seconds.
+            max_entries (int): Maximum number of entries in the LRU tier.
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'memory_hits': 0,
+                      'db_hits': 0, 'negative_hits': 0, 'stale_hits': 0, 'stores': 0}
+        self.db_file_name = db_file_name
+        self._sessionmaker = None
+        self._open_lock = threading.Lock()
+
+    def set_db_file(self, db_file_name: Optional[str]):
+        """
+        Choose the SQLite file of the persistent tier before it is opened.
+        Args:
+            db_file_name (str): SQLite file, or None to keep the cache in memory only.
+        Raises:
+            RuntimeError: If another file is already open.
+        """
+        with self._open_lock:
+            if self._sessionmaker is not None and db_file_name != self.db_file_name:
+                raise RuntimeError('The OMDb cache database is already open')
+            self.db_file_name = db_file_name
+
+    @property
+    def Session(self):
+        """
+        Session factory of the persistent tier, or None without one. The engine
+        is created (and the table checked) on first use, so creating the cache,
+        e.g. while importing the app in a pre-forking master, opens no database.
+        """
+        if self._sessionmaker is None and self.db_file_name:
+            with self._open_lock:
+                if self._sessionmaker is None:
+                    engine = create_sqlite_engine(self.db_file_name)
+                    Base.metadata.create_all(engine, tables=[OMDbCacheEntry.__table__])
+                    self._sessionmaker = sessionmaker(bind=engine)
+        return self._sessionmaker
+
+    def get(self, key: str):
+        """
+        Look up a cached response.
+        Args:
+            key (str): Cache key (see ``title_key``, ``imdb_key``, ``search_key``).
+        Returns:
+            The cached payload, ``NOT_FOUND`` for a cached negative answer, or
+            None on a cache miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            # Abgelaufene Einträge bleiben für get_stale() im LRU
+            if entry is not None and entry[1] > now:
+                self._lru.move_to_end(key)
+                return self._hit(entry[0], 'memory_hits')
+        entry = self._load(key, now)
+        if entry is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        with self._lock:
+            self._remember(key, entry)
+            return self._hit(entry[0], 'db_hits')
+
+    def get_stale(self, key: str):
+        """
+        Look up a response ignoring its expiry, for serving degraded results
+        while OMDb is unavailable. Stale lookups are not counted as hits.
+        Args:
+            key (str): Cache key.
+        Returns:
+            The cached payload, ``NOT_FOUND``, or None if the key was never cached
+            (or expired rows were already purged).
+        """
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self.stats['stale_hits'] += 1
+                return entry[0]
+        entry = self._load(key, None)
+        if entry is None:
+            return None
+        with self._lock:
+            self.stats['stale_hits'] += 1
+        return entry[0]
+
+    def set(self, key: str, payload: Optional[Dict[str, Any]]):
+        """
+        Store a response. A payload of None records a "not found" answer.
+        Args:
+            key (str): Cache key.
+            payload (dict): The OMDb response, or None for a negative entry.
+        """
+        now = time.time()
+        found = payload is not None
+        expires_at = now + (self.ttl if found else self.negative_ttl)
+        value = payload if found else NOT_FOUND
+        with self._lock:
+            self._remember(key, (value, expires_at))
+            self.stats['stores'] += 1
+        if self.Session is None:
+            return
+        try:
+            session = self.Session()
+            session.merge(OMDbCacheEntry(
+                key=key,
+                payload=json.dumps(payload) if found else None,
+                found=found,
+                fetched_at=now,
+                expires_at=expires_at))
+            session.commit()
+            session.close()
+        except Exception as e:
+            print(f"Error writing OMDb cache entry: {e}")
+
+    def invalidate(self, key: str):
+        """
+        Drop an entry from both tiers.
+        Args:
+            key (str): Cache key.
+        """
+        with self._lock:
+            self._lru.pop(key, None)
+        if self.Session is None:
+            return
+        session = self.Session()
+        session.execute(delete(OMDbCacheEntry).where(OMDbCacheEntry.key == key))
+        session.commit()
+        session.close()
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired rows from the persistent tier.
+        Returns:
+            int: Number of deleted rows.
+        """
+        if self.Session is None:
+            return 0
+        session = self.Session()
+        result = session.execute(
+            delete(OMDbCacheEntry).where(OMDbCacheEntry.expires_at <= time.time()))
+        session.commit()
+        session.close()
+        return result.rowcount
+
+    def clear_memory(self):
+        """Empty the in-process LRU tier."""
+        with self._lock:
+            self._lru.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the hit/miss counters.
+        Returns:
+            dict: Counters plus the current LRU size and hit ratio.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._lru)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def _hit(self, value, tier: str):
+        self.stats['hits'] += 1
+        self.stats[tier] += 1
+        if value is NOT_FOUND:
+            self.stats['negative_hits'] += 1
+        return value
+
+    def _remember(self, key: str, entry):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _load(self, key: str, now: float):
+        if self.Session is None:
+            return None
+        try:
+            session = self.Session()
+            row = session.get(OMDbCacheEntry, key)
+            session.close()
+        except Exception as e:
+            print(f"Error reading OMDb cache entry: {e}")
+            return None
+        if row is None or (now is not None and row.expires_at <= now):
+            return None
+        value = json.loads(row.payload) if row.found else NOT_FOUND
+        return value, row.expires_at
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_omdb_cache() -> OMDbCache:
+    """
+    Return the process-wide OMDb cache, configured from the environment
+    (``OMDB_CACHE_DB``, ``OMDB_CACHE_TTL``, ``OMDB_CACHE_NEGATIVE_TTL``,
+    ``OMDB_CACHE_SIZE``). ``OMDB_CACHE_DB`` defaults to the app database
+    (``DATABASE_FILE``); set it to an empty string to disable the persistent tier.
+
+    Returns:
+        OMDbCache: The shared cache instance.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OMDbCache(
+                    db_file_name=os.getenv('OMDB_CACHE_DB', os.getenv('DATABASE_FILE', 'moviwebapp.db')) or None,
+                    ttl=int(os.getenv('OMDB_CACHE_TTL', DEFAULT_TTL)),
+                    negative_ttl=int(os.getenv('OMDB_CACHE_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL)),
+                    max_entries=int(os.getenv('OMDB_CACHE_SIZE', DEFAULT_MAX_ENTRIES)))
+    return _cache
@@ -0,0 +1,452 @@
+"""
+Pooled, resilient HTTP client for the OMDb API.
+
+All OMDb requests of the app go through one ``OMDbClient``:
+
+- a shared ``requests.Session`` keeps connections to OMDb alive and pooled,
+- parameters are passed with ``params=`` so titles are always URL-encoded,
+- every call has a connect and read timeout,
+- transport errors, 429 and 5xx answers are retried a bounded number of times
+  with exponential backoff and full jitter,
+- a circuit breaker opens after repeated failures and fails fast while OMDb is
+  unhealthy; lookups then fall back to stale cache entries (degraded results),
+- concurrent identical lookups are coalesced into one request and all requests
+  pass a shared token-bucket rate limiter (see ``omdb.throttle``).
+
+Responses are cached in the shared ``OMDbCache``.
+"""
+import os
+import random
+import threading
+import time
+from typing import Optional, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from omdb.cache import get_omdb_cache, title_key, imdb_key, search_key, NOT_FOUND
+from omdb.throttle import SingleFlight, TokenBucket, DEFAULT_RATE, DEFAULT_BURST
+
+OMDB_URL = 'https://www.omdbapi.com/'
+DEFAULT_TIMEOUT = (3.05, 10)
+# Autocomplete requests run while the user types and must never hang
+SEARCH_TIMEOUT = (2, 3)
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.3
+DEFAULT_POOL_SIZE = 10
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+SEARCH_PAGE_SIZE = 10
+# Antworten von OMDb auf unbekannte imdbIDs
+UNKNOWN_ID_ERRORS = frozenset({'Incorrect IMDb ID.', 'Error getting data.', 'Movie not found!'})
+
+
+def title_params(title: str) -> Dict[str, Any]:
+    """Query parameters of a title lookup (``?t=``)."""
+    return {'t': title, 'type': 'movie', 'plot': 'short', 'r': 'json'}
+
+
+def imdb_params(imdb_id: str) -> Dict[str, Any]:
+    """Query parameters of a lookup by imdbID (``?i=``)."""
+    return {'i': imdb_id, 'plot': 'short', 'r': 'json'}
+
+
+def search_params(query: str) -> Dict[str, Any]:
+    """Query parameters of a title search (``?s=``)."""
+    return {'s': query, 'type': 'movie'}
+
+
+def request_kind(params: Dict[str, Any]) -> str:
+    """Classify a request for the listeners: 'title', 'id', 'search' or 'other'."""
+    return 'title' if 't' in params else 'id' if 'i' in params else 'search' if 's' in params else 'other'
+
+
+class OMDbUnavailable(Exception):
+    """
+    Raised when OMDb could not be reached, answered with an error status, or the
+    circuit breaker is open.
+    """
+
+
+class OMDbRateLimited(OMDbUnavailable):
+    """
+    Raised when no rate limiter token became available within the call's timeout.
+    """
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker. After ``failure_threshold`` consecutive failures
+    the circuit opens and calls are rejected for ``reset_timeout`` seconds. Then
+    a single trial call is let through (half-open); its outcome closes or
+    reopens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Initialize the breaker.
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may be made now.
+        Returns:
+            bool: False while the circuit is open (or a half-open trial is running).
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self):
+        """Give up a permitted call without an outcome (e.g. it was cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        """Count a failed call and open the circuit if the threshold is reached."""
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class OMDbClient:
+    """
+    OMDb API client with a pooled keep-alive session, timeouts, retries with
+    jitter, a circuit breaker and the shared response cache.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = OMDB_URL,
+                 timeout=DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, pool_size: int = DEFAULT_POOL_SIZE,
+                 breaker: Optional[CircuitBreaker] = None, cache=None,
+                 limiter: Optional[TokenBucket] = None):
+        """
+        Initialize the client.
+        Args:
+            api_key (str): OMDb API key, defaults to ``OMDB_API_KEY`` at call time.
+            base_url (str): OMDb endpoint.
+            timeout: Default (connect, read) timeout in seconds.
+            retries (int): Default number of retries after a failed attempt.
+            backoff (float): Base delay in seconds of the exponential backoff.
+            pool_size (int): Maximum number of pooled connections.
+            breaker (CircuitBreaker): Circuit breaker, a new one by default.
+            cache (OMDbCache): Response cache, defaults to the shared cache.
+            limiter (TokenBucket): Rate limiter, or None for no client-side limit.
+        """
+        self._api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = cache or get_omdb_cache()
+        self.limiter = limiter
+        self.pool_size = pool_size
+        self.flight = SingleFlight()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0,
+                      'short_circuited': 0, 'stale_served': 0, 'throttled': 0}
+
+    def add_listener(self, listener):
+        """
+        Register a callable notified after every OMDb HTTP attempt.
+        Args:
+            listener (callable): Called as ``listener(kind, status, seconds)`` with
+                kind 'title', 'id', 'search' or 'other', the HTTP status code or
+                'timeout', 'error' or 'short_circuited', and the duration.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, kind, status, seconds):
+        for listener in self._listeners:
+            try:
+                listener(kind, status, seconds)
+            except Exception as e:
+                print(f"Error in OMDb client listener: {e}")
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """The OMDb API key (read from the environment at call time by default)."""
+        return self._api_key or os.getenv('OMDB_API_KEY')
+
+    def request(self, params: Dict[str, Any], timeout=None, retries: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Send a request to OMDb.
+        Args:
+            params (dict): Query parameters (the API key is added).
+            timeout: (connect, read) timeout, defaults to the client's timeout.
+            retries (int): Retries after a failed attempt, defaults to the client's setting.
+        Returns:
+            dict: The decoded JSON answer.
+        Raises:
+            OMDbRateLimited: If no rate limiter token was available in time.
+            OMDbUnavailable: If the circuit is open or all attempts failed.
+        """
+        timeout = timeout or self.timeout
+        kind = request_kind(params)
+        # Erst der Breaker: bei offenem Circuit sofort abbrechen, ohne auf ein Token zu warten
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            self._notify(kind, 'short_circuited', 0.0)
+            raise OMDbUnavailable('OMDb circuit is open')
+        try:
+            self._throttle(timeout)
+        except OMDbRateLimited:
+            self.breaker.release()
+            raise
+        retries = self.retries if retries is None else retries
+        params = dict(params, apikey=self.api_key)
+        error = None
+        for attempt in range(retries + 1):
+            if attempt:
+                self._count('retries')
+                time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+                self._throttle(None)
+            self._count('requests')
+            started = time.perf_counter()
+            status = 'error'
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=timeout)
+                status = response.status_code
+                if response.status_code in RETRY_STATUSES:
+                    error = f'HTTP {response.status_code}'
+                    continue
+                data = response.json()
+            except requests.Timeout as e:
+                status, error = 'timeout', e
+                continue
+            except (requests.RequestException, ValueError) as e:
+                error = e
+                continue
+            finally:
+                self._notify(kind, status, time.perf_counter() - started)
+            self.breaker.record_success()
+            return data
+        self._count('failures')
+        self.breaker.record_failure()
+        raise OMDbUnavailable(f'OMDb request failed: {error}')
+
+    def get_by_title(self, title: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the raw OMDb response for a title (``?t=``), cached. Concurrent
+        lookups of the same title share one request.
+        Args:
+            title (str): Movie title.
+        Returns:
+            Optional[Dict[str, Any]]: Raw OMDb JSON, or None if not found or OMDb
+            is unavailable and nothing (not even a stale entry) is cached.
+        """
+        if not title:
+            return None
+        key = title_key(title)
+        cached = self.cache.get(key)
+        if cached is NOT_FOUND:
+            return None
+        if cached is not None:
+            return cached
+        if not self.api_key:
+            return None
+        return self.flight.do(key, lambda: self._fetch_title(title, key))
+
+    def _fetch_title(self, title: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self.request(title_params(title))
+        except OMDbUnavailable as e:
+            print(f"OMDb lookup for '{title}' failed: {e}")
+            return self._stale_title(key)
+        return self._store_title(key, data)
+
+    def _stale_title(self, key: str) -> Optional[Dict[str, Any]]:
+        stale = self._stale(key)
+        return stale if stale is not NOT_FOUND else None
+
+    def _store_title(self, key: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if data.get('Response') == 'True':
+            self.cache.set(key, data)
+            if data.get('imdbID'):
+                self.cache.set(imdb_key(data['imdbID']), data)
+            return data
+        if data.get('Error') == 'Movie not found!':
+            self.cache.set(key, None)
+        return None
+
+    def refresh_by_id(self, imdb_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the current OMDb response for an imdbID (``?i=``), bypassing the
+        cache, and store it in the cache. Used to revalidate stored OMDb data.
+        Args:
+            imdb_id (str): The imdbID, e.g. 'tt0133093'.
+        Returns:
+            Optional[Dict[str, Any]]: Raw OMDb JSON, or None if OMDb does not know the ID.
+        Raises:
+            OMDbUnavailable: If OMDb could not be asked (no API key, open circuit,
+                rate limit, failed requests or an error answer).
+        """
+        if not self.api_key:
+            raise OMDbUnavailable('No OMDb API key configured')
+        data = self.request(imdb_params(imdb_id))
+        if data.get('Response') == 'True':
+            self.cache.set(imdb_key(imdb_id), data)
+            if data.get('Title'):
+                self.cache.set(title_key(data['Title']), data)
+            return data
+        if data.get('Error') in UNKNOWN_ID_ERRORS:
+            return None
+        raise OMDbUnavailable(f"OMDb error: {data.get('Error')}")
+
+    def search(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Search OMDb for movie titles (``?s=``), cached. Searches use a short
+        timeout and are not retried, as they serve interactive autocomplete.
+        Concurrent identical searches share one request.
+        Args:
+            query (str): Search string.
+        Returns:
+            Optional[Dict[str, Any]]: Dict with 'results' (list of dicts with
+            'title' and 'poster') and 'total' (number of OMDb matches), or None
+            if OMDb could not be reached.
+        """
+        key = search_key(query)
+        cached = self.cache.get(key)
+        if cached is NOT_FOUND:
+            return {'results': [], 'total': 0}
+        if cached is not None:
+            return cached
+        if not self.api_key:
+            return None
+        return self.flight.do(key, lambda: self._fetch_search(query, key))
+
+    def _fetch_search(self, query: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self.request(search_params(query), timeout=SEARCH_TIMEOUT, retries=0)
+        except OMDbUnavailable:
+            return self._stale_search(key)
+        return self._store_search(key, data)
+
+    def _stale_search(self, key: str) -> Optional[Dict[str, Any]]:
+        stale = self._stale(key)
+        if stale is NOT_FOUND:
+            return {'results': [], 'total': 0}
+        return stale
+
+    def _store_search(self, key: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if data.get('Response') == 'True' and 'Search' in data:
+            result = {
+                'results': [{'title': movie.get('Title', ''), 'poster': movie.get('Poster', '')}
+                            for movie in data['Search'][:SEARCH_PAGE_SIZE]],
+                'total': int(data.get('totalResults', 0) or 0)
+            }
+            self.cache.set(key, result)
+            return result
+        if data.get('Error') == 'Movie not found!':
+            self.cache.set(key, None)
+            return {'results': [], 'total': 0}
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the request counters, the circuit state, coalesced
+        calls and rate limiter waits.
+        Returns:
+            dict: Counters plus 'circuit' ('closed', 'open' or 'half_open').
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats['circuit'] = self.breaker.state
+        stats['coalesced'] = self.flight.get_stats()['coalesced']
+        if self.limiter is not None:
+            limiter = self.limiter.get_stats()
+            stats['throttle_waits'] = limiter['waits']
+            stats['throttle_wait_seconds'] = limiter['wait_seconds']
+            stats['throttle_rejected'] = limiter['rejected']
+        return stats
+
+    def _throttle(self, timeout):
+        if self.limiter is None:
+            return
+        max_wait = timeout[1] if isinstance(timeout, tuple) else timeout
+        if not self.limiter.acquire(max_wait):
+            self._count('throttled')
+            raise OMDbRateLimited('OMDb rate limit reached')
+
+    def _stale(self, key: str):
+        stale = self.cache.get_stale(key)
+        if stale is not None:
+            self._count('stale_served')
+        return stale
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_omdb_client() -> OMDbClient:
+    """
+    Return the process-wide OMDb client, configured from the environment
+    (``OMDB_URL``, ``OMDB_TIMEOUT``, ``OMDB_RETRIES``, ``OMDB_POOL_SIZE``,
+    ``OMDB_BREAKER_THRESHOLD``, ``OMDB_BREAKER_RESET``, ``OMDB_RATE_LIMIT`` in
+    requests per second (0 disables the limiter) and ``OMDB_RATE_BURST``).
+
+    Returns:
+        OMDbClient: The shared client instance.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                read_timeout = float(os.getenv('OMDB_TIMEOUT', DEFAULT_TIMEOUT[1]))
+                rate = float(os.getenv('OMDB_RATE_LIMIT', DEFAULT_RATE))
+                _client = OMDbClient(
+                    base_url=os.getenv('OMDB_URL', OMDB_URL),
+                    timeout=(min(DEFAULT_TIMEOUT[0], read_timeout), read_timeout),
+                    retries=int(os.getenv('OMDB_RETRIES', DEFAULT_RETRIES)),
+                    pool_size=int(os.getenv('OMDB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                    breaker=CircuitBreaker(
+                        failure_threshold=int(os.getenv('OMDB_BREAKER_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)),
+                        reset_timeout=float(os.getenv('OMDB_BREAKER_RESET', DEFAULT_RESET_TIMEOUT))),
+                    limiter=TokenBucket(rate, int(os.getenv('OMDB_RATE_BURST', DEFAULT_BURST))) if rate > 0 else None)
+    return _client
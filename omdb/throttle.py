@@ -0,0 +1,147 @@
+"""
+Concurrency controls for OMDb requests: single-flight coalescing of identical
+lookups and a token-bucket rate limiter shared by all threads.
+"""
+import threading
+import time
+from typing import Optional, Dict, Any
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    function, callers arriving while it is in flight wait for and share its
+    result (or exception).
+    """
+
+    class _Call:
+        __slots__ = ('done', 'result', 'error')
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        """Initialize an empty group."""
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'coalesced': 0}
+
+    def do(self, key, fn):
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+        Args:
+            key: Identifies identical calls (e.g. an OMDb cache key).
+            fn (callable): Function without arguments.
+        Returns:
+            The result of ``fn``.
+        """
+        with self._lock:
+            self.stats['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                self.stats['coalesced'] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the counters.
+        Returns:
+            dict: Number of calls and of calls that joined an in-flight call.
+        """
+        with self._lock:
+            return dict(self.stats)
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter. Tokens refill at ``rate`` per second
+    up to ``burst``. Callers that find the bucket empty reserve the next token
+    and sleep until it is due, so waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        """
+        Initialize the bucket (full).
+        Args:
+            rate (float): Tokens per second.
+            burst (int): Bucket capacity.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waits': 0, 'wait_seconds': 0.0, 'rejected': 0}
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting for it if necessary.
+        Args:
+            timeout (float): Maximum seconds to wait, or None to wait as long as needed.
+        Returns:
+            bool: False if the token would not be available within ``timeout``.
+        """
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Reserve one token without waiting (for callers that sleep themselves,
+        e.g. with ``asyncio.sleep``).
+        Args:
+            timeout (float): Maximum acceptable wait, or None for no limit.
+        Returns:
+            float: Seconds until the reserved token is due (0 if available now),
+            or None if it would not be available within ``timeout``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                self.stats['rejected'] += 1
+                return None
+            self._tokens -= 1
+            self.stats['acquired'] += 1
+            if wait:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] += wait
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the limiter counters.
+        Returns:
+            dict: Acquired tokens, throttle waits, total wait seconds and rejections.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        return stats
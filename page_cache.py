@@ -0,0 +1,174 @@
+"""
+In-process cache of rendered pages with conditional GET support.
+
+Cached views are rendered once per route and arguments (view arguments and query
+string) and then served from memory with an ``ETag`` and ``Last-Modified``
+header; clients revalidating with ``If-None-Match``/``If-Modified-Since`` get a
+``304 Not Modified``. Every page is tagged with the data it shows (e.g.
+``user_movies:3``) and the data manager's write events invalidate exactly the
+pages carrying the affected tags. Writes of other processes (e.g. the other
+workers of a pre-forking server) arrive as a 'data_changed' event from the
+once-per-request check of the shared write counter and drop all pages.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request, make_response, current_app
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+def cached(tags):
+    """
+    Decorator caching a GET view in the page cache of the app serving the
+    request (``app.extensions['page_cache']``).
+    Args:
+        tags (callable): Receives the view arguments and returns the set of
+            tags the page depends on.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            if request.method != 'GET':
+                return view(**kwargs)
+            return current_app.extensions['page_cache']._serve(view, kwargs, tags(**kwargs))
+        wrapper.page_cached = True
+        return wrapper
+    return decorator
+
+
+class PageCache:
+    """
+    Thread-safe LRU of rendered responses with tag-based invalidation.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+        Args:
+            max_entries (int): Maximum number of cached pages (0 disables caching,
+                conditional GET still works).
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._versions = {}
+        # Wird von clear() erhöht, damit vorher begonnene Renderings nicht gespeichert werden
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'invalidations': 0}
+
+    def invalidate(self, *tags):
+        """
+        Drop all pages carrying any of the given tags.
+        Args:
+            tags (str): Tags to invalidate.
+        """
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                for key in self._tags.pop(tag, ()):
+                    self._drop(key)
+            self.stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop all pages."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def get_stats(self):
+        """
+        Return a snapshot of the counters.
+        Returns:
+            dict: Hits, misses, 304 answers, invalidations and the number of pages.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        return stats
+
+    def handle_write_event(self, event, data):
+        """
+        Data manager write listener invalidating the pages showing the changed data.
+        Args:
+            event (str): The write event name.
+            data (dict): The event payload.
+        """
+        if event == 'user_added':
+            self.invalidate('users')
+        elif event in ('movie_added', 'movie_updated', 'movie_deleted'):
+            self.invalidate('movies', f"user_movies:{data['user_id']}", f"movie:{data['id']}")
+        elif event == 'movies_added':
+            self.invalidate('movies', *{f"user_movies:{m['user_id']}" for m in data['movies']})
+        elif event == 'movies_enriched':
+            self.invalidate('movies',
+                            *{f"user_movies:{m['user_id']}" for m in data['movies']},
+                            *{f"movie:{m['id']}" for m in data['movies']})
+        elif event in ('review_added', 'review_updated', 'review_deleted'):
+            self.invalidate(f"movie:{data['movie_id']}")
+        elif event == 'reviews_added':
+            self.invalidate(*{f'movie:{movie_id}' for movie_id in data['movie_ids']})
+        elif event == 'data_changed':
+            # Schreibzugriff eines anderen Prozesses: welche Seiten betroffen sind, ist unbekannt
+            self.clear()
+
+    def _serve(self, view, kwargs, tags):
+        key = (request.endpoint, tuple(sorted(kwargs.items())),
+               tuple(sorted(request.args.items(multi=True))))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                versions = {tag: self._versions.get(tag, 0) for tag in tags}
+                generation = self._generation
+        if entry is None:
+            response = make_response(view(**kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            entry = (body, response.mimetype, hashlib.blake2b(body, digest_size=16).hexdigest(),
+                     datetime.now(timezone.utc).replace(microsecond=0))
+            self._store(key, entry, tags, versions, generation)
+        response = make_response(entry[0])
+        response.mimetype = entry[1]
+        response.set_etag(entry[2])
+        response.last_modified = entry[3]
+        # Browser dürfen die Seite behalten, müssen sie aber revalidieren
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+        if response.status_code == 304:
+            with self._lock:
+                self.stats['not_modified'] += 1
+        return response
+
+    def _store(self, key, entry, tags, versions, generation):
+        with self._lock:
+            # Während des Renderns invalidierte Seiten nicht speichern
+            if (not self.max_entries or generation != self._generation
+                    or any(self._versions.get(t, 0) != v for t, v in versions.items())):
+                return
+            self._drop(key)
+            self._entries[key] = (*entry, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[4]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -0,0 +1,281 @@
+"""
+Local poster cache and thumbnail service.
+
+Posters are downloaded once from the allowed image hosts and stored on disk
+under the SHA-256 hash of their content; the URL -> hash mapping is kept next
+to them. For every display size a thumbnail (WebP, or JPEG if WebP is not
+available) is generated on first use. Thumbnails need Pillow (listed in
+``requirements.txt``); without it the original image is served from the local
+cache instead, which is reported at startup and counted as 'originals_served'.
+
+The cache directory is capped at ``max_bytes``: once it grows beyond that, a
+background task deletes the files written longest ago until it is back under
+90% of the cap. Deleted posters are downloaded again on their next request.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from omdb import SingleFlight
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow ist optional
+    Image = None
+
+DEFAULT_CACHE_DIR = 'poster_cache'
+DEFAULT_ALLOWED_HOSTS = ('m.media-amazon.com', 'images-na.ssl-images-amazon.com', 'ia.media-imdb.com')
+# Pixelmaße in doppelter Auflösung der CSS-Boxen (HiDPI-Displays)
+SIZES = {
+    'grid': (360, 540),
+    'edit': (320, 480),
+    'small': (64, 96),
+}
+DOWNLOAD_TIMEOUT = (3.05, 10)
+MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024
+THUMBNAIL_QUALITY = 80
+WARMUP_WORKERS = 2
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+TRIM_TARGET = 0.9
+
+_EXTENSIONS = {'image/jpeg': 'jpg', 'image/png': 'png', 'image/webp': 'webp', 'image/gif': 'gif'}
+_MIMETYPES = {extension: mimetype for mimetype, extension in _EXTENSIONS.items()}
+
+
+class PosterError(Exception):
+    """
+    Raised when a poster cannot be downloaded or is not an allowed image.
+    """
+
+
+class PosterStore:
+    """
+    Content-addressed on-disk store of posters and their thumbnails.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, allowed_hosts=DEFAULT_ALLOWED_HOSTS,
+                 warmup_workers: int = WARMUP_WORKERS, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the store.
+        Args:
+            directory (str): Cache directory (created on demand).
+            allowed_hosts (tuple): Host names posters may be downloaded from.
+            warmup_workers (int): Threads warming and trimming the cache in the background.
+            max_bytes (int): Size cap of the cache directory (0 for no cap).
+        """
+        self.directory = directory
+        self.allowed_hosts = frozenset(host.lower() for host in allowed_hosts)
+        self.max_bytes = max_bytes
+        self.thumbnail_format = None
+        if Image is not None:
+            self.thumbnail_format = 'webp' if features.check('webp') else 'jpg'
+        else:
+            print("Pillow is not installed: posters are served in their original size")
+        self.session = requests.Session()
+        self._flight = SingleFlight()
+        self._executor = ThreadPoolExecutor(max_workers=warmup_workers, thread_name_prefix='poster-warmup')
+        self._lock = threading.Lock()
+        # Größe des Verzeichnisses seit dem letzten Aufräumen (None = noch nicht gemessen)
+        self._disk_bytes = None
+        self._trimming = False
+        self.stats = {'downloads': 0, 'download_errors': 0, 'thumbnails': 0, 'originals_served': 0,
+                      'warmups': 0, 'evicted_files': 0}
+
+    def is_allowed(self, url: Optional[str]) -> bool:
+        """
+        Check whether a poster URL may be proxied.
+        Args:
+            url (str): Poster URL.
+        Returns:
+            bool: True for http(s) URLs on an allowed host.
+        """
+        if not url or url == 'N/A':
+            return False
+        parsed = urlparse(url)
+        return parsed.scheme in ('http', 'https') and (parsed.hostname or '') in self.allowed_hosts
+
+    def get(self, url: str, size: str) -> Tuple[str, str, str]:
+        """
+        Return the cached image for a poster URL and size, downloading the poster
+        and rendering the thumbnail if necessary.
+        Args:
+            url (str): Poster URL (must be allowed).
+            size (str): Key of ``SIZES``.
+        Returns:
+            tuple: (file path, mimetype, ETag) of the image.
+        Raises:
+            PosterError: If the URL is not allowed or the download fails.
+        """
+        if size not in SIZES:
+            raise PosterError(f"Unknown poster size '{size}'")
+        if not self.is_allowed(url):
+            raise PosterError('Poster host is not allowed')
+        digest, extension = self._flight.do(('poster', url), lambda: self._original(url))
+        if self.thumbnail_format is None:
+            self._count('originals_served')
+            return self._path(digest, extension), _MIMETYPES[extension], digest
+        thumbnail = self._flight.do(
+            ('thumbnail', digest, size), lambda: self._thumbnail(digest, extension, size))
+        return thumbnail, _MIMETYPES[self.thumbnail_format], f'{digest}-{size}'
+
+    def warm(self, urls, sizes=('grid',)):
+        """
+        Download posters and render thumbnails in the background.
+        Args:
+            urls (iterable): Poster URLs (disallowed URLs are skipped).
+            sizes (tuple): Thumbnail sizes to render.
+        """
+        for url in set(urls):
+            if self.is_allowed(url):
+                self._executor.submit(self._warm_one, url, sizes)
+
+    def handle_write_event(self, event, data):
+        """
+        Data manager write listener warming the cache for newly stored posters.
+        Args:
+            event (str): The write event name.
+            data (dict): The event payload.
+        """
+        if event in ('movies_enriched', 'movies_added'):
+            self.warm(movie.get('omdb_poster') for movie in data['movies'])
+        elif event in ('movie_added', 'movie_updated'):
+            self.warm([data.get('omdb_poster')])
+
+    def get_stats(self):
+        """
+        Return a snapshot of the counters.
+        Returns:
+            dict: Downloads, download errors, rendered thumbnails, originals served
+            without Pillow, warm-ups, evicted files, whether thumbnails are
+            enabled and the measured size of the cache directory.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            if self._disk_bytes is not None:
+                stats['disk_bytes'] = self._disk_bytes
+        stats['thumbnails_enabled'] = int(self.thumbnail_format is not None)
+        return stats
+
+    def _warm_one(self, url, sizes):
+        try:
+            for size in sizes:
+                self.get(url, size)
+            self._count('warmups')
+        except Exception as e:
+            print(f"Error warming poster cache for {url}: {e}")
+
+    def _original(self, url):
+        index = os.path.join(self.directory, 'urls', hashlib.sha256(url.encode('utf-8')).hexdigest())
+        try:
+            with open(index, encoding='ascii') as f:
+                digest, extension = f.read().split()
+            if os.path.exists(self._path(digest, extension)):
+                return digest, extension
+        except (OSError, ValueError):
+            pass
+        body, extension = self._download(url)
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path(digest, extension)
+        if not os.path.exists(path):
+            self._write(path, body)
+        self._write(index, f'{digest} {extension}'.encode('ascii'))
+        return digest, extension
+
+    def _download(self, url):
+        self._count('downloads')
+        try:
+            with self.session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True, allow_redirects=False) as response:
+                mimetype = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if response.status_code != 200 or mimetype not in _EXTENSIONS:
+                    raise PosterError(f'Unexpected answer {response.status_code} ({mimetype or "no type"})')
+                body = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    body.extend(chunk)
+                    if len(body) > MAX_DOWNLOAD_BYTES:
+                        raise PosterError('Poster is too large')
+        except (requests.RequestException, PosterError) as e:
+            self._count('download_errors')
+            raise PosterError(f'Download of {url} failed: {e}')
+        return bytes(body), _EXTENSIONS[mimetype]
+
+    def _thumbnail(self, digest, extension, size):
+        path = self._path(f'{digest}-{size}', self.thumbnail_format)
+        if os.path.exists(path):
+            return path
+        with Image.open(self._path(digest, extension)) as image:
+            image = ImageOps.fit(ImageOps.exif_transpose(image).convert('RGB'), SIZES[size], Image.LANCZOS)
+            out = BytesIO()
+            image.save(out, 'WEBP' if self.thumbnail_format == 'webp' else 'JPEG',
+                       quality=THUMBNAIL_QUALITY, optimize=True)
+        self._write(path, out.getvalue())
+        self._count('thumbnails')
+        return path
+
+    def _path(self, name, extension):
+        return os.path.join(self.directory, name[:2], f'{name}.{extension}')
+
+    def _write(self, path, body):
+        # Atomar schreiben, damit parallele Leser nie halbe Dateien sehen
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+        self._added(len(body))
+
+    def _added(self, size):
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            due = (self.max_bytes > 0 and not self._trimming
+                   and (self._disk_bytes is None or self._disk_bytes > self.max_bytes))
+            if due:
+                self._trimming = True
+        if due:
+            self._executor.submit(self._trim)
+
+    def _trim(self):
+        # Misst das Verzeichnis (auch Dateien anderer Prozesse) und löscht die ältesten Dateien
+        total = None
+        try:
+            files = []
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    # Temporärdateien gehören zu laufenden Schreibvorgängen
+                    if name.startswith('tmp'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            if total > self.max_bytes:
+                files.sort()
+                for _, size, path in files:
+                    if total <= self.max_bytes * TRIM_TARGET:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    self._count('evicted_files')
+        except Exception as e:
+            print(f"Error trimming the poster cache: {e}")
+        finally:
+            with self._lock:
+                self._disk_bytes = total
+                self._trimming = False
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
@@ -0,0 +1,229 @@
+"""
+Background refresh of the OMDb data stored in the film catalog.
+
+OMDb data (rating, poster, director, year) is stored once per film when the
+film enters the catalog, and ratings change afterwards. The refresher
+revalidates the entries whose data was fetched longest ago: it looks up one
+batch at a time by imdbID, bypassing the OMDb cache, paced to ``rate``
+lookups per second on top of the OMDb client's own rate limit. Only the films
+whose values changed are written, in one bulk UPDATE per batch (see
+``datamanager.catalog.refresh``).
+
+Every checked entry gets a new ``omdb_fetched_at`` time. That is the only
+progress state, so a restarted refresher simply continues with the oldest
+entries. Requests never wait for the refresher.
+
+Every serving process starts a refresher, but only one of them refreshes at a
+time: before each batch it renews the ``catalog-refresh`` lease in the database
+(see ``datamanager.leases``), and the others wait until it expires.
+"""
+import os
+import socket
+import threading
+import time
+from typing import Optional, Dict, Any
+
+from datamanager.catalog import REFRESH_MAX_AGE
+from omdb import get_omdb_client
+
+DEFAULT_BATCH_SIZE = 20
+# OMDb-Abfragen pro Sekunde (0 = ohne eigene Begrenzung); 0.005 sind ca. 430 am Tag,
+# weniger als das Tageslimit kostenloser API-Keys. Gilt für die ganze Installation,
+# da immer nur der Inhaber der Lease auffrischt
+DEFAULT_RATE = 0.005
+IDLE_INTERVAL = 300.0
+LEASE_NAME = 'catalog-refresh'
+# Reserve über die Dauer eines Batches hinaus, bevor ein anderer Prozess übernimmt
+LEASE_MARGIN = 60.0
+
+
+def lookup_imdb_id(imdb_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Ask OMDb for the current data of a film.
+
+    Args:
+        imdb_id (str): The film's imdbID
+
+    Returns:
+        Optional[Dict[str, Any]]: Raw OMDb JSON, or None if OMDb no longer knows the ID
+
+    Raises:
+        OMDbUnavailable: If OMDb could not be asked
+    """
+    return get_omdb_client().refresh_by_id(imdb_id)
+
+
+class CatalogRefresher:
+    """
+    Daemon thread refreshing the oldest OMDb data of the catalog.
+    """
+
+    def __init__(self, data_manager, max_age: float = REFRESH_MAX_AGE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 rate: float = DEFAULT_RATE, idle_interval: float = IDLE_INTERVAL, lookup=lookup_imdb_id):
+        """
+        Initialize the refresher.
+        Args:
+            data_manager: Data manager providing the catalog refresh methods.
+            max_age (float): Seconds after which OMDb data is refreshed.
+            batch_size (int): Entries looked up and written per batch.
+            rate (float): Maximum OMDb lookups per second (0 for no limit).
+            idle_interval (float): Seconds to wait when nothing is stale or OMDb failed.
+            lookup (callable): Function returning raw OMDb data for an imdbID.
+        """
+        self.data_manager = data_manager
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.rate = rate
+        self.idle_interval = idle_interval
+        self.lookup = lookup
+        self.stats = {'batches': 0, 'checked': 0, 'changed': 0, 'failed': 0}
+        self._thread = None
+        self._owner = None
+        self._next_lookup = 0.0
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """True while the refresh thread is started."""
+        return self._thread is not None
+
+    def start(self):
+        """
+        Start the refresh thread (no-op if already running).
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='catalog-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the refresh thread after its current lookup.
+        Args:
+            timeout (float): Seconds to wait for the thread.
+        """
+        self._stopping.set()
+        with self._lock:
+            if self._thread is not None:
+                self._thread.join(timeout)
+            self._thread = None
+        self.release_lease()
+
+    @property
+    def lease_seconds(self) -> float:
+        """Lifetime of the lease: one paced batch plus the idle wait and a margin."""
+        return (self.batch_size / self.rate if self.rate > 0 else 0) + self.idle_interval + LEASE_MARGIN
+
+    def hold_lease(self) -> bool:
+        """
+        Take or renew the refresh lease for this process.
+        Returns:
+            bool: True if this process may refresh now.
+        """
+        # Erst hier bestimmt: beim Anlegen im Master eines Pre-Fork-Servers wäre die PID falsch
+        self._owner = f'{socket.gethostname()}:{os.getpid()}'
+        return self.data_manager.acquire_lease(LEASE_NAME, self._owner, self.lease_seconds)
+
+    def release_lease(self):
+        """
+        Give up the refresh lease if this process took it.
+        """
+        if self._owner is not None:
+            self.data_manager.release_lease(LEASE_NAME, self._owner)
+            self._owner = None
+
+    def refresh_batch(self, limit: Optional[int] = None, fetched_before: Optional[float] = None) -> int:
+        """
+        Look up the oldest stale entries and store the changed ones. Stops at the
+        first failed lookup; the remaining entries stay first in line.
+        Args:
+            limit (int): Maximum number of entries, defaults to the batch size.
+            fetched_before (float): Only entries fetched before this time.
+        Returns:
+            int: The number of checked entries (0 if nothing is stale or OMDb failed).
+        """
+        size = min(limit, self.batch_size) if limit else self.batch_size
+        entries = self.data_manager.get_stale_catalog_entries(self.max_age, size)
+        if fetched_before is not None:
+            entries = [entry for entry in entries if entry['omdb_fetched_at'] < fetched_before]
+        answers = {}
+        for entry in entries:
+            if not self._pace():
+                break
+            try:
+                answers[entry['imdb_id']] = self.lookup(entry['imdb_id'])
+            except Exception as e:
+                print(f"Fehler beim Auffrischen von {entry['imdb_id']}: {e}")
+                self._count('failed')
+                break
+        if not answers:
+            return 0
+        stats = self.data_manager.refresh_catalog_entries(entries, answers)
+        self._count('batches')
+        self._count('checked', stats['checked'])
+        self._count('changed', stats['changed'])
+        return stats['checked']
+
+    def run_pending(self, limit: Optional[int] = None, progress=None) -> int:
+        """
+        Refresh stale entries in the calling thread until none is left. Entries
+        checked during the run are not checked again, even with a max_age of 0.
+        Stops early if another process holds the refresh lease.
+        Args:
+            limit (int): Maximum number of entries, or None for no limit.
+            progress (callable): Called with a status line after every batch.
+        Returns:
+            int: The number of checked entries.
+        """
+        started = time.time()
+        count = 0
+        while limit is None or count < limit:
+            if not self.hold_lease():
+                if progress:
+                    progress("The catalog refresh is running in another process")
+                break
+            checked = self.refresh_batch(None if limit is None else limit - count, fetched_before=started)
+            if not checked:
+                break
+            count += checked
+            if progress:
+                progress(f"... {count} checked, {self.stats['changed']} changed")
+        return count
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        Report the refresh counters and how much of the catalog is stale.
+        Returns:
+            dict: Batches, checked, changed and failed lookups since the start,
+            plus 'stale_films' and 'oldest_fetch_seconds'.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update(self.data_manager.get_catalog_refresh_stats(self.max_age))
+        return stats
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                # Ohne Lease frischt gerade ein anderer Prozess auf
+                if self.hold_lease() and self.refresh_batch():
+                    continue
+            except Exception as e:
+                print(f"Fehler im Katalog-Refresher: {e}")
+            self._stopping.wait(self.idle_interval)
+
+    def _pace(self) -> bool:
+        # Wartet bis zur nächsten erlaubten Abfrage; False, wenn der Refresher gestoppt wird
+        if self.rate > 0:
+            delay = self._next_lookup - time.monotonic()
+            if delay > 0 and self._stopping.wait(delay):
+                return False
+            self._next_lookup = time.monotonic() + 1 / self.rate
+        return not self._stopping.is_set()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
@@ -0,0 +1,99 @@
+"""
+Seeding of the trending titles shown on the homepage.
+
+The titles from ``trending_titles.json`` are looked up on OMDb with a bounded
+worker pool and inserted in a single transaction. Seeding is idempotent: titles
+already stored for the global trending user are skipped.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Callable, Dict, Any
+
+from utils import fetch_omdb_raw, load_trending_titles
+
+# Globaler User für Trending-Titel
+TRENDING_USER_ID = 0
+DEFAULT_WORKERS = 8
+
+
+def _movie_from_omdb(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Build a movie dictionary for the trending user from a raw OMDb response.
+
+    Args:
+        data (dict): Raw OMDb JSON
+
+    Returns:
+        Optional[dict]: Movie data, or None if OMDb has no usable year or rating
+    """
+    year = data.get('Year', '')
+    rating = data.get('imdbRating', '')
+    if not year.isdigit() or not rating.replace('.', '', 1).isdigit():
+        return None
+    return {
+        'name': data.get('Title', ''),
+        'director': data.get('Director', ''),
+        'year': int(year),
+        'rating': float(rating),
+        'user_id': TRENDING_USER_ID,
+        # Wird von add_movies_bulk im Film-Katalog gespeichert
+        'omdb': data
+    }
+
+
+def seed_trending_titles(data_manager, titles: Optional[list] = None,
+                         workers: int = DEFAULT_WORKERS,
+                         progress: Optional[Callable[[str], None]] = print) -> Dict[str, Any]:
+    """
+    Fetch the trending titles concurrently and insert them in one transaction.
+
+    Args:
+        data_manager: Data manager providing ``add_movies_bulk``
+        titles (list): Titles to seed, defaults to ``trending_titles.json``
+        workers (int): Maximum number of concurrent OMDb lookups
+        progress (callable): Receives progress messages, or None for silence
+
+    Returns:
+        Dict[str, Any]: Summary with the counts of requested, fetched, missing and
+        inserted titles and the elapsed seconds
+    """
+    started = time.perf_counter()
+    titles = load_trending_titles() if titles is None else titles
+    report = progress or (lambda message: None)
+    movies = []
+    missing = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(fetch_omdb_raw, title): title for title in titles}
+        for done, future in enumerate(as_completed(futures), start=1):
+            title = futures[future]
+            movie = None
+            try:
+                data = future.result()
+                movie = _movie_from_omdb(data) if data else None
+            except Exception as e:
+                report(f"Error fetching '{title}': {e}")
+            if movie:
+                movies.append(movie)
+            else:
+                missing.append(title)
+            report(f"[{done}/{len(titles)}] {title}: {'ok' if movie else 'not found'}")
+    fetched_at = time.perf_counter()
+    try:
+        inserted = data_manager.add_movies_bulk(movies)
+    except Exception as e:
+        report(f"Error storing the fetched titles: {e}")
+        inserted = 0
+    finished = time.perf_counter()
+    summary = {
+        'requested': len(titles),
+        'fetched': len(movies),
+        'missing': missing,
+        'inserted': inserted,
+        'fetch_seconds': round(fetched_at - started, 3),
+        'insert_seconds': round(finished - fetched_at, 3),
+        'total_seconds': round(finished - started, 3)
+    }
+    report(f"Seeded {inserted} new of {len(movies)} fetched titles "
+           f"({len(missing)} not found) in {summary['total_seconds']}s "
+           f"(OMDb {summary['fetch_seconds']}s, insert {summary['insert_seconds']}s)")
+    return summary
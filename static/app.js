@@ -0,0 +1,101 @@
+// Autocomplete for movie titles with posters.
+// Usage: <input data-autocomplete="ID of the list element"> with optional
+// data-autocomplete-min (minimum query length, default 1),
+// data-autocomplete-debounce (milliseconds, default 0) and
+// data-autocomplete-filter (only show titles containing the query).
+function initAutocomplete(input) {
+    const list = document.getElementById(input.dataset.autocomplete);
+    const minLength = parseInt(input.dataset.autocompleteMin || '1', 10);
+    const debounce = parseInt(input.dataset.autocompleteDebounce || '0', 10);
+    const filter = input.hasAttribute('data-autocomplete-filter');
+    const itemTag = list.tagName === 'UL' ? 'li' : 'div';
+    let timeout;
+
+    function hide() {
+        list.style.display = 'none';
+        list.innerHTML = '';
+    }
+
+    function show(data, query) {
+        list.innerHTML = '';
+        data.forEach(item => {
+            // Case-insensitive filter for display
+            if (filter && !item.title.toLowerCase().includes(query.toLowerCase())) {
+                return;
+            }
+            const entry = document.createElement(itemTag);
+            entry.className = 'autocomplete-item';
+            if (item.poster && item.poster !== 'N/A') {
+                const img = document.createElement('img');
+                img.src = item.poster;
+                img.alt = 'Poster';
+                entry.appendChild(img);
+            }
+            const span = document.createElement('span');
+            span.textContent = item.title;
+            entry.appendChild(span);
+            entry.addEventListener('mousedown', function() {
+                input.value = item.title;
+                hide();
+            });
+            list.appendChild(entry);
+        });
+        list.style.display = list.childElementCount > 0 ? 'block' : 'none';
+    }
+
+    input.addEventListener('input', function() {
+        const query = this.value;
+        clearTimeout(timeout);
+        if (query.length < minLength) {
+            hide();
+            return;
+        }
+        timeout = setTimeout(() => {
+            fetch(`/autocomplete_movie_title?q=${encodeURIComponent(query)}`)
+                .then(r => r.json())
+                .then(data => show(data, query));
+        }, debounce);
+    });
+    document.addEventListener('click', function(e) {
+        if (!list.contains(e.target) && e.target !== input) {
+            hide();
+        }
+    });
+}
+
+// Point the "add to user" form of a homepage card at the selected user.
+function updateFormAction(selectElement, formIndex) {
+    const userId = selectElement.value;
+    if (userId) {
+        const form = document.getElementById('add-movie-form-' + formIndex);
+        form.action = '/users/' + userId + '/add_movie';
+    }
+}
+
+// Only validate required fields on 'Add Movie', not on 'Fetch from OMDb'
+function initOmdbFetchButton(fetchBtn) {
+    const form = fetchBtn.form;
+    fetchBtn.addEventListener('click', function(e) {
+        // Remove required attributes temporarily
+        const requiredFields = form.querySelectorAll('[required]');
+        requiredFields.forEach(f => f.removeAttribute('required'));
+        // Set a hidden field to indicate OMDb fetch
+        let hidden = form.querySelector('input[name="fetch_omdb_flag"]');
+        if (!hidden) {
+            hidden = document.createElement('input');
+            hidden.type = 'hidden';
+            hidden.name = 'fetch_omdb_flag';
+            hidden.value = '1';
+            form.appendChild(hidden);
+        }
+        form.submit();
+        // Restore required attributes after submit (for next time)
+        setTimeout(() => requiredFields.forEach(f => f.setAttribute('required', 'required')), 100);
+        e.preventDefault();
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-autocomplete]').forEach(initAutocomplete);
+    document.querySelectorAll('button[name="fetch_omdb"]').forEach(initOmdbFetchButton);
+});
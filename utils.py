@@ -2,10 +2,41 @@
 Utility functions for the MovieWebAPP.
 """
 import os
-import requests
 import json
 from typing import Optional, Dict, Any
 
+from omdb import get_omdb_cache, get_omdb_client, title_key
+
+
+def fetch_omdb_raw(title: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the raw OMDb response for a title, going through the shared OMDb
+    client and cache.
+
+    Args:
+        title (str): Movie title to search for
+
+    Returns:
+        Optional[Dict[str, Any]]: Raw OMDb JSON or None if not found
+    """
+    return get_omdb_client().get_by_title(title)
+
+
+def search_omdb_titles(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Search OMDb for movie titles (``?s=``), going through the shared OMDb
+    client and cache.
+
+    Args:
+        query (str): Search string
+
+    Returns:
+        Optional[Dict[str, Any]]: Dict with 'results' (list of dicts with 'title'
+        and 'poster') and 'total' (number of OMDb matches), or None if OMDb
+        could not be reached
+    """
+    return get_omdb_client().search(query)
+
 
 def fetch_omdb_data(title: str) -> Optional[Dict[str, Any]]:
     """
@@ -17,29 +48,45 @@ def fetch_omdb_data(title: str) -> Optional[Dict[str, Any]]:
     Returns:
         Optional[Dict[str, Any]]: Movie data or None if not found
     """
-    api_key = os.getenv('OMDB_API_KEY')
-    if not api_key:
+    return parse_omdb_movie(fetch_omdb_raw(title))
+
+
+def parse_omdb_movie(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a raw OMDb title response into the movie data shown in the forms.
+
+    Args:
+        data (dict): Raw OMDb JSON, or None
+
+    Returns:
+        Optional[Dict[str, Any]]: Movie data or None if there is no response
+    """
+    if not data:
         return None
-        
-    url = f'http://www.omdbapi.com/?t={title}&apikey={api_key}&type=movie&plot=short&r=json'
-    
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('Response') == 'True':
-                return {
-                    'name': data.get('Title', ''),
-                    'director': data.get('Director', ''),
-                    'year': int(data.get('Year', 0)) if data.get('Year', '').isdigit() else '',
-                    'rating': float(data.get('imdbRating', 0)) if data.get('imdbRating', '0').replace('.', '', 1).isdigit() else '',
-                    'poster': data.get('Poster', ''),
-                    'omdb_id': data.get('imdbID', '')
-                }
-    except Exception:
-        pass
-    
-    return None
+    return {
+        'name': data.get('Title', ''),
+        'director': data.get('Director', ''),
+        'year': int(data.get('Year', 0)) if data.get('Year', '').isdigit() else '',
+        'rating': float(data.get('imdbRating', 0)) if data.get('imdbRating', '0').replace('.', '', 1).isdigit() else '',
+        'poster': data.get('Poster', ''),
+        'omdb_id': data.get('imdbID', '')
+    }
+
+
+def get_cached_omdb_raw(title: str):
+    """
+    Look up a title in the OMDb cache only, without any network request.
+
+    Args:
+        title (str): Movie title
+
+    Returns:
+        The raw OMDb JSON, ``NOT_FOUND`` if OMDb is known not to have the title,
+        or None if the title is not cached
+    """
+    if not title:
+        return None
+    return get_omdb_cache().get(title_key(title))
 
 
 def validate_movie_data(year: int, rating: float) -> tuple[bool, str]:
@@ -79,6 +126,21 @@ def get_back_url(request, session, default_url: str) -> str:
     return request.args.get('back') or session.get('last_url') or default_url
 
 
+def get_page_args(request) -> tuple[int, Optional[int]]:
+    """
+    Read the pagination parameters (``page`` and keyset cursor ``after``) from the request.
+
+    Args:
+        request: Flask request object
+
+    Returns:
+        tuple[int, Optional[int]]: (page, after_id)
+    """
+    page = request.args.get('page', 1, type=int) or 1
+    after_id = request.args.get('after', None, type=int)
+    return max(page, 1), after_id
+
+
 def load_trending_titles() -> list[str]:
     """
     Load trending movie titles from JSON file.
@@ -86,9 +148,12 @@ def load_trending_titles() -> list[str]:
     Returns:
         list[str]: List of trending movie titles
     """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trending_titles.json')
     try:
-        with open('trending_titles.json', 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            return data.get('titles', [])
+            if isinstance(data, dict):
+                return data.get('titles', [])
+            return list(data)
     except (FileNotFoundError, json.JSONDecodeError):
         return []